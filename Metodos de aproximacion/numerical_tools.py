@@ -10,8 +10,101 @@ Las funciones están documentadas en español y devuelven valores escalares
 o estructuras sencillas para facilitar su uso por scripts externos.
 """
 from __future__ import annotations
+import heapq
+import json
 import math
-from typing import Callable, Tuple, List
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Tuple, List, NamedTuple, Optional, Sequence
+
+
+# -----------------------------
+# MEMOIZACIÓN DE EVALUACIONES
+# -----------------------------
+
+def _element_count(x) -> int:
+    """Número de puntos en un argumento no escalar (arreglo o secuencia)."""
+    size = getattr(x, "size", None)
+    if isinstance(size, int):
+        return size
+    try:
+        return len(x)
+    except TypeError:
+        return 1
+
+
+class MemoizedFunction:
+    """Envoltorio que recuerda f(x) por valor exacto de x (caché LRU acotada).
+
+    Se usa en lugar de `f` en cualquier función de este módulo: las fórmulas
+    de diferencias que comparten puntos (x, x±h, x±2h) o las cotas que
+    vuelven a muestrear la misma malla ya no evalúan `f` dos veces en el
+    mismo punto. Útil cuando cada evaluación es cara (por ejemplo, si f
+    requiere resolver una EDO).
+
+    La clave es el float exacto (0.0 y -0.0 se distinguen). Los argumentos
+    que no se pueden usar como clave (arreglos) se pasan a `f` sin caché y
+    cuentan una evaluación por elemento, aunque la llamada falle (así un
+    intento vectorizado seguido de la evaluación punto a punto cuenta ambas).
+
+    Atributos:
+    - hits: llamadas respondidas desde la caché
+    - misses: llamadas que evaluaron `f`
+    - evaluations: total de evaluaciones reales de `f`
+    """
+
+    def __init__(self, f: Callable[[float], float], maxsize: int = 4096):
+        if maxsize <= 0:
+            raise ValueError("maxsize debe ser entero positivo")
+        self.f = f
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evaluations = 0
+        self._cache: "OrderedDict[object, float]" = OrderedDict()
+        self.__name__ = getattr(f, "__name__", "memoized")
+        self.__doc__ = getattr(f, "__doc__", None)
+
+    def __call__(self, x: float) -> float:
+        try:
+            key = (x, math.copysign(1.0, x)) if x == 0 else x
+            hash(key)
+        except (TypeError, ValueError):
+            self.evaluations += _element_count(x)
+            return self.f(x)
+
+        cache = self._cache
+        if key in cache:
+            self.hits += 1
+            cache.move_to_end(key)
+            return cache[key]
+
+        self.misses += 1
+        self.evaluations += 1
+        value = self.f(x)
+        cache[key] = value
+        if len(cache) > self.maxsize:
+            cache.popitem(last=False)
+        return value
+
+    def cache_info(self) -> dict:
+        """Estadísticas de uso: hits, misses, evaluations, size, maxsize."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evaluations": self.evaluations,
+            "size": len(self._cache),
+            "maxsize": self.maxsize,
+        }
+
+    def clear(self) -> None:
+        """Vacía la caché y reinicia los contadores."""
+        self._cache.clear()
+        self.hits = self.misses = self.evaluations = 0
+
+
+def memoize(f: Callable[[float], float], maxsize: int = 4096) -> MemoizedFunction:
+    """Envuelve `f` en un `MemoizedFunction` con caché LRU de `maxsize` puntos."""
+    return MemoizedFunction(f, maxsize)
 
 
 # -----------------------------
@@ -66,6 +159,78 @@ def three_point_backward(f: Callable[[float], float], x: float, h: float) -> flo
     return (3 * f(x) - 4 * f(x - h) + f(x - 2 * h)) / (2 * h)
 
 
+# Paso inicial por defecto de `ridders_derivative`
+RIDDERS_DEFAULT_STEP = 0.1
+
+
+class DerivativeResult(NamedTuple):
+    """Resultado de `ridders_derivative` (en la versión por lotes de
+    `vectorized_tools`, cada campo es un arreglo con la forma de x).
+
+    - value: mejor aproximación de f'(x)
+    - error: estimación del error de esa aproximación
+    - evaluations: número de evaluaciones de f utilizadas
+    - step: h de la fila del tableau que dio la mejor aproximación
+    """
+    value: float
+    error: float
+    evaluations: int
+    step: float
+
+
+def ridders_derivative(f: Callable[[float], float], x: float, h: float = None,
+                       con: float = 1.4, max_steps: int = 10) -> DerivativeResult:
+    """Derivada por extrapolación de Richardson sobre diferencias centrales (Ridders).
+
+    Se calcula la diferencia central con h, h/con, h/con^2, ... y cada nueva
+    columna se extrapola hacia h -> 0 como en Romberg (el error de la
+    central es par en h, así que el factor es con^2 por nivel):
+
+        D[j][i] = (con^(2j) D[j-1][i] - D[j-1][i-1]) / (con^(2j) - 1)
+
+    Cada elemento estima su error comparándolo con sus dos vecinos de la
+    columna anterior y se devuelve el de menor error. En cuanto la diagonal
+    empeora (el redondeo empieza a dominar) se detiene: así el paso óptimo
+    se elige solo, sin barrer h a mano. Cada nivel cuesta 2 evaluaciones.
+
+    Parámetros:
+    - f: función de un solo argumento (float -> float)
+    - x: punto donde se aproxima la derivada
+    - h: paso inicial (por defecto 0.1, sin escalar con |x|: un paso
+      proporcional a |x| es demasiado grande para funciones oscilantes
+      lejos del origen); no necesita ser pequeño
+    - con: factor de reducción de h entre niveles
+    - max_steps: número máximo de niveles
+
+    Devuelve:
+    - DerivativeResult(value, error, evaluations, step)
+    """
+    if h is None:
+        h = RIDDERS_DEFAULT_STEP
+    if h == 0.0:
+        raise ValueError("h debe ser distinto de cero")
+    con2 = con * con
+    previous = [central_difference(f, x, h)]
+    evaluations = 2
+    best, error, step = previous[0], float('inf'), h
+    for i in range(1, max_steps):
+        h /= con
+        current = [central_difference(f, x, h)]
+        evaluations += 2
+        factor = con2
+        for j in range(1, i + 1):
+            current.append((current[j - 1] * factor - previous[j - 1]) / (factor - 1.0))
+            factor *= con2
+            err = max(abs(current[j] - current[j - 1]), abs(current[j] - previous[j - 1]))
+            if err <= error:
+                best, error, step = current[j], err, h
+        # La extrapolación de mayor orden ya no mejora: parar
+        if abs(current[i] - previous[i - 1]) >= 2.0 * error:
+            break
+        previous = current
+    return DerivativeResult(best, error, evaluations, step)
+
+
 # -----------------------------
 # DERIVADAS EXACTAS CONOCIDAS (CASO ESPECÍFICO)
 # -----------------------------
@@ -106,6 +271,97 @@ def max_abs_on_interval(func: Callable[[float], float], a: float, b: float, samp
     return max_val
 
 
+# -----------------------------
+# SUMAS CON MENOS ERROR DE REDONDEO
+# -----------------------------
+
+def kahan_sum(values: Iterable[float]) -> float:
+    """Suma compensada de Kahan.
+
+    Lleva en `c` la parte de cada término que se perdió al redondear la
+    suma y la descuenta del siguiente. El error queda acotado por unos
+    pocos ulp, en vez de crecer con el número de términos.
+    """
+    total = 0.0
+    c = 0.0
+    for v in values:
+        y = v - c
+        t = total + y
+        c = (t - total) - y
+        total = t
+    return total
+
+
+def neumaier_sum(values: Iterable[float]) -> float:
+    """Suma compensada de Kahan–Babuška–Neumaier.
+
+    Como Kahan, pero también es correcta cuando un término es mayor que la
+    suma acumulada (Kahan pierde la compensación en ese caso).
+    """
+    total = 0.0
+    c = 0.0
+    for v in values:
+        t = total + v
+        if abs(total) >= abs(v):
+            c += (total - t) + v
+        else:
+            c += (v - t) + total
+        total = t
+    return total + c
+
+
+def pairwise_sum(values: Iterable[float], block: int = 128) -> float:
+    """Suma por parejas (en árbol) sin guardar todos los términos.
+
+    Los términos se suman en bloques de `block` y los bloques se combinan
+    de dos en dos como un contador binario, así que solo se guardan
+    O(log n) sumas parciales. El error crece como O(log n) en lugar de O(n).
+    """
+    stack: List[Tuple[int, float]] = []  # (nivel, suma parcial)
+    partial = 0.0
+    count = 0
+    for v in values:
+        partial += v
+        count += 1
+        if count == block:
+            level, s = 0, partial
+            while stack and stack[-1][0] == level:
+                s += stack.pop()[1]
+                level += 1
+            stack.append((level, s))
+            partial, count = 0.0, 0
+    total = partial
+    while stack:
+        total += stack.pop()[1]
+    return total
+
+
+SUMMATION_METHODS = {
+    "naive": lambda values: sum(values, 0.0),
+    "kahan": kahan_sum,
+    "neumaier": neumaier_sum,
+    "pairwise": pairwise_sum,
+    "fsum": math.fsum,
+}
+
+
+# Sinónimos aceptados aquí y en `vectorized_tools`, donde la suma directa es np.dot
+SUMMATION_ALIASES = {"dot": "naive"}
+
+
+def canonical_summation(name: str) -> str:
+    """Nombre de `SUMMATION_METHODS` que corresponde a `name` (admite los sinónimos)."""
+    canonical = SUMMATION_ALIASES.get(name, name)
+    if canonical not in SUMMATION_METHODS:
+        options = ', '.join([*SUMMATION_METHODS, *SUMMATION_ALIASES])
+        raise ValueError(f"suma desconocida: {name!r} (opciones: {options})")
+    return canonical
+
+
+def _summation(name: str) -> Callable[[Iterable[float]], float]:
+    return SUMMATION_METHODS[canonical_summation(name)]
+
+
 # -----------------------------
 # INTEGRACIÓN NUMÉRICA
 # -----------------------------
@@ -136,15 +392,23 @@ def simpson_rule(f: Callable[[float], float], a: float, b: float) -> float:
     return (b - a) / 6.0 * (f(a) + 4.0 * f(m) + f(b))
 
 
-def composite_midpoint(f: Callable[[float], float], a: float, b: float, n: int) -> float:
+def composite_midpoint(f: Callable[[float], float], a: float, b: float, n: int,
+                       summation: Optional[str] = None) -> float:
     """Regla del punto medio compuesta con n subintervalos (n entero positivo).
 
     Divide [a,b] en n subintervalos de ancho h = (b-a)/n y aplica midpoint en
     cada subintervalo.
+
+    Con `summation` ("naive", "kahan", "neumaier", "pairwise" o "fsum") se
+    calcula h * sum f(a + (i + 1/2) h) con esa suma; para n en los millones,
+    la acumulación directa `total += ...` pierde dígitos.
     """
     if n <= 0:
         raise ValueError("n debe ser entero positivo")
     h = (b - a) / n
+    if summation is not None:
+        add = _summation(summation)
+        return h * add(f(a + (i + 0.5) * h) for i in range(n))
     total = 0.0
     for i in range(n):
         left = a + i * h
@@ -153,16 +417,31 @@ def composite_midpoint(f: Callable[[float], float], a: float, b: float, n: int)
     return total
 
 
-def composite_simpson(f: Callable[[float], float], a: float, b: float, m: int) -> float:
+def composite_simpson(f: Callable[[float], float], a: float, b: float, m: int,
+                      summation: Optional[str] = None) -> float:
     """Regla de Simpson compuesta usando `m` subintervalos por pareja.
 
     El algoritmo típico pide un número `n` par de subintervalos; aquí `m` es el
     número de pares (es decir, n = 2*m). Se sigue el pseudocódigo del apunte.
+
+    Con `summation` ("naive", "kahan", "neumaier", "pairwise" o "fsum") los
+    nodos se calculan a partir del índice, x_k = a + k h, en lugar de avanzar
+    `x += 2*h` (que acumula redondeo y desplaza los nodos), y la suma
+    ponderada f(a) + 4 f(x_1) + 2 f(x_2) + ... + f(b) se hace con esa suma.
     """
     if m <= 0:
         raise ValueError("m debe ser entero positivo")
     n = 2 * m
     h = (b - a) / n
+    if summation is not None:
+        add = _summation(summation)
+
+        def terms():
+            yield f(a)
+            for k in range(1, n):
+                yield (4.0 if k % 2 else 2.0) * f(a + k * h)
+            yield f(b)
+        return (h / 3.0) * add(terms())
     I1 = 0.0
     I2 = 0.0
     x = a + h
@@ -174,6 +453,359 @@ def composite_simpson(f: Callable[[float], float], a: float, b: float, m: int) -
     return (h / 3.0) * (f(a) + 4.0 * I1 + 2.0 * I2 - f(b))
 
 
+# -----------------------------
+# INTEGRACIÓN ADAPTATIVA
+# -----------------------------
+
+class QuadratureResult(NamedTuple):
+    """Resultado de una cuadratura adaptativa.
+
+    - value: aproximación de la integral
+    - error: estimación del error absoluto
+    - evaluations: número de evaluaciones de f utilizadas
+    """
+    value: float
+    error: float
+    evaluations: int
+
+
+def adaptive_simpson(f: Callable[[float], float], a: float, b: float,
+                     tol: float = 1e-10, max_depth: int = 50, min_depth: int = 3) -> QuadratureResult:
+    """Simpson adaptativo: subdivide solo donde el error local supera la tolerancia.
+
+    En cada subintervalo [l,r] se compara Simpson simple S(l,r) con la suma
+    de Simpson en sus dos mitades S2. Si |S2 - S| <= 15 * tol_local se acepta
+    S2 + (S2 - S)/15 (extrapolación de Richardson); si no, se divide en dos
+    y cada mitad recibe la mitad de la tolerancia.
+
+    Los valores f(l), f(m), f(r) ya calculados se pasan a los hijos, así que
+    cada nivel solo evalúa f en los dos nuevos puntos a un cuarto y tres
+    cuartos del subintervalo.
+
+    Antes de aceptar se subdivide siempre hasta `min_depth` (2^min_depth
+    paneles): con pocos puntos la estimación |S2 - S| puede ser
+    engañosamente pequeña, por ejemplo si f se anula en todos ellos
+    (sin(4x)^2 en [0, pi] vale 0 en los 5 puntos iniciales).
+
+    Parámetros:
+    - f: función de un solo argumento (float -> float)
+    - a, b: límites de integración
+    - tol: tolerancia absoluta objetivo
+    - max_depth: profundidad máxima de subdivisión (se acepta el valor al llegar)
+    - min_depth: profundidad mínima antes de aceptar un subintervalo
+
+    Devuelve:
+    - QuadratureResult(value, error, evaluations)
+    """
+    fa, fm, fb = f(a), f(0.5 * (a + b)), f(b)
+    evaluations = 3
+    whole = (b - a) / 6.0 * (fa + 4.0 * fm + fb)
+
+    total = 0.0
+    error = 0.0
+    # Pila explícita (sin recursión): (l, r, f(l), f(m), f(r), S, tol, profundidad)
+    stack = [(a, b, fa, fm, fb, whole, tol, 0)]
+    while stack:
+        l, r, fl, fm, fr, S, local_tol, depth = stack.pop()
+        m = 0.5 * (l + r)
+        flm, frm = f(0.5 * (l + m)), f(0.5 * (m + r))
+        evaluations += 2
+        left = (m - l) / 6.0 * (fl + 4.0 * flm + fm)
+        right = (r - m) / 6.0 * (fm + 4.0 * frm + fr)
+        delta = left + right - S
+        if (depth >= min_depth and abs(delta) <= 15.0 * local_tol) or depth >= max_depth:
+            total += left + right + delta / 15.0
+            error += abs(delta) / 15.0
+        else:
+            stack.append((m, r, fm, frm, fr, right, 0.5 * local_tol, depth + 1))
+            stack.append((l, m, fl, flm, fm, left, 0.5 * local_tol, depth + 1))
+    return QuadratureResult(total, error, evaluations)
+
+
+class RombergResult(NamedTuple):
+    """Resultado de `romberg`.
+
+    - value: mejor aproximación (último elemento diagonal del tableau)
+    - error: |R[k][k] - R[k-1][k-1]| en la última fila
+    - evaluations: número de evaluaciones de f utilizadas
+    - tableau: filas R[k][0..k]; R[k][0] es el trapecio compuesto con 2^k
+      subintervalos y R[k][j] la j-ésima extrapolación de Richardson
+    """
+    value: float
+    error: float
+    evaluations: int
+    tableau: List[List[float]]
+
+
+def romberg(f: Callable[[float], float], a: float, b: float,
+            tol: float = 1e-10, max_levels: int = 20) -> RombergResult:
+    """Integración de Romberg a partir de `trapezoid_rule`.
+
+    R[0][0] es el trapecio simple. Al pasar de 2^(k-1) a 2^k subintervalos
+    el trapecio compuesto se obtiene del anterior evaluando solo los nuevos
+    puntos medios:
+
+        R[k][0] = R[k-1][0] / 2 + h_k * sum f(a + (2i - 1) h_k),  h_k = (b-a)/2^k
+
+    y la extrapolación de Richardson completa la fila:
+
+        R[k][j] = R[k][j-1] + (R[k][j-1] - R[k-1][j-1]) / (4^j - 1)
+
+    Se detiene cuando dos elementos diagonales consecutivos difieren menos
+    que `tol` (o al llegar a `max_levels` filas). En total se evalúa f en
+    2^k + 1 puntos, cada uno una sola vez.
+
+    Parámetros:
+    - f: función de un solo argumento (float -> float)
+    - a, b: límites de integración
+    - tol: tolerancia absoluta entre elementos diagonales
+    - max_levels: número máximo de filas del tableau
+
+    Devuelve:
+    - RombergResult(value, error, evaluations, tableau)
+    """
+    tableau = [[trapezoid_rule(f, a, b)]]
+    evaluations = 2
+    error = float('inf')
+    for k in range(1, max_levels):
+        n_new = 2 ** (k - 1)
+        h = (b - a) / (2 * n_new)
+        new_points = math.fsum(f(a + (2 * i - 1) * h) for i in range(1, n_new + 1))
+        evaluations += n_new
+
+        previous = tableau[-1]
+        row = [0.5 * previous[0] + h * new_points]
+        factor = 1.0
+        for j in range(1, k + 1):
+            factor *= 4.0
+            row.append(row[j - 1] + (row[j - 1] - previous[j - 1]) / (factor - 1.0))
+        tableau.append(row)
+
+        error = abs(row[-1] - previous[-1])
+        if error < tol:
+            break
+    return RombergResult(tableau[-1][-1], error, evaluations, tableau)
+
+
+# Nodos y pesos de Gauss–Kronrod 7-15 en [-1,1] (QUADPACK, qk15). Los
+# nodos de índice impar son los de Gauss-Legendre de 7 puntos.
+_XGK15 = (
+    0.991455371120812639206854697526329,
+    0.949107912342758524526189684047851,
+    0.864864423359769072789712788640926,
+    0.741531185599394439863864773280788,
+    0.586087235467691130294144845693013,
+    0.405845151377397166906606412076961,
+    0.207784955007898467600689403773245,
+    0.000000000000000000000000000000000,
+)
+_WGK15 = (
+    0.022935322010529224963732008058970,
+    0.063092092629978553290700663189204,
+    0.104790010322250183839876322541518,
+    0.140653259715525918745189590510238,
+    0.169004726639267902826583426598550,
+    0.190350578064785409913256402421014,
+    0.204432940075298892414161999234649,
+    0.209482141084727828012999174891714,
+)
+_WG7 = (
+    0.129484966168869693270611432679082,
+    0.279705391489276667901467771423780,
+    0.381830050505118944950369775488975,
+    0.417959183673469387755102040816327,
+)
+
+
+def _gauss_kronrod_15(f: Callable[[float], float], a: float, b: float) -> Tuple[float, float]:
+    """Kronrod de 15 puntos en [a,b] y su diferencia con Gauss de 7 puntos
+    (que reutiliza 7 de las 15 evaluaciones)."""
+    center = 0.5 * (a + b)
+    half = 0.5 * (b - a)
+    fc = f(center)
+    kronrod = _WGK15[7] * fc
+    gauss = _WG7[3] * fc
+    for j in range(7):
+        dx = half * _XGK15[j]
+        pair = f(center - dx) + f(center + dx)
+        kronrod += _WGK15[j] * pair
+        if j % 2 == 1:
+            gauss += _WG7[j // 2] * pair
+    return half * kronrod, half * abs(kronrod - gauss)
+
+
+def adaptive_gauss_kronrod(f: Callable[[float], float], a: float, b: float,
+                           tol: float = 1e-10, max_intervals: int = 500) -> QuadratureResult:
+    """Cuadratura adaptativa global de Gauss–Kronrod (7-15 puntos).
+
+    Se mantiene una lista de subintervalos ordenada por su error estimado
+    |K15 - G7| y se biseca siempre el de mayor error, hasta que la suma de
+    errores sea menor que `tol` o se alcance `max_intervals`. Como los nodos
+    de Gauss están contenidos en los de Kronrod, cada subintervalo cuesta 15
+    evaluaciones y da a la vez la integral y su estimación de error. Los
+    nodos no incluyen los extremos, así que sirve para integrandos con
+    singularidades integrables en a o b.
+
+    Parámetros:
+    - f: función de un solo argumento (float -> float)
+    - a, b: límites de integración
+    - tol: tolerancia absoluta objetivo para el error total
+    - max_intervals: número máximo de subintervalos
+
+    Devuelve:
+    - QuadratureResult(value, error, evaluations)
+    """
+    value, err = _gauss_kronrod_15(f, a, b)
+    evaluations = 15
+    # Montículo de máximos por error: (-error, l, r, valor)
+    heap = [(-err, a, b, value)]
+    total, total_err = value, err
+    while total_err > tol and len(heap) < max_intervals:
+        neg_err, l, r, v = heapq.heappop(heap)
+        m = 0.5 * (l + r)
+        v1, e1 = _gauss_kronrod_15(f, l, m)
+        v2, e2 = _gauss_kronrod_15(f, m, r)
+        evaluations += 30
+        heapq.heappush(heap, (-e1, l, m, v1))
+        heapq.heappush(heap, (-e2, m, r, v2))
+        total += v1 + v2 - v
+        total_err += e1 + e2 + neg_err
+    # Sumar de nuevo al final evita el error de redondeo de las actualizaciones
+    total = math.fsum(item[3] for item in heap)
+    total_err = math.fsum(-item[0] for item in heap)
+    return QuadratureResult(total, total_err, evaluations)
+
+
+# -----------------------------
+# CUADRATURA DE GAUSS–LEGENDRE
+# -----------------------------
+
+# Tabla del proceso: orden -> (nodos, pesos) en [-1,1]
+_GAUSS_LEGENDRE_CACHE: Dict[int, Tuple[Tuple[float, ...], Tuple[float, ...]]] = {}
+
+
+def gauss_legendre_nodes(order: int) -> Tuple[Tuple[float, ...], Tuple[float, ...]]:
+    """Nodos y pesos de Gauss–Legendre de `order` puntos en [-1,1].
+
+    Los nodos son las raíces de P_n, que se obtienen por Newton partiendo de
+    la aproximación x ≈ cos(pi (i - 1/4) / (n + 1/2)). P_n y P_(n-1) se
+    evalúan con la recurrencia de Bonnet
+
+        (k+1) P_(k+1)(x) = (2k+1) x P_k(x) - k P_(k-1)(x)
+
+    y los pesos son w_i = 2 / ((1 - x_i^2) P_n'(x_i)^2). El cálculo se hace
+    una sola vez por orden; las llamadas siguientes leen la tabla del
+    proceso (ver `save_gauss_legendre_cache` para guardarla en disco).
+
+    Devuelve:
+    - (nodos, pesos) como tuplas ordenadas de menor a mayor nodo
+    """
+    if order <= 0:
+        raise ValueError("order debe ser entero positivo")
+    cached = _GAUSS_LEGENDRE_CACHE.get(order)
+    if cached is not None:
+        return cached
+
+    n = order
+    nodes = [0.0] * n
+    weights = [0.0] * n
+    # Por simetría basta con la mitad de las raíces
+    for i in range(1, (n + 1) // 2 + 1):
+        x = math.cos(math.pi * (i - 0.25) / (n + 0.5))
+        for _ in range(100):
+            p_prev, p = 1.0, x
+            for k in range(1, n):
+                p_prev, p = p, ((2 * k + 1) * x * p - k * p_prev) / (k + 1)
+            dp = n * (x * p - p_prev) / (x * x - 1.0)
+            step = p / dp
+            x -= step
+            if abs(step) < 1e-16:
+                break
+        # Recalcular P_n' en la raíz final
+        p_prev, p = 1.0, x
+        for k in range(1, n):
+            p_prev, p = p, ((2 * k + 1) * x * p - k * p_prev) / (k + 1)
+        dp = n * (x * p - p_prev) / (x * x - 1.0)
+        w = 2.0 / ((1.0 - x * x) * dp * dp)
+        nodes[i - 1], nodes[n - i] = -x, x
+        weights[i - 1] = weights[n - i] = w
+    if n % 2 == 1:
+        nodes[n // 2] = 0.0
+
+    table = (tuple(nodes), tuple(weights))
+    _GAUSS_LEGENDRE_CACHE[order] = table
+    return table
+
+
+def save_gauss_legendre_cache(path: str) -> None:
+    """Guarda en JSON los nodos y pesos calculados hasta ahora."""
+    data = {str(order): [list(nodes), list(weights)]
+            for order, (nodes, weights) in _GAUSS_LEGENDRE_CACHE.items()}
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(data, fh)
+
+
+def load_gauss_legendre_cache(path: str) -> int:
+    """Carga una tabla guardada con `save_gauss_legendre_cache`.
+
+    Devuelve:
+    - Número de órdenes cargados
+    """
+    with open(path, encoding="utf-8") as fh:
+        data = json.load(fh)
+    for order, (nodes, weights) in data.items():
+        _GAUSS_LEGENDRE_CACHE[int(order)] = (tuple(nodes), tuple(weights))
+    return len(data)
+
+
+def _gauss_legendre_points(a: float, b: float, order: int, panels: int) -> Tuple[List[float], List[float]]:
+    """Nodos y pesos de la regla compuesta (`panels` paneles iguales) en [a,b]."""
+    if panels <= 0:
+        raise ValueError("panels debe ser entero positivo")
+    nodes, weights = gauss_legendre_nodes(order)
+    half = 0.5 * (b - a) / panels
+    xs: List[float] = []
+    ws: List[float] = []
+    for p in range(panels):
+        center = a + (2 * p + 1) * half
+        xs.extend(center + half * t for t in nodes)
+        ws.extend(half * w for w in weights)
+    return xs, ws
+
+
+def gauss_legendre(f: Callable[[float], float], a: float, b: float,
+                   order: int = 10, panels: int = 1) -> float:
+    """Cuadratura de Gauss–Legendre de `order` puntos, compuesta en `panels` paneles.
+
+    Con `order` puntos la regla es exacta para polinomios de grado
+    2*order - 1; para integrandos suaves unos 10-20 puntos superan a
+    Simpson compuesta con miles. Cada panel [l,r] usa los nodos de [-1,1]
+    trasladados: x = (l+r)/2 + (r-l)/2 * t, con pesos (r-l)/2 * w.
+
+    Parámetros:
+    - f: función de un solo argumento (float -> float)
+    - a, b: límites de integración
+    - order: número de nodos por panel
+    - panels: número de subintervalos iguales
+
+    Devuelve:
+    - Aproximación de la integral como float
+    """
+    xs, ws = _gauss_legendre_points(a, b, order, panels)
+    return math.fsum(w * f(x) for x, w in zip(xs, ws))
+
+
+def gauss_legendre_batch(fs: Sequence[Callable[[float], float]], a: float, b: float,
+                         order: int = 10, panels: int = 1) -> List[float]:
+    """Integra varias funciones en [a,b] con los mismos nodos y pesos.
+
+    Equivale a `[gauss_legendre(f, a, b, order, panels) for f in fs]`, pero
+    la malla compuesta se construye una sola vez.
+    """
+    xs, ws = _gauss_legendre_points(a, b, order, panels)
+    return [math.fsum(w * f(x) for x, w in zip(xs, ws)) for f in fs]
+
+
 # -----------------------------
 # FUNCIONES ESPECÍFICAS DE LOS EJERCICIOS
 # -----------------------------
@@ -220,18 +852,39 @@ def exact_integral_of_f_x_ln_x(a: float, b: float) -> float:
 
 
 __all__ = [
+    "MemoizedFunction",
+    "memoize",
     "forward_difference",
     "backward_difference",
     "central_difference",
     "three_point_forward",
     "three_point_backward",
+    "RIDDERS_DEFAULT_STEP",
+    "DerivativeResult",
+    "ridders_derivative",
     "exact_derivative_x_ln_x",
     "max_abs_on_interval",
+    "kahan_sum",
+    "neumaier_sum",
+    "pairwise_sum",
+    "SUMMATION_METHODS",
+    "SUMMATION_ALIASES",
+    "canonical_summation",
     "midpoint_rule",
     "trapezoid_rule",
     "simpson_rule",
     "composite_midpoint",
     "composite_simpson",
+    "QuadratureResult",
+    "adaptive_simpson",
+    "adaptive_gauss_kronrod",
+    "RombergResult",
+    "romberg",
+    "gauss_legendre_nodes",
+    "save_gauss_legendre_cache",
+    "load_gauss_legendre_cache",
+    "gauss_legendre",
+    "gauss_legendre_batch",
     "f_x_ln_x",
     "f_1_plus_ln_x",
     "exact_integral_of_1_plus_ln_x",
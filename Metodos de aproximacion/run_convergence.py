@@ -0,0 +1,320 @@
+"""
+Runner de estudios de convergencia
+
+Barre n (integración) o h (diferenciación) en un rango logarítmico para cada
+método de `numerical_tools` y uno o varios integrandos. Por cada punto
+registra la aproximación, el error absoluto, las evaluaciones de f y el
+tiempo, y al final ajusta el orden de convergencia empírico p de
+error ≈ C * h^p por mínimos cuadrados en escala log-log.
+
+El trabajo se reparte en un pool de procesos y cada fila se escribe en el
+archivo en cuanto llega (CSV, o Parquet si `pyarrow` está instalado), así que
+los barridos grandes no se acumulan en memoria: para el ajuste del orden
+solo se guardan los pares (h, error).
+
+Ejemplos:
+    python run_convergence.py
+    python run_convergence.py --kind integration --n-max 1e6 --vectorized
+    python run_convergence.py --kind differentiation --h-min 1e-10 --format parquet
+"""
+from __future__ import annotations
+import argparse
+import csv
+import math
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except Exception:
+    pa = None
+    pq = None
+
+import numpy as np
+
+import numerical_tools as nt
+import vectorized_tools as vt
+
+
+# Integrandos: nombre -> (f escalar, f vectorizada, integral exacta en [a,b])
+INTEGRANDS: Dict[str, Tuple[Callable, Callable, Callable]] = {
+    "1+ln x": (nt.f_1_plus_ln_x, vt.f_1_plus_ln_x, nt.exact_integral_of_1_plus_ln_x),
+    "x ln x": (nt.f_x_ln_x, vt.f_x_ln_x, nt.exact_integral_of_f_x_ln_x),
+}
+
+# Funciones a derivar: nombre -> (f, derivada exacta)
+DIFFERENTIABLES: Dict[str, Tuple[Callable, Callable]] = {
+    "x ln x": (nt.f_x_ln_x, nt.exact_derivative_x_ln_x),
+    "exp": (math.exp, math.exp),
+}
+
+# Método -> (regla escalar, regla vectorizada, n debe ser múltiplo de); todas
+# reciben (f, a, b, n) con n subintervalos (paneles en Gauss–Legendre)
+INTEGRATION_METHODS: Dict[str, Tuple[Callable, Callable, int]] = {
+    "composite_midpoint": (nt.composite_midpoint, vt.composite_midpoint, 1),
+    "composite_simpson": (
+        lambda f, a, b, n: nt.composite_simpson(f, a, b, n // 2),
+        lambda f, a, b, n: vt.composite_simpson(f, a, b, n // 2),
+        2,
+    ),
+    "gauss_legendre_4": (
+        lambda f, a, b, n: nt.gauss_legendre(f, a, b, order=4, panels=n),
+        lambda f, a, b, n: vt.gauss_legendre(f, a, b, order=4, panels=n),
+        1,
+    ),
+}
+
+DIFFERENTIATION_METHODS: Dict[str, Callable] = {
+    "forward_difference": nt.forward_difference,
+    "backward_difference": nt.backward_difference,
+    "central_difference": nt.central_difference,
+    "three_point_forward": nt.three_point_forward,
+    "three_point_backward": nt.three_point_backward,
+}
+
+FIELDS = ["kind", "method", "function", "n", "h", "approximation", "exact",
+          "abs_error", "evaluations", "seconds"]
+
+
+class CountingFunction:
+    """Envoltorio que cuenta los puntos evaluados (escalares o arreglos)."""
+
+    def __init__(self, f: Callable):
+        self.f = f
+        self.count = 0
+
+    def __call__(self, x):
+        self.count += int(np.size(x))
+        return self.f(x)
+
+
+def run_task(task: tuple) -> dict:
+    """Ejecuta un punto del barrido (en un proceso del pool) y devuelve su fila."""
+    kind, method, name, param, a, b, x0, vectorized = task
+    if kind == "integration":
+        f_scalar, f_vector, exact_integral = INTEGRANDS[name]
+        scalar_rule, vector_rule, multiple = INTEGRATION_METHODS[method]
+        rule = vector_rule if vectorized else scalar_rule
+        f = CountingFunction(f_vector if vectorized else f_scalar)
+        n = max(multiple, int(param) - int(param) % multiple)
+        h = (b - a) / n
+        start = time.perf_counter()
+        value = rule(f, a, b, n)
+        seconds = time.perf_counter() - start
+        exact = exact_integral(a, b)
+    else:
+        f_scalar, derivative = DIFFERENTIABLES[name]
+        f = CountingFunction(f_scalar)
+        n, h = None, float(param)
+        start = time.perf_counter()
+        value = DIFFERENTIATION_METHODS[method](f, x0, h)
+        seconds = time.perf_counter() - start
+        exact = derivative(x0)
+    return {
+        "kind": kind, "method": method, "function": name, "n": n, "h": h,
+        "approximation": value, "exact": exact, "abs_error": abs(value - exact),
+        "evaluations": f.count, "seconds": seconds,
+    }
+
+
+def log_range(low: float, high: float, points: int, integer: bool = False) -> List[float]:
+    """`points` valores log-espaciados en [low, high] (enteros distintos si `integer`)."""
+    values = np.geomspace(low, high, points)
+    if integer:
+        return sorted({int(round(v)) for v in values})
+    return list(values)
+
+
+def build_tasks(args) -> Iterator[tuple]:
+    """Genera las tareas del barrido sin construir la lista completa."""
+    if args.kind in ("integration", "both"):
+        for method in args.integration_methods:
+            for name in args.integrands:
+                for n in log_range(args.n_min, args.n_max, args.points, integer=True):
+                    yield ("integration", method, name, n, args.a, args.b, None, args.vectorized)
+    if args.kind in ("differentiation", "both"):
+        for method in args.differentiation_methods:
+            for name in args.functions:
+                for h in log_range(args.h_min, args.h_max, args.points):
+                    yield ("differentiation", method, name, h, None, None, args.x0, False)
+
+
+class OrderFit:
+    """Ajuste de log(error) = log(C) + p log(h) por mínimos cuadrados.
+
+    Solo guarda los pares (h, error) de cada serie, no las filas completas.
+    Se usa el tramo dominado por el error de truncamiento: se descartan los
+    puntos con h menor que el del error mínimo (donde el redondeo ya
+    domina), los cercanos a ese mínimo y los que están en el piso de
+    redondeo (error relativo < `floor`).
+    """
+
+    def __init__(self, floor: float = 1e-13):
+        self.floor = floor
+        self.points: Dict[tuple, List[Tuple[float, float]]] = {}
+
+    def add(self, row: dict) -> None:
+        key = (row["kind"], row["method"], row["function"])
+        error, h = row["abs_error"], row["h"]
+        if error > self.floor * max(1.0, abs(row["exact"])) and h > 0:
+            self.points.setdefault(key, []).append((h, error))
+
+    def orders(self) -> Dict[tuple, Tuple[float, int]]:
+        """{(tipo, método, función): (orden p, puntos usados)}"""
+        result = {}
+        for key, pairs in self.points.items():
+            pairs = sorted(pairs, reverse=True)
+            best = min(range(len(pairs)), key=lambda i: pairs[i][1])
+            # Cerca del mínimo el redondeo ya aplana la curva: se exige un
+            # error al menos 10 veces mayor, salvo que queden menos de 2 puntos
+            usable = [(h, e) for h, e in pairs[:best + 1] if e >= 10.0 * pairs[best][1]]
+            if len(usable) < 2:
+                usable = pairs[:best + 1]
+            xs = [math.log(h) for h, _ in usable]
+            ys = [math.log(e) for _, e in usable]
+            count = len(xs)
+            if count < 2:
+                continue
+            x_mean, y_mean = sum(xs) / count, sum(ys) / count
+            sxx = sum((x - x_mean) ** 2 for x in xs)
+            sxy = sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys))
+            if sxx > 0:
+                result[key] = (sxy / sxx, count)
+        return result
+
+
+class RowWriter:
+    """Escribe filas en CSV (una a una) o Parquet (por lotes de `batch` filas)."""
+
+    def __init__(self, path: str, fmt: str, batch: int = 1024):
+        self.fmt = fmt
+        self.batch = batch
+        self.pending: List[dict] = []
+        if fmt == "parquet":
+            if pa is None:
+                raise RuntimeError("pyarrow no está instalado: usa --format csv")
+            schema = pa.schema([
+                ("kind", pa.string()), ("method", pa.string()), ("function", pa.string()),
+                ("n", pa.int64()), ("h", pa.float64()), ("approximation", pa.float64()),
+                ("exact", pa.float64()), ("abs_error", pa.float64()),
+                ("evaluations", pa.int64()), ("seconds", pa.float64()),
+            ])
+            self.writer = pq.ParquetWriter(path, schema)
+        else:
+            self.fh = open(path, "w", newline='', encoding='utf-8')
+            self.writer = csv.DictWriter(self.fh, fieldnames=FIELDS)
+            self.writer.writeheader()
+
+    def write(self, row: dict) -> None:
+        if self.fmt == "parquet":
+            self.pending.append(row)
+            if len(self.pending) >= self.batch:
+                self.flush()
+        else:
+            self.writer.writerow(row)
+            self.fh.flush()
+
+    def flush(self) -> None:
+        if self.fmt == "parquet" and self.pending:
+            self.writer.write_table(pa.Table.from_pylist(self.pending, schema=self.writer.schema))
+            self.pending = []
+
+    def close(self) -> None:
+        if self.fmt == "parquet":
+            self.flush()
+            self.writer.close()
+        else:
+            self.fh.close()
+
+
+def run_study(tasks, path: str, fmt: str = "csv", workers: Optional[int] = None,
+              progress: Callable[[dict], None] = None,
+              window: Optional[int] = None) -> Dict[tuple, Tuple[float, int]]:
+    """Ejecuta las tareas en un pool de procesos, escribe cada fila al llegar
+    y devuelve los órdenes de convergencia ajustados.
+
+    Como mucho `window` tareas (por defecto, 4 por proceso) están enviadas
+    al pool a la vez: el generador `tasks` se consume a medida que terminan
+    las anteriores, así que ni las tareas ni los resultados se acumulan en
+    memoria. Las filas se escriben en orden de llegada.
+    """
+    fit = OrderFit()
+    writer = RowWriter(path, fmt)
+    try:
+        if workers == 1:
+            for row in map(run_task, tasks):
+                _record(row, writer, fit, progress)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                if window is None:
+                    window = 4 * (workers or os.cpu_count() or 1)
+                tasks = iter(tasks)
+                pending = {pool.submit(run_task, task) for task in islice(tasks, window)}
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        _record(future.result(), writer, fit, progress)
+                    pending |= {pool.submit(run_task, task) for task in islice(tasks, len(done))}
+    finally:
+        writer.close()
+    return fit.orders()
+
+
+def _record(row: dict, writer: RowWriter, fit: OrderFit, progress) -> None:
+    writer.write(row)
+    fit.add(row)
+    if progress is not None:
+        progress(row)
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Estudio de convergencia de integración y diferenciación")
+    p.add_argument("--kind", choices=["integration", "differentiation", "both"], default="both")
+    p.add_argument("--integration-methods", nargs='+', choices=list(INTEGRATION_METHODS),
+                   default=list(INTEGRATION_METHODS))
+    p.add_argument("--differentiation-methods", nargs='+', choices=list(DIFFERENTIATION_METHODS),
+                   default=list(DIFFERENTIATION_METHODS))
+    p.add_argument("--integrands", nargs='+', choices=list(INTEGRANDS), default=["1+ln x"])
+    p.add_argument("--functions", nargs='+', choices=list(DIFFERENTIABLES), default=["x ln x"])
+    p.add_argument("--a", type=float, default=1.0, help="límite inferior a")
+    p.add_argument("--b", type=float, default=2.0, help="límite superior b")
+    p.add_argument("--x0", type=float, default=2.0, help="punto donde se deriva")
+    p.add_argument("--n-min", type=float, default=2, help="mínimo número de subintervalos")
+    p.add_argument("--n-max", type=float, default=1e4, help="máximo número de subintervalos")
+    p.add_argument("--h-min", type=float, default=1e-8, help="mínimo paso h")
+    p.add_argument("--h-max", type=float, default=0.5, help="máximo paso h")
+    p.add_argument("--points", type=int, default=15, help="puntos por barrido")
+    p.add_argument("--vectorized", action="store_true", help="usar las reglas de vectorized_tools (n grande)")
+    p.add_argument("--workers", type=int, default=None, help="procesos del pool (por defecto, núcleos)")
+    p.add_argument("--format", choices=["csv", "parquet"], default="csv", help="formato de salida")
+    p.add_argument("--outdir", type=str, default=None, help="carpeta de salida para resultados")
+    args = p.parse_args()
+    if args.format == "parquet" and pa is None:
+        p.error("--format parquet requiere pyarrow (pip install pyarrow)")
+    return args
+
+
+def main():
+    args = parse_args()
+    outdir = args.outdir or os.path.join(os.path.dirname(__file__), "outputs")
+    os.makedirs(outdir, exist_ok=True)
+    path = os.path.join(outdir, f"convergence_study.{args.format}")
+
+    def progress(row):
+        size = f"n={row['n']}" if row["n"] is not None else f"h={row['h']:.2e}"
+        print(f"  {row['method']:<22} {row['function']:<8} {size:<12} error={row['abs_error']:.3e}")
+
+    orders = run_study(build_tasks(args), path, args.format, args.workers, progress)
+
+    print("\nOrden de convergencia empírico (error ≈ C h^p):")
+    for (kind, method, name), (order, count) in sorted(orders.items()):
+        print(f"  {kind:<16} {method:<22} {name:<8} p = {order:5.2f}  ({count} puntos)")
+    print(f"Resultados guardados en: {path}")
+
+
+if __name__ == "__main__":
+    main()
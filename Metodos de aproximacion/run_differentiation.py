@@ -26,34 +26,37 @@ from numerical_tools import (
     three_point_forward,
     three_point_backward,
     exact_derivative_x_ln_x,
-    max_abs_on_interval,
+    memoize,
+    ridders_derivative,
 )
+from vectorized_tools import bound_on_interval, monotone_enclosure
+
+
+# Derivadas de f(x)=x ln x para las cotas: f''(x) = 1/x, f'''(x) = -1/x^2.
+# Se memoizan porque varias cotas muestrean la misma malla; al ser monótonas
+# en x > 0 las M se acotan de forma garantizada por intervalos.
+d2_x_ln_x = memoize(lambda x: 1.0 / x)
+d3_x_ln_x = memoize(lambda x: -1.0 / (x * x))
+D2_ENCLOSURE = monotone_enclosure(d2_x_ln_x)
+D3_ENCLOSURE = monotone_enclosure(d3_x_ln_x)
 
 
 def estimate_cota_forward(h: float, a: float, b: float) -> float:
     """Cota teórica aproximada para forward/backward (error ≤ M * |h| / 2),
     donde M = max |f''(x)| en [a,b]."""
-    # f(x)=x ln x => f''(x) = 1/x
-    def f2(x):
-        return 1.0 / x
-    M = max_abs_on_interval(f2, a, b)
+    M = bound_on_interval(d2_x_ln_x, a, b, enclosure=D2_ENCLOSURE)
     return M * abs(h) / 2.0
 
 
 def estimate_cota_central(h: float, a: float, b: float) -> float:
     """Cota para central (error ≈ M h^2 / 6) con M = max |f'''(x)|."""
-    # f(x)=x ln x => f'''(x) = -1/x^2
-    def f3(x):
-        return -1.0 / (x * x)
-    M = max_abs_on_interval(f3, a, b)
+    M = bound_on_interval(d3_x_ln_x, a, b, enclosure=D3_ENCLOSURE)
     return M * (h ** 2) / 6.0
 
 
 def estimate_cota_three_point(h: float, a: float, b: float) -> float:
     """Cota para fórmulas de 3 puntos (extremos), error ≈ M h^2 / 3, M = max |f'''|."""
-    def f3(x):
-        return -1.0 / (x * x)
-    M = max_abs_on_interval(f3, a, b)
+    M = bound_on_interval(d3_x_ln_x, a, b, enclosure=D3_ENCLOSURE)
     return M * (h ** 2) / 3.0
 
 
@@ -79,14 +82,19 @@ def main(x0: Optional[float] = None, h: Optional[float] = None, outdir: Optional
     a = x0 - 2 * h
     b = x0 + 2 * h
 
-    # Calcular aproximaciones
+    # Calcular aproximaciones. Las fórmulas comparten los puntos x0, x0±h y
+    # x0±2h: con la memoización f se evalúa 5 veces en lugar de 12
+    f = memoize(f_x_ln_x)
     approx = {
-        "Forward (1-step)": forward_difference(f_x_ln_x, x0, h),
-        "Backward (1-step)": backward_difference(f_x_ln_x, x0, h),
-        "Central (3-pt)": central_difference(f_x_ln_x, x0, h),
-        "3-pt forward (left)": three_point_forward(f_x_ln_x, x0, h),
-        "3-pt backward (right)": three_point_backward(f_x_ln_x, x0, h),
+        "Forward (1-step)": forward_difference(f, x0, h),
+        "Backward (1-step)": backward_difference(f, x0, h),
+        "Central (3-pt)": central_difference(f, x0, h),
+        "3-pt forward (left)": three_point_forward(f, x0, h),
+        "3-pt backward (right)": three_point_backward(f, x0, h),
     }
+    # Ridders parte de h y elige el paso por sí mismo; su "cota" es el error estimado
+    ridders = ridders_derivative(f, x0, h)
+    approx["Ridders (h automatico)"] = ridders.value
 
     exact = exact_derivative_x_ln_x(x0)
 
@@ -98,6 +106,8 @@ def main(x0: Optional[float] = None, h: Optional[float] = None, outdir: Optional
             cota = estimate_cota_forward(h, a, b)
         elif "Central" in name:
             cota = estimate_cota_central(h, a, b)
+        elif "Ridders" in name:
+            cota = ridders.error
         else:
             # 3-pt forward/backward endpoints
             cota = estimate_cota_three_point(h, a, b)
@@ -143,6 +153,9 @@ def main(x0: Optional[float] = None, h: Optional[float] = None, outdir: Optional
         if (pd is None):
             print("pandas no detectado: no se generó XLSX")
 
+    info = f.cache_info()
+    print(f"Evaluaciones de f: {info['evaluations']} ({info['hits']} reutilizadas desde la caché)")
+
 
 if __name__ == "__main__":
     main()
@@ -3,8 +3,9 @@ Runner para el inciso 2 de Objectives.md
 
 Calcula aproximaciones de la integral de f(x)=1+ln x en [1,2] usando varias
 reglas (punto medio, trapecio, Simpson, Simpson compuesta con 2 subintervalos,
-Punto medio compuesta con 5 subintervalos). Calcula la integral exacta, estima
-las cotas de error y exporta una tabla con los resultados.
+Punto medio compuesta con 5 subintervalos, Romberg). Calcula la integral
+exacta, estima las cotas de error y exporta una tabla con los resultados y el
+tableau de Romberg.
 """
 from __future__ import annotations
 import os
@@ -24,34 +25,42 @@ from numerical_tools import (
     simpson_rule,
     composite_simpson,
     composite_midpoint,
-    max_abs_on_interval,
+    romberg,
     exact_integral_of_1_plus_ln_x,
 )
+from vectorized_tools import bound_on_interval, monotone_enclosure
+
+
+# f(x)=1+ln x => f''(x) = -1/x^2, f''''(x) = -6/x^4. Ambas son monótonas en
+# x > 0, así que M = max |f^(k)| se acota de forma garantizada por intervalos
+def d2_1_plus_ln_x(x):
+    return -1.0 / (x * x)
+
+
+def d4_1_plus_ln_x(x):
+    return -6.0 / (x ** 4)
+
+
+D2_ENCLOSURE = monotone_enclosure(d2_1_plus_ln_x)
+D4_ENCLOSURE = monotone_enclosure(d4_1_plus_ln_x)
+
+
+def max_abs_d2(a: float, b: float) -> float:
+    """M = max |f''(x)| en [a,b] (en caché: varias cotas piden el mismo intervalo)."""
+    return bound_on_interval(d2_1_plus_ln_x, a, b, enclosure=D2_ENCLOSURE)
 
 
 def cota_midpoint(a: float, b: float) -> float:
     """Error acotado por ((b-a)^3 / 24) * M, con M = max |f''(x)| en [a,b]"""
-    # f(x)=1+ln x => f''(x) = -1/x^2
-    def f2(x):
-        return -1.0 / (x * x)
-    M = max_abs_on_interval(lambda x: abs(f2(x)), a, b)
-    return ((b - a) ** 3) / 24.0 * M
+    return ((b - a) ** 3) / 24.0 * max_abs_d2(a, b)
 
 
 def cota_trapezoid(a: float, b: float) -> float:
-    def f2(x):
-        return -1.0 / (x * x)
-    M = max_abs_on_interval(lambda x: abs(f2(x)), a, b)
-    return ((b - a) ** 3) / 12.0 * M
+    return ((b - a) ** 3) / 12.0 * max_abs_d2(a, b)
 
 
 def cota_simpson(a: float, b: float) -> float:
-    # f(x)=1+ln x => f''''(x) = 6 / x^4  ??? (calculado analíticamente si se desea)
-    # Para evitar errores simbólicos, estimamos M = max |f''''(x)| por muestreo.
-    def f4(x):
-        # derivada cuarta de 1 + ln x es 6 / x^4 ?
-        return 6.0 / (x ** 4)
-    M = max_abs_on_interval(lambda x: abs(f4(x)), a, b)
+    M = bound_on_interval(d4_1_plus_ln_x, a, b, enclosure=D4_ENCLOSURE)
     return ((b - a) ** 5) / 2880.0 * M
 
 
@@ -96,12 +105,13 @@ def main(a: Optional[float] = None, b: Optional[float] = None, outdir: Optional[
     # Para la cota compuesta del punto medio, cada subintervalo tiene h=(b-a)/n
     # y el error total ≤ n * ((h^3)/24) * max|f''| = (b-a) * h^2 / 24 * M
     h = (b - a) / 5.0
-    def f2(x):
-        return -1.0 / (x * x)
-    M2 = max_abs_on_interval(lambda x: abs(f2(x)), a, b)
-    cota_mid_comp = 5 * ((h ** 3) / 24.0) * M2
+    cota_mid_comp = 5 * ((h ** 3) / 24.0) * max_abs_d2(a, b)
     results.append(("Midpoint compuesta (5 subintervalos)", I_mid_comp, cota_mid_comp))
 
+    # Romberg: la "cota" es la diferencia entre los dos últimos elementos diagonales
+    romb = romberg(f_1_plus_ln_x, a, b, tol=1e-10)
+    results.append((f"Romberg ({romb.evaluations} evaluaciones)", romb.value, romb.error))
+
     # Exacto
     I_exact = exact_integral_of_1_plus_ln_x(a, b)
 
@@ -146,6 +156,18 @@ def main(a: Optional[float] = None, b: Optional[float] = None, outdir: Optional[
         if (pd is None):
             print("pandas no detectado: no se generó XLSX")
 
+    # Tableau de Romberg: fila k = trapecio con 2^k subintervalos y sus extrapolaciones
+    tableau_path = os.path.join(outdir, "romberg_tableau.csv")
+    with open(tableau_path, "w", newline='', encoding='utf-8') as fh:
+        writer = csv.writer(fh)
+        writer.writerow(["k"] + [f"R[k][{j}]" for j in range(len(romb.tableau))])
+        for k, row in enumerate(romb.tableau):
+            writer.writerow([k] + row)
+    print("Tableau de Romberg:")
+    for k, row in enumerate(romb.tableau):
+        print(f"  k={k}: " + "  ".join(f"{v:.12f}" for v in row))
+    print(f"CSV guardado en: {tableau_path}")
+
 
 if __name__ == "__main__":
     main()
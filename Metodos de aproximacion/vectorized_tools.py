@@ -0,0 +1,537 @@
+"""
+Módulo: vectorized_tools.py
+Versiones con NumPy de las reglas compuestas y de la estimación de cotas de
+`numerical_tools.py`, pensadas para los estudios de convergencia con n grande
+(hasta 1e6 subintervalos).
+
+En lugar de llamar al integrando un float a la vez, cada función construye la
+malla de nodos una sola vez, evalúa `f` sobre el arreglo completo y hace la
+suma ponderada de una vez (por parejas, compensada o con `np.dot`). Si `f`
+solo acepta escalares (por ejemplo, las funciones de `numerical_tools`, que
+usan `math`), se evalúa punto a punto como respaldo, así que cualquier
+callable sigue funcionando.
+
+`numerical_tools.py` se mantiene como referencia didáctica con `math` puro;
+los resultados de ambos módulos coinciden salvo redondeo.
+"""
+from __future__ import annotations
+import heapq
+import math
+import warnings
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import numpy as np
+
+from numerical_tools import (RIDDERS_DEFAULT_STEP, SUMMATION_METHODS, DerivativeResult,
+                             canonical_summation, gauss_legendre_nodes)
+
+
+def _call_vectorized(f: Callable, x: np.ndarray):
+    """`f(x)` como arreglo float, o None si `f` no acepta arreglos."""
+    try:
+        # math.* acepta arreglos de un elemento con un DeprecationWarning;
+        # se trata como función escalar
+        with np.errstate(all='ignore'), warnings.catch_warnings():
+            warnings.simplefilter('error', DeprecationWarning)
+            return np.asarray(f(x), dtype=float)
+    except Exception:
+        return None
+
+
+def evaluate(f: Callable, x: np.ndarray, batch: bool = False) -> np.ndarray:
+    """Evalúa `f` sobre el arreglo `x` y devuelve un arreglo de la misma forma.
+
+    Primero se intenta la llamada vectorizada `f(x)`. Si falla o devuelve
+    algo con otra forma (funciones escritas para escalares), se evalúa
+    punto a punto con floats de Python. Una función constante que devuelve
+    un escalar se expande a toda la malla.
+
+    Parámetros:
+    - f: función de un argumento (escalar o vectorizada)
+    - x: nodos donde evaluar (1-D)
+    - batch: aceptar también una salida de forma (k, x.size), es decir, k
+      funciones evaluadas en los mismos nodos
+
+    Devuelve:
+    - Arreglo float con f(x_i) en cada nodo (o de forma (k, x.size))
+    """
+    y = _call_vectorized(f, x)
+    if y is not None:
+        if y.shape == x.shape:
+            return y
+        if batch and y.ndim == 2 and y.shape[1] == x.size:
+            return y
+        if y.shape == ():
+            return np.full(x.shape, float(y))
+    return np.fromiter((f(float(t)) for t in x), dtype=float, count=x.size)
+
+
+# -----------------------------
+# DIFERENCIACIÓN NUMÉRICA
+# -----------------------------
+
+# Esténciles de f'(x_i) sobre una malla uniforme: (desplazamientos, coeficientes, divisor)
+# f'(x_i) ≈ sum(c_k * f(x_(i + d_k))) / (divisor * h)
+STENCILS = {
+    "forward": ((0, 1), (-1, 1), 1),
+    "backward": ((-1, 0), (-1, 1), 1),
+    "central": ((-1, 1), (-1, 1), 2),
+    "three_point_forward": ((0, 1, 2), (-3, 4, -1), 2),
+    "three_point_backward": ((-2, -1, 0), (1, -4, 3), 2),
+    "five_point": ((-2, -1, 1, 2), (1, -8, 8, -1), 12),
+}
+
+# Esténciles descentrados del mismo orden para los bordes de una tabla
+_FIVE_POINT_EDGES = (
+    ((0, 1, 2, 3, 4), (-25, 48, -36, 16, -3), 12),
+    ((-1, 0, 1, 2, 3), (-3, -10, 18, -6, 1), 12),
+    ((-3, -2, -1, 0, 1), (-1, 6, -18, 10, 3), 12),
+    ((-4, -3, -2, -1, 0), (3, -16, 36, -48, 25), 12),
+)
+_BOUNDARY_FALLBACKS = {
+    "forward": (STENCILS["backward"],),
+    "backward": (STENCILS["forward"],),
+    "central": (STENCILS["three_point_forward"], STENCILS["three_point_backward"]),
+    "three_point_forward": (STENCILS["three_point_backward"],),
+    "three_point_backward": (STENCILS["three_point_forward"],),
+    "five_point": _FIVE_POINT_EDGES,
+}
+
+
+def _stencil(method: str):
+    try:
+        return STENCILS[method]
+    except KeyError:
+        raise ValueError(f"método desconocido: {method!r} (opciones: {', '.join(STENCILS)})") from None
+
+
+def _apply_stencil(y: np.ndarray, stencil, start: int, stop: int, h: float) -> np.ndarray:
+    """Derivada en los índices start..stop-1 de `y` como suma de rebanadas."""
+    offsets, coefficients, divisor = stencil
+    total = np.zeros(stop - start)
+    for d, c in zip(offsets, coefficients):
+        total += c * y[start + d:stop + d]
+    return total / (divisor * h)
+
+
+def grid_derivative(y, h: float, method: str = "central") -> np.ndarray:
+    """Derivada de una función tabulada en una malla uniforme de paso h.
+
+    El esténcil `method` (ver `STENCILS`) se aplica a todos los puntos
+    interiores a la vez con rebanadas del arreglo. En los bordes, donde no
+    cabe, se usan fórmulas descentradas del mismo orden: la diferencia
+    opuesta para "forward"/"backward", las de 3 puntos en los extremos para
+    "central" y las de 5 puntos descentradas para "five_point".
+
+    Parámetros:
+    - y: valores f(x_0), ..., f(x_(n-1))
+    - h: paso de la malla
+    - method: nombre del esténcil
+
+    Devuelve:
+    - Arreglo con f'(x_i) en cada punto de la malla
+    """
+    y = np.asarray(y, dtype=float)
+    n = y.size
+    derivative = np.empty(n)
+    filled = np.zeros(n, dtype=bool)
+    for stencil in (_stencil(method),) + _BOUNDARY_FALLBACKS[method]:
+        offsets = stencil[0]
+        start, stop = max(0, -min(offsets)), n - max(0, max(offsets))
+        if start >= stop:
+            continue
+        todo = ~filled[start:stop]
+        if todo.any():
+            derivative[start:stop][todo] = _apply_stencil(y, stencil, start, stop, h)[todo]
+            filled[start:stop] = True
+    if not filled.all():
+        raise ValueError(f"la malla tiene muy pocos puntos ({n}) para el método {method!r}")
+    return derivative
+
+
+def derivative_on_grid(f: Callable, a: float, b: float, n: int, method: str = "central",
+                       inside: Optional[bool] = None):
+    """Derivada de `f` en los n puntos equiespaciados de [a,b] (extremos incluidos).
+
+    `f` se evalúa una sola vez en la malla extendida con los puntos que el
+    esténcil necesita fuera de [a,b] (como mucho 2 por lado), así que los
+    esténciles vecinos comparten evaluaciones: n + 4 evaluaciones con
+    "five_point" en lugar de 4n llamando a una fórmula por punto.
+
+    Con inside=True se evalúa solo en los n puntos de [a,b] y en los bordes
+    se aplican los esténciles descentrados de `grid_derivative`. Con
+    inside=None (por defecto) se decide solo: si evaluar fuera de [a,b]
+    falla o da valores no finitos (por ejemplo x*ln(x) con a cerca de 0),
+    se usa la malla interior.
+
+    Devuelve:
+    - (x, derivadas) como arreglos de n elementos
+    """
+    if n < 2:
+        raise ValueError("n debe ser al menos 2")
+    stencil = _stencil(method)
+    h = (b - a) / (n - 1)
+    x = a + np.arange(n) * h
+    left, right = max(0, -min(stencil[0])), max(0, max(stencil[0]))
+    if inside:
+        return x, grid_derivative(evaluate(f, x), h, method)
+
+    try:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            y = evaluate(f, a + np.arange(-left, n + right) * h)
+    except (ValueError, ArithmeticError):
+        if inside is not None:
+            raise
+        return x, grid_derivative(evaluate(f, x), h, method)
+    if inside is None and not (np.isfinite(y[:left]).all() and np.isfinite(y[left + n:]).all()):
+        return x, grid_derivative(y[left:left + n], h, method)
+    return x, _apply_stencil(y, stencil, left, left + n, h)
+
+
+def ridders_derivative(f: Callable, x, h=None, con: float = 1.4, max_steps: int = 10):
+    """Versión por lotes de `numerical_tools.ridders_derivative`.
+
+    Aplica el mismo tableau de Ridders a todos los puntos de `x` a la vez:
+    en cada nivel se evalúa `f` una sola vez sobre el arreglo [x + h, x - h].
+    Cada punto conserva su mejor estimación y deja de actualizarse cuando
+    su diagonal empieza a empeorar; el bucle termina cuando todos pararon.
+
+    Devuelve:
+    - DerivativeResult(value, error, evaluations, step) con arreglos de la
+      forma de `x`; evaluations cuenta las evaluaciones de f hechas en cada
+      punto (2 por nivel, hasta que el último punto para)
+    """
+    x = np.asarray(x, dtype=float)
+    shape = x.shape
+    x = x.ravel()
+    if h is None:
+        h = RIDDERS_DEFAULT_STEP
+    h = np.broadcast_to(np.asarray(h, dtype=float), x.shape).copy()
+    if np.any(h == 0.0):
+        raise ValueError("h debe ser distinto de cero")
+
+    def central(step):
+        values = evaluate(f, np.concatenate((x + step, x - step)))
+        return (values[:x.size] - values[x.size:]) / (2.0 * step)
+
+    con2 = con * con
+    previous = [central(h)]
+    best = previous[0].copy()
+    error = np.full(x.shape, np.inf)
+    step = h.copy()
+    levels = 1
+    active = np.ones(x.shape, dtype=bool)
+    for i in range(1, max_steps):
+        h = h / con
+        current = [central(h)]
+        levels += 1
+        factor = con2
+        for j in range(1, i + 1):
+            current.append((current[j - 1] * factor - previous[j - 1]) / (factor - 1.0))
+            factor *= con2
+            err = np.maximum(np.abs(current[j] - current[j - 1]), np.abs(current[j] - previous[j - 1]))
+            improved = active & (err <= error)
+            best = np.where(improved, current[j], best)
+            error = np.where(improved, err, error)
+            step = np.where(improved, h, step)
+        active &= np.abs(current[i] - previous[i - 1]) < 2.0 * error
+        if not active.any():
+            break
+        previous = current
+    return DerivativeResult(best.reshape(shape), error.reshape(shape),
+                            np.full(shape, 2 * levels), step.reshape(shape))
+
+
+# -----------------------------
+# BOUNDS / COTAS USANDO MUESTREO
+# -----------------------------
+
+def _sample_abs(func: Callable, t: np.ndarray) -> np.ndarray:
+    """|func(t)| en cada nodo; los puntos donde `func` lanza una excepción valen infinito."""
+    values = _call_vectorized(func, t)
+    if values is not None and values.shape == ():
+        values = np.full(t.shape, float(values))
+    elif values is None or values.shape != t.shape:
+        values = np.empty(t.size)
+        for i, ti in enumerate(t):
+            try:
+                values[i] = func(float(ti))
+            except Exception:
+                values[i] = np.inf
+    return np.abs(values)
+
+
+def max_abs_on_interval(func: Callable, a: float, b: float, samples: int = 1000) -> float:
+    """Versión vectorizada de `numerical_tools.max_abs_on_interval`.
+
+    Misma malla de `samples` puntos entre [a,b] y mismo criterio: los puntos
+    donde `func` lanza una excepción cuentan como infinito y los NaN se
+    ignoran.
+    """
+    if a > b:
+        a, b = b, a
+    if samples < 2:
+        samples = 2
+    t = np.linspace(a, b, samples)
+    # fmax ignora los NaN, igual que la comparación `v > max_val` del original
+    return float(np.fmax.reduce(_sample_abs(func, t), initial=0.0))
+
+
+INV_PHI = (np.sqrt(5.0) - 1.0) / 2.0
+
+# (func, a, b, parámetros) -> cota; se reutiliza entre llamadas a los cota_*.
+# LRU acotada: cada clave guarda una referencia a func
+_BOUND_CACHE: "OrderedDict[tuple, float]" = OrderedDict()
+BOUND_CACHE_SIZE = 128
+
+
+def _golden_section_max(func: Callable, lo: np.ndarray, hi: np.ndarray, tol: float) -> float:
+    """Máximo de |func| en los intervalos [lo[i], hi[i]] por sección dorada.
+
+    Todos los intervalos avanzan a la vez: cada iteración evalúa `func` una
+    sola vez sobre el arreglo con el punto nuevo de cada intervalo (|func|
+    unimodal en cada uno).
+    """
+    lo, hi = lo.astype(float), hi.astype(float)
+    c = hi - INV_PHI * (hi - lo)
+    d = lo + INV_PHI * (hi - lo)
+    gc, gd = _sample_abs(func, c), _sample_abs(func, d)
+    best = float(np.fmax.reduce(np.fmax(gc, gd), initial=0.0))
+    while np.any(hi - lo > tol * np.maximum(1.0, np.abs(lo) + np.abs(hi))):
+        # gc >= gd: el máximo está en [lo, d]; si no, en [c, hi]
+        left = gc >= gd
+        hi = np.where(left, d, hi)
+        lo = np.where(left, lo, c)
+        kept, g_kept = np.where(left, c, d), np.where(left, gc, gd)
+        x = np.where(left, hi - INV_PHI * (hi - lo), lo + INV_PHI * (hi - lo))
+        gx = _sample_abs(func, x)
+        c, gc = np.where(left, x, kept), np.where(left, gx, g_kept)
+        d, gd = np.where(left, kept, x), np.where(left, g_kept, gx)
+        best = max(best, float(np.fmax.reduce(gx, initial=0.0)))
+    return best
+
+
+def monotone_enclosure(func: Callable[[float], float]) -> Callable[[float, float], tuple]:
+    """Extensión por intervalos de una función monótona en el intervalo de estudio.
+
+    Para func monótona, el rango en [lo,hi] es [min, max] de func(lo) y
+    func(hi). Sirve como `enclosure` de `bound_on_interval`, por ejemplo
+    para las derivadas -1/x^2 o 6/x^4 de los ejercicios en x > 0.
+    """
+    def enclosure(lo: float, hi: float) -> tuple:
+        f_lo, f_hi = func(lo), func(hi)
+        return min(f_lo, f_hi), max(f_lo, f_hi)
+    return enclosure
+
+
+def bound_on_interval(func: Callable, a: float, b: float, samples: int = 256, candidates: int = None,
+                      tol: float = 1e-10, enclosure: Callable = None, max_cells: int = 10000) -> float:
+    """Estimación de max |func(x)| en [a,b] para las cotas de error.
+
+    Sustituye el muestreo de 1000 puntos de `max_abs_on_interval`:
+
+    1. |func| se evalúa de una vez en una malla de `samples` puntos.
+    2. Cada máximo local de la malla (o los `candidates` mayores, si se
+       indica) se refina con sección dorada entre sus vecinos, todos a la
+       vez, así que un máximo interior se localiza hasta `tol` en lugar de
+       quedar entre dos nodos de la malla. La malla debe tener al menos
+       unos 4 nodos por oscilación de |func|.
+    3. Si se da `enclosure(lo, hi) -> (mín, máx)`, una extensión por
+       intervalos de func (ver `monotone_enclosure`), el resultado es una
+       cota superior garantizada: se acota cada celda de la malla y se
+       bisecan las celdas cuya cota supera al mejor valor observado (poda
+       por ramificación y acotamiento) hasta que la diferencia es menor
+       que tol relativa o se alcanzan `max_cells` celdas.
+
+    Los resultados se guardan por (func, a, b, parámetros) en una caché
+    LRU de `BOUND_CACHE_SIZE` entradas, de modo que las funciones cota_*
+    que piden la misma M no vuelven a muestrear (ver `clear_bound_cache`).
+
+    Devuelve:
+    - M ≈ max |func| (o cota superior garantizada con `enclosure`)
+    """
+    if a > b:
+        a, b = b, a
+    key = (func, a, b, samples, candidates, tol, enclosure, max_cells)
+    cached = _BOUND_CACHE.get(key)
+    if cached is not None:
+        _BOUND_CACHE.move_to_end(key)
+        return cached
+
+    t = np.linspace(a, b, max(samples, 2))
+    values = _sample_abs(func, t)
+    best = float(np.fmax.reduce(values, initial=0.0))
+    if np.isfinite(best) and b > a:
+        # Máximos locales de la malla (los extremos cuentan con un solo vecino)
+        v = np.nan_to_num(values, nan=-1.0)
+        padded = np.concatenate(([-np.inf], v, [-np.inf]))
+        peaks = np.flatnonzero((v > padded[:-2]) & (v >= padded[2:]))
+        if candidates is not None:
+            peaks = peaks[np.argsort(v[peaks])[::-1][:candidates]]
+        lo = t[np.maximum(peaks - 1, 0)]
+        hi = t[np.minimum(peaks + 1, t.size - 1)]
+        best = max(best, _golden_section_max(func, lo, hi, tol))
+
+    if enclosure is not None and np.isfinite(best):
+        best = _enclosure_bound(enclosure, t, best, tol, max_cells)
+
+    _BOUND_CACHE[key] = best
+    while len(_BOUND_CACHE) > BOUND_CACHE_SIZE:
+        _BOUND_CACHE.popitem(last=False)
+    return best
+
+
+def _enclosure_bound(enclosure: Callable, t: np.ndarray, lower: float, tol: float, max_cells: int) -> float:
+    """Cota superior garantizada de |f| a partir de las celdas de la malla `t`."""
+    def cell_bound(lo, hi):
+        f_min, f_max = enclosure(lo, hi)
+        return max(abs(f_min), abs(f_max))
+
+    heap = [(-cell_bound(lo, hi), lo, hi) for lo, hi in zip(t[:-1], t[1:])]
+    heapq.heapify(heap)
+    cells = len(heap)
+    while heap and -heap[0][0] > lower * (1.0 + tol) and cells < max_cells:
+        _, lo, hi = heapq.heappop(heap)
+        mid = 0.5 * (lo + hi)
+        if not lo < mid < hi:
+            # Celda del tamaño de la precisión de máquina: no se puede dividir más
+            heapq.heappush(heap, (-cell_bound(lo, hi), lo, hi))
+            break
+        heapq.heappush(heap, (-cell_bound(lo, mid), lo, mid))
+        heapq.heappush(heap, (-cell_bound(mid, hi), mid, hi))
+        cells += 1
+    return max(lower, -heap[0][0]) if heap else lower
+
+
+def clear_bound_cache() -> None:
+    """Vacía la caché de `bound_on_interval`."""
+    _BOUND_CACHE.clear()
+
+
+# -----------------------------
+# INTEGRACIÓN NUMÉRICA
+# -----------------------------
+
+def weighted_sum(values: np.ndarray, weights: np.ndarray = None, summation: str = "pairwise") -> float:
+    """sum(weights * values) con el método de suma indicado.
+
+    - "naive" (o "dot"): np.dot (rápido; el orden de acumulación depende
+      de BLAS)
+    - "pairwise": np.sum, que suma por parejas (error O(log n))
+    - "kahan" / "neumaier": np.sum por bloques de 1024 y suma compensada
+      de los totales de bloque con `numerical_tools`
+    - "fsum": math.fsum, redondeo correcto del resultado exacto
+
+    Acepta los mismos nombres que `numerical_tools.SUMMATION_METHODS` y
+    sus sinónimos (`canonical_summation`).
+    """
+    summation = canonical_summation(summation)
+    if summation == "naive":
+        return float(np.dot(weights, values)) if weights is not None else float(np.sum(values))
+    terms = values * weights if weights is not None else values
+    if summation == "pairwise":
+        return float(np.sum(terms))
+    if summation in ("kahan", "neumaier"):
+        size = -(-terms.size // 1024) * 1024
+        blocks = np.zeros(size)
+        blocks[:terms.size] = terms
+        block_sums = blocks.reshape(-1, 1024).sum(axis=1)
+        return SUMMATION_METHODS[summation](block_sums.tolist())
+    return math.fsum(terms.tolist())
+
+
+def composite_midpoint(f: Callable, a: float, b: float, n: int, summation: str = "pairwise") -> float:
+    """Regla del punto medio compuesta con n subintervalos (n entero positivo).
+
+    Los n puntos medios a + (i + 1/2) h se generan de una vez; todos los
+    pesos valen h. `summation` elige la suma (ver `weighted_sum`).
+    """
+    if n <= 0:
+        raise ValueError("n debe ser entero positivo")
+    h = (b - a) / n
+    x = a + (np.arange(n) + 0.5) * h
+    return h * weighted_sum(evaluate(f, x), summation=summation)
+
+
+def composite_simpson(f: Callable, a: float, b: float, m: int, summation: str = "pairwise") -> float:
+    """Regla de Simpson compuesta usando `m` pares de subintervalos (n = 2*m).
+
+    Los nodos x_k = a + k h se calculan a partir del índice k (sin acumular
+    h en un bucle) y la suma usa los pesos 1, 4, 2, 4, ..., 2, 4, 1.
+    `summation` elige la suma (ver `weighted_sum`).
+    """
+    if m <= 0:
+        raise ValueError("m debe ser entero positivo")
+    n = 2 * m
+    h = (b - a) / n
+    x = a + np.arange(n + 1) * h
+    x[-1] = b
+    weights = np.empty(n + 1)
+    weights[1::2] = 4.0
+    weights[2::2] = 2.0
+    weights[0] = weights[-1] = 1.0
+    return (h / 3.0) * weighted_sum(evaluate(f, x), weights, summation)
+
+
+def gauss_legendre(f: Callable, a: float, b: float, order: int = 10, panels: int = 1):
+    """Versión vectorizada de `numerical_tools.gauss_legendre`.
+
+    Los nodos y pesos salen de la misma tabla del proceso
+    (`gauss_legendre_nodes`), así que una vez calculado el orden cada
+    integral cuesta order*panels evaluaciones y un producto punto.
+
+    Integrandos en lote: si `f(x)` devuelve un arreglo de forma (k, N) (k
+    funciones evaluadas en los N nodos), se devuelven las k integrales.
+    """
+    if panels <= 0:
+        raise ValueError("panels debe ser entero positivo")
+    nodes, weights = gauss_legendre_nodes(order)
+    half = 0.5 * (b - a) / panels
+    centers = a + (2 * np.arange(panels) + 1) * half
+    x = (centers[:, None] + half * np.asarray(nodes)[None, :]).ravel()
+    w = np.tile(half * np.asarray(weights), panels)
+
+    y = evaluate(f, x, batch=True)
+    if y.ndim == 2:
+        return y @ w
+    return float(np.dot(w, y))
+
+
+# -----------------------------
+# FUNCIONES ESPECÍFICAS DE LOS EJERCICIOS
+# -----------------------------
+
+def f_x_ln_x(x):
+    """f(x) = x * ln(x) para escalares o arreglos con x > 0."""
+    x = np.asarray(x, dtype=float)
+    if np.any(x <= 0.0):
+        raise ValueError("x debe ser > 0 para x*ln(x)")
+    return x * np.log(x)
+
+
+def f_1_plus_ln_x(x):
+    """f(x) = 1 + ln(x) para escalares o arreglos con x > 0."""
+    x = np.asarray(x, dtype=float)
+    if np.any(x <= 0.0):
+        raise ValueError("x debe ser > 0 para ln(x)")
+    return 1.0 + np.log(x)
+
+
+__all__ = [
+    "evaluate",
+    "STENCILS",
+    "grid_derivative",
+    "derivative_on_grid",
+    "ridders_derivative",
+    "max_abs_on_interval",
+    "monotone_enclosure",
+    "bound_on_interval",
+    "clear_bound_cache",
+    "weighted_sum",
+    "composite_midpoint",
+    "composite_simpson",
+    "gauss_legendre",
+    "f_x_ln_x",
+    "f_1_plus_ln_x",
+]
@@ -3,12 +3,27 @@ API Backend para PharmaKin
 Expone endpoints para simulación farmacocinética y acceso a datos
 """
 
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify, g, Response
 from flask_cors import CORS
 import numpy as np
-from numerical_methods import simulate_pharmacokinetics
+from numerical_methods import simulate_pharmacokinetics, simulate_batch, SOLVER_VERSION
+from numerical_methods import IMPLICIT_MODES, PRECISIONS, MAX_DECIMALS
+from catalog import PK_FIELDS, open_catalog, project
+from instrumentation import span, record, prometheus_text, profile_call
+from live_channel import LiveSession, decode_message
+from preview import preview_simulation
+from static_assets import StaticIndex
+import instrumentation
+import hashlib
 import json
 import os
+import time
+
+# WebSocket opcional: sin flask-sock el resto de la API funciona igual
+try:
+    from flask_sock import Sock
+except ImportError:
+    Sock = None
 
 # Configurar Flask para servir el frontend
 # En desarrollo: static_folder='../static' (fuera del backend)
@@ -30,20 +45,150 @@ if not static_path:
     # leave default (Flask will still create app with a non-existing folder but we will handle it)
     static_path = os.path.join(os.path.dirname(__file__), '..', 'static')
 
-app = Flask(__name__, static_folder=static_path, static_url_path='')
-CORS(app)  # Permitir CORS para el frontend React
+# La ruta estática propia de Flask se desactiva: `serve_frontend` sirve los
+# archivos desde un índice en memoria (static_assets.py) y hace el fallback SPA
+app = Flask(__name__, static_folder=None)
+# Permitir CORS para el frontend React; X-Next-Cursor (paginación del
+# catálogo) debe exponerse para que el navegador deje leerlo
+CORS(app, expose_headers=['X-Next-Cursor'])
 print(f"[startup] Flask serving static files from: {static_path}")
 
 # Cargar base de datos de principios activos
 DB_PATH = os.path.join(os.path.dirname(__file__), 'data', 'active_principles.json')
 
-def load_active_principles():
-    """Carga la base de datos de principios activos"""
-    try:
-        with open(DB_PATH, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return []
+# Catálogo en memoria (o compilado con build_catalog.py); se recarga solo si el archivo cambia
+catalog = open_catalog(DB_PATH)
+
+# Máximo de fármacos por petición de /api/compare
+MAX_COMPARE_DRUGS = 50
+
+
+def not_modified(etag: str) -> Response:
+    """Respuesta 304 para un cliente que ya tiene la versión `etag`"""
+    response = Response(status=304)
+    response.set_etag(etag)
+    return response
+
+
+def with_etag(response: Response, etag: str) -> Response:
+    """Agrega la ETag y obliga a revalidar antes de reutilizar la copia"""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def _positive_int(value: str) -> int:
+    """Conversión para parámetros de consulta enteros y positivos"""
+    number = int(value)
+    if number <= 0:
+        raise ValueError(value)
+    return number
+
+
+def simulation_etag(params: dict) -> str:
+    """
+    ETag de una simulación: hash de los parámetros canónicos (ya con
+    valores por defecto y tipos normalizados) más la versión de los
+    integradores, de modo que un cambio numérico invalida las copias.
+    """
+    canonical = json.dumps(params, sort_keys=True, separators=(',', ':'))
+    digest = hashlib.sha1(f'{SOLVER_VERSION}:{canonical}'.encode('utf-8')).hexdigest()
+    return f'sim-{digest[:24]}'
+
+
+class MissingParameter(Exception):
+    """Falta un parámetro requerido en el cuerpo de la simulación"""
+
+
+def parse_flag(data: dict, name: str) -> bool:
+    """
+    Parámetro booleano opcional: acepta true/false de JSON o las cadenas
+    "true"/"false" (sin distinguir mayúsculas). Cualquier otro valor lanza
+    ValueError en lugar de interpretarse por su "veracidad" ("false" es
+    una cadena no vacía).
+    """
+    value = data.get(name, False)
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.lower() in ('true', 'false'):
+        return value.lower() == 'true'
+    raise ValueError(f"Valor de '{name}' no válido: {value!r} (se espera true o false)")
+
+
+def parse_precision(data: dict) -> tuple:
+    """
+    Modo de precisión y decimales de las series: 'precision' debe ser uno
+    de PRECISIONS y 'decimals' un entero entre 0 y MAX_DECIMALS. Lanza
+    ValueError en otro caso.
+    """
+    precision = data.get('precision', 'float64')
+    if precision not in PRECISIONS:
+        raise ValueError(f"Valor de 'precision' no válido: {precision!r} (opciones: {', '.join(PRECISIONS)})")
+    decimals = int(data.get('decimals', 4))
+    if not 0 <= decimals <= MAX_DECIMALS:
+        raise ValueError(f"'decimals' debe estar entre 0 y {MAX_DECIMALS}")
+    return precision, decimals
+
+
+def parse_simulation_params(data: dict) -> dict:
+    """
+    Convierte el cuerpo JSON de una simulación en los argumentos de
+    `simulate_pharmacokinetics`, aplicando los valores por defecto.
+    
+    Lanza MissingParameter con el nombre del primer parámetro requerido
+    que no esté presente y ValueError si un valor no es válido.
+    """
+    # Validar parámetros requeridos
+    required = ['t_max', 'dt', 'V', 'Q', 'dose', 'route']
+    for param in required:
+        if param not in data:
+            raise MissingParameter(param)
+    
+    # Parámetros opcionales con valores por defecto
+    ka = data.get('ka', 1.0)
+    num_doses = data.get('num_doses', 1)
+    interval = data.get('interval', 0.0)
+    metrics_only = parse_flag(data, 'metrics_only')
+    cme = data.get('cme')
+    cmt = data.get('cmt')
+    implicit = data.get('implicit', 'auto')
+    if implicit not in IMPLICIT_MODES:
+        raise ValueError(f"Valor de 'implicit' no válido: {implicit!r} (opciones: {', '.join(IMPLICIT_MODES)})")
+    precision, decimals = parse_precision(data)
+    
+    return dict(
+        t_max=float(data['t_max']),
+        dt=float(data['dt']),
+        V=float(data['V']),
+        Q=float(data['Q']),
+        dose=float(data['dose']),
+        route=data['route'],
+        ka=ka if ka else None,
+        num_doses=int(num_doses),
+        interval=float(interval),
+        metrics_only=metrics_only,
+        cme=float(cme) if cme is not None else None,
+        cmt=float(cmt) if cmt is not None else None,
+        implicit=implicit,
+        precision=precision,
+        decimals=decimals
+    )
+
+
+@app.before_request
+def start_request_timer():
+    """Marca el inicio de la petición para medir la latencia por endpoint"""
+    if instrumentation.enabled:
+        g.request_start = time.perf_counter()
+
+
+@app.after_request
+def record_request_time(response):
+    """Registra la latencia de la petición bajo el nombre de su endpoint"""
+    start = g.pop('request_start', None)
+    if start is not None:
+        record('endpoint', request.endpoint or 'unknown', time.perf_counter() - start)
+    return response
 
 
 @app.route('/api/simulate', methods=['POST'])
@@ -61,57 +206,299 @@ def simulate():
         "route": "oral",
         "ka": 1.2,
         "num_doses": 4,
-        "interval": 6.0
+        "interval": 6.0,
+        "metrics_only": false,
+        "cme": 10.0,
+        "cmt": 200.0,
+        "implicit": "auto",
+        "precision": "float64",
+        "decimals": 4
     }
+    
+    Con "metrics_only": true solo se devuelven las métricas resumen
+    (AUC, Cmax/Tmax por dosis, valles, tiempo sobre CME/CMT).
+    "implicit" ('auto' | 'always' | 'never') controla el uso de
+    integradores implícitos cuando Q*dt/V hace inestables a Euler/RK4.
+    "precision" ('float64' | 'float32' | 'fixed') reduce el tamaño de las
+    series para gráficas; 'float64' se mantiene para el análisis de error.
+    Con el parámetro de consulta ?profile=1 la respuesta incluye un
+    resumen de cProfile de la simulación en el campo "profile".
+    
+    La respuesta lleva una ETag derivada de los parámetros; si el cliente
+    la reenvía en If-None-Match se responde 304 sin simular ni serializar.
     """
     try:
-        data = request.json
+        with span('parse_params'):
+            try:
+                params = parse_simulation_params(request.json)
+            except MissingParameter as e:
+                return jsonify({'error': f'Parámetro faltante: {e}'}), 400
+            except (ValueError, TypeError) as e:
+                return jsonify({'error': str(e)}), 400
         
-        # Validar parámetros requeridos
-        required = ['t_max', 'dt', 'V', 'Q', 'dose', 'route']
-        for param in required:
-            if param not in data:
-                return jsonify({'error': f'Parámetro faltante: {param}'}), 400
+        # Ejecutar simulación (con ?profile=1 se adjunta el resumen de cProfile)
+        if request.args.get('profile') == '1':
+            results, report = profile_call(simulate_pharmacokinetics, **params)
+            results['profile'] = report
+            return jsonify(results), 200
         
-        # Parámetros opcionales con valores por defecto
-        ka = data.get('ka', 1.0)
-        num_doses = data.get('num_doses', 1)
-        interval = data.get('interval', 0.0)
+        etag = simulation_etag(params)
+        if request.if_none_match.contains_weak(etag):
+            return not_modified(etag)
         
-        # Ejecutar simulación
-        results = simulate_pharmacokinetics(
-            t_max=float(data['t_max']),
-            dt=float(data['dt']),
-            V=float(data['V']),
-            Q=float(data['Q']),
-            dose=float(data['dose']),
-            route=data['route'],
-            ka=ka if ka else None,
-            num_doses=int(num_doses),
-            interval=float(interval)
-        )
+        # El usuario suele repetir la simulación agregando dosis o extendiendo t_max
+        results = simulate_pharmacokinetics(**params, incremental=True)
+        
+        with span('jsonify'):
+            response = jsonify(results)
+        return with_etag(response, etag), 200
         
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+def compute_live_simulation(data: dict, cancel) -> dict:
+    """Simulación para el canal en vivo, cancelable con el evento `cancel`"""
+    try:
+        params = parse_simulation_params(data)
+    except MissingParameter as e:
+        raise ValueError(f'Parámetro faltante: {e}')
+    return simulate_pharmacokinetics(**params, incremental=True, cancel=cancel)
+
+
+@app.route('/api/preview', methods=['POST'])
+def preview():
+    """
+    Vista previa aproximada de una simulación (ver preview.py)
+    
+    Recibe el mismo cuerpo que /api/simulate y responde en menos de un
+    milisegundo (unos 0,2-0,4 ms para ~240 puntos) con {"time",
+    "concentration", "preview": true}, interpolando curvas
+    precalculadas. Pensado para mover los controles de V, Q, dosis y ka;
+    al soltarlos se pide /api/simulate para el resultado definitivo.
+    """
+    try:
+        params = parse_simulation_params(request.json)
+    except MissingParameter as e:
+        return jsonify({'error': f'Parámetro faltante: {e}'}), 400
+    except (ValueError, TypeError) as e:
+        # Valores no numéricos, indicadores no booleanos o cuerpo que no es un objeto JSON
+        return jsonify({'error': f'Parámetros no válidos: {e}'}), 400
+    try:
+        with span('preview'):
+            results = preview_simulation(**params)
         return jsonify(results), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+def compute_live_preview(data: dict) -> dict:
+    """
+    Vista previa para el canal en vivo (se envía antes de la simulación).
+    Los parámetros no válidos lanzan ValueError, que LiveSession envía
+    como mensaje de error de la vista previa.
+    """
+    try:
+        params = parse_simulation_params(data)
+    except MissingParameter as e:
+        raise ValueError(f'Parámetro faltante: {e}')
+    except TypeError as e:
+        raise ValueError(f'Parámetros no válidos: {e}')
+    return preview_simulation(**params)
+
+
+if Sock is not None:
+    sock = Sock(app)
+
+    @sock.route('/api/live')
+    def live_simulation(ws):
+        """
+        Canal WebSocket de parámetros en vivo (ver live_channel.py).
+        
+        Las ráfagas de mensajes {"type": "params", ...} se agrupan, la
+        simulación en curso se cancela al llegar parámetros nuevos y solo
+        se envía el resultado de los últimos, como delta del anterior,
+        precedido por una vista previa aproximada.
+        """
+        session = LiveSession(compute_live_simulation, lambda message: ws.send(json.dumps(message)),
+                              preview=compute_live_preview)
+        session.start()
+        try:
+            while True:
+                raw = ws.receive()
+                if raw is None:
+                    break
+                try:
+                    message = decode_message(raw)
+                except ValueError as e:
+                    # Un mensaje malformado no cierra la conexión
+                    session.reject(f'Mensaje no válido: {e}')
+                    continue
+                if message.get('type') == 'params':
+                    session.submit(message)
+        finally:
+            session.close()
+
+
+def parse_compare_params(data: dict) -> dict:
+    """
+    Convierte el cuerpo JSON de /api/compare en la lista de IDs y la
+    pauta común. Lanza MissingParameter igual que `parse_simulation_params`.
+    """
+    for param in ['ids', 't_max', 'dt', 'dose', 'route']:
+        if param not in data:
+            raise MissingParameter(param)
+    precision, decimals = parse_precision(data)
+    
+    return dict(
+        ids=[int(i) for i in data['ids']],
+        t_max=float(data['t_max']),
+        dt=float(data['dt']),
+        dose=float(data['dose']),
+        route=data['route'],
+        num_doses=int(data.get('num_doses', 1)),
+        interval=float(data.get('interval', 0.0)),
+        metrics_only=parse_flag(data, 'metrics_only'),
+        precision=precision,
+        decimals=decimals
+    )
+
+
+@app.route('/api/compare', methods=['POST'])
+def compare():
+    """
+    Compara varios principios activos con la misma pauta en una sola petición
+    
+    Body esperado:
+    {
+        "ids": [1, 2, 5],
+        "t_max": 36.0,
+        "dt": 0.1,
+        "dose": 500.0,
+        "route": "oral",
+        "num_doses": 3,
+        "interval": 8.0,
+        "metrics_only": false,
+        "precision": "float64",
+        "decimals": 4
+    }
+    
+    V, Q, ka, CME y CMT de cada fármaco se toman de sus
+    pharmacokinetic_params en el catálogo y todos se simulan como un lote
+    (solución exacta). La respuesta tiene una malla "time" común y, en
+    "drugs", una entrada por ID en el orden pedido con su
+    "concentration" alineada a esa malla y sus "metrics".
+    """
+    try:
+        try:
+            params = parse_compare_params(request.json)
+        except MissingParameter as e:
+            return jsonify({'error': f'Parámetro faltante: {e}'}), 400
+        except (ValueError, TypeError) as e:
+            return jsonify({'error': str(e)}), 400
+        ids = params.pop('ids')
+        if not 0 < len(ids) <= MAX_COMPARE_DRUGS:
+            return jsonify({'error': f'Se requieren entre 1 y {MAX_COMPARE_DRUGS} IDs'}), 400
         
+        catalog.refresh()
+        # Tabla numérica de parámetros: no hace falta decodificar los registros
+        found, pk = catalog.pk_table(ids)
+        missing = [i for i, ok in zip(ids, found) if not ok]
+        if missing:
+            return jsonify({'error': 'Principio activo no encontrado', 'ids': missing}), 404
+        
+        # El resultado depende también de la versión del catálogo
+        etag = simulation_etag(dict(params, ids=ids, catalog=catalog.etag))
+        if request.if_none_match.contains_weak(etag):
+            return not_modified(etag)
+        
+        column = {field: pk[:, k] for k, field in enumerate(PK_FIELDS)}
+        if np.isnan(column['volume']).any() or np.isnan(column['clearance']).any():
+            return jsonify({'error': 'Faltan volume o clearance en pharmacokinetic_params'}), 422
+        
+        def optional(values: np.ndarray) -> list:
+            """Columna opcional con None en lugar de NaN"""
+            return [None if np.isnan(v) else float(v) for v in values]
+        
+        results = simulate_batch(
+            V=column['volume'].tolist(),
+            Q=column['clearance'].tolist(),
+            ka=optional(column['ka']),
+            cme=optional(column['cme']),
+            cmt=optional(column['cmt']),
+            **params
+        )
+        
+        drugs = []
+        for j, principle_id in enumerate(ids):
+            entry = {
+                'id': principle_id,
+                'commercial_name': catalog.commercial_name(principle_id),
+                'metrics': results['metrics'][j]
+            }
+            if 'concentrations' in results:
+                entry['concentration'] = results['concentrations'][j]
+            drugs.append(entry)
+        
+        body = {'drugs': drugs}
+        if 'time' in results:
+            body['time'] = results['time']
+        with span('jsonify'):
+            response = jsonify(body)
+        return with_etag(response, etag), 200
+    
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
 @app.route('/api/active-principles', methods=['GET'])
 def get_active_principles():
-    """Obtiene todos los principios activos"""
-    principles = load_active_principles()
-    return jsonify(principles), 200
+    """
+    Obtiene los principios activos
+    
+    Parámetros de consulta opcionales:
+    - view=compact: solo id, commercial_name y pharmacokinetic_params
+    - fields=id,commercial_name,...: proyección a los campos indicados
+    - limit=N y cursor=ID: paginación por ID; el cursor de la siguiente
+      página se envía en la cabecera X-Next-Cursor (ausente en la última)
+    """
+    try:
+        limit = _positive_int(request.args['limit']) if 'limit' in request.args else None
+        cursor = int(request.args['cursor']) if 'cursor' in request.args else None
+    except ValueError:
+        return jsonify({'error': 'limit y cursor deben ser enteros (limit > 0)'}), 400
+    fields = [f for f in request.args.get('fields', '').split(',') if f]
+    compact = request.args.get('view') == 'compact'
+    
+    catalog.refresh()
+    etag = catalog.etag
+    if request.query_string:
+        etag += '-' + hashlib.sha1(request.query_string).hexdigest()[:12]
+    if request.if_none_match.contains_weak(etag):
+        return not_modified(etag)
+    
+    principles, next_cursor = catalog.page(cursor, limit, compact=compact and not fields)
+    if fields:
+        principles = [project(p, fields) for p in principles]
+    
+    response = with_etag(jsonify(principles), etag)
+    if next_cursor is not None:
+        response.headers['X-Next-Cursor'] = str(next_cursor)
+    return response, 200
 
 
 @app.route('/api/active-principles/<int:principle_id>', methods=['GET'])
 def get_active_principle(principle_id):
     """Obtiene un principio activo específico por ID"""
-    principles = load_active_principles()
-    principle = next((p for p in principles if p['id'] == principle_id), None)
+    principle = catalog.refresh().get(principle_id)
     
     if principle:
-        return jsonify(principle), 200
+        etag = f'{catalog.etag}-{principle_id}'
+        if request.if_none_match.contains_weak(etag):
+            return not_modified(etag)
+        return with_etag(jsonify(principle), etag), 200
     else:
         return jsonify({'error': 'Principio activo no encontrado'}), 404
 
@@ -120,18 +507,20 @@ def get_active_principle(principle_id):
 def search_active_principles():
     """Busca principios activos por nombre"""
     query = request.args.get('q', '').lower()
-    principles = load_active_principles()
-    
-    if query:
-        filtered = [
-            p for p in principles
-            if query in p.get('commercial_name', '').lower() or
-               query in p.get('formula_name', '').lower() or
-               query in p.get('description', '').lower()
-        ]
-        return jsonify(filtered), 200
-    else:
-        return jsonify(principles), 200
+    catalog.refresh()
+    
+    etag = f'{catalog.etag}-q{hashlib.sha1(query.encode("utf-8")).hexdigest()[:12]}'
+    if request.if_none_match.contains_weak(etag):
+        return not_modified(etag)
+    
+    # Solo se decodifican los registros que coinciden (catálogo compilado)
+    return with_etag(jsonify(catalog.search(query)), etag), 200
+
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Métricas de latencia por etapa y por endpoint en formato Prometheus"""
+    return Response(prometheus_text(), mimetype='text/plain; version=0.0.4')
 
 
 @app.route('/api/health', methods=['GET'])
@@ -141,39 +530,34 @@ def health():
 
 
 # Servir el frontend en producción
+# El índice de archivos estáticos se construye una sola vez al arrancar
+static_index = StaticIndex(static_path) if os.path.isdir(static_path) else None
+
+
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve_frontend(path):
     """Sirve el frontend React en producción"""
-    static_dir = app.static_folder
+    static_dir = static_path
     
     # Si no existe el directorio estático, retornar error útil
-    if not os.path.exists(static_dir):
+    if static_index is None:
         return jsonify({
             'error': 'Frontend no encontrado',
             'static_folder': static_dir,
             'message': 'El frontend no se construyó correctamente. Verifica el build.'
         }), 500
     
-    # Si es la raíz o una ruta de la app, servir index.html
-    if path == '' or not path.startswith('api') and not os.path.exists(os.path.join(static_dir, path)):
-        index_path = os.path.join(static_dir, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(static_dir, 'index.html')
-        else:
-            return jsonify({
-                'error': 'index.html no encontrado',
-                'static_folder': static_dir,
-                'files': os.listdir(static_dir) if os.path.exists(static_dir) else []
-            }), 500
-    
-    # Servir archivos estáticos (JS, CSS, imágenes, etc.)
-    file_path = os.path.join(static_dir, path)
-    if os.path.exists(file_path) and os.path.isfile(file_path):
-        return send_from_directory(static_dir, path)
-    else:
-        # Si no existe el archivo, servir index.html para SPA routing
-        return send_from_directory(static_dir, 'index.html')
+    # Archivos estáticos (JS, CSS, imágenes, etc.) desde el índice en memoria;
+    # cualquier otra ruta recibe index.html para el enrutamiento de la SPA
+    response = static_index.response(path, request)
+    if response is None:
+        return jsonify({
+            'error': 'index.html no encontrado',
+            'static_folder': static_dir,
+            'files': sorted(static_index.files)
+        }), 500
+    return response
 
 
 if __name__ == '__main__':
@@ -0,0 +1,240 @@
+"""
+Variante ASGI de la API de PharmaKin
+Expone las mismas rutas que `app.py` (la aplicación Flask) detrás de un
+bucle de eventos, sin bloquear el servidor con el cálculo numérico:
+
+- /api/health se responde directamente en el bucle de eventos.
+- Las simulaciones (/api/simulate, /api/compare) se ejecutan en un pool
+  acotado de procesos. Si ya hay demasiadas en curso se responde 503
+  (backpressure) y, si una tarda más que el límite, 504.
+- El resto (catálogo, vista previa, métricas, frontend) son peticiones
+  cortas que se atienden con un pool de hilos.
+
+Así muchas simulaciones lentas ya no dejan sin atender al catálogo ni a
+/api/health. Uso:
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+
+Configuración por variables de entorno:
+    PHARMAKIN_WORKERS      procesos de simulación (por defecto, núcleos)
+    PHARMAKIN_MAX_PENDING  simulaciones admitidas a la vez (por defecto 4 x procesos)
+    PHARMAKIN_TIMEOUT      segundos máximos por simulación (por defecto 30)
+
+Limitaciones: el canal WebSocket /api/live solo existe en el servidor
+WSGI (flask-sock), y las métricas por etapa de /api/metrics solo incluyen
+lo medido en el proceso principal.
+"""
+
+import asyncio
+import io
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+# Rutas cuyo trabajo es de CPU y se envían al pool de procesos
+SIMULATION_PATHS = ('/api/simulate', '/api/compare')
+
+SIMULATION_WORKERS = int(os.getenv('PHARMAKIN_WORKERS', os.cpu_count() or 1))
+MAX_PENDING = int(os.getenv('PHARMAKIN_MAX_PENDING', 4 * SIMULATION_WORKERS))
+SIMULATION_TIMEOUT = float(os.getenv('PHARMAKIN_TIMEOUT', '30'))
+
+Response = Tuple[int, List[Tuple[str, str]], bytes]
+
+
+def build_environ(scope: dict, body: bytes) -> dict:
+    """
+    Entorno WSGI equivalente a la petición ASGI `scope`, sin los objetos
+    de flujo (wsgi.input / wsgi.errors), para poder enviarlo a otro proceso.
+    """
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'],
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': str(server[0]),
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'] = str(scope['client'][0])
+    for raw_name, raw_value in scope.get('headers', []):
+        name = raw_name.decode('latin-1').upper().replace('-', '_')
+        value = raw_value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name != 'CONTENT_LENGTH':
+            key = f'HTTP_{name}'
+            environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+def run_wsgi(environ: dict, body: bytes) -> Response:
+    """
+    Ejecuta la petición en la aplicación Flask de `app.py` y devuelve
+    (código, cabeceras, cuerpo). Corre en un hilo o en un proceso del pool;
+    en este último caso importa `app` la primera vez que se usa.
+    """
+    from app import app as flask_app
+
+    environ = dict(environ, **{
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.version': (1, 0),
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    })
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started['status'] = int(status.split(' ', 1)[0])
+        started['headers'] = headers
+
+    result = flask_app(environ, start_response)
+    try:
+        data = b''.join(result)
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+    return started['status'], started['headers'], data
+
+
+def _warm_up() -> None:
+    """Importa la aplicación en el proceso del pool antes de la primera petición."""
+    import app  # noqa: F401
+
+
+def _json_response(status: int, payload: dict, extra: Optional[list] = None) -> Response:
+    headers = [('Content-Type', 'application/json')] + (extra or [])
+    return status, headers, json.dumps(payload).encode('utf-8')
+
+
+class PharmaKinASGI:
+    """
+    Aplicación ASGI que reparte las peticiones entre el bucle de eventos,
+    un pool de hilos (peticiones cortas) y un pool de procesos (simulaciones).
+
+    Parámetros:
+    -----------
+    workers : int
+        Procesos de simulación
+    max_pending : int
+        Simulaciones admitidas a la vez (en cola o en curso); por encima
+        se responde 503 con Retry-After
+    timeout : float
+        Segundos máximos de espera por simulación antes de responder 504
+    """
+
+    def __init__(self, workers: int = SIMULATION_WORKERS, max_pending: int = MAX_PENDING,
+                 timeout: float = SIMULATION_TIMEOUT):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.pending = 0
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self._threads: Optional[ThreadPoolExecutor] = None
+
+    def start(self) -> None:
+        """Crea los pools (se llama en el arranque del servidor o en la primera petición)."""
+        if self._processes is None:
+            # 'spawn' evita heredar hilos y locks del proceso principal
+            context = multiprocessing.get_context('spawn')
+            self._processes = ProcessPoolExecutor(self.workers, mp_context=context)
+            for _ in range(self.workers):
+                self._processes.submit(_warm_up)
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(thread_name_prefix='pharmakin-io')
+
+    def shutdown(self) -> None:
+        """Detiene los pools, cancelando las simulaciones que sigan en cola."""
+        if self._processes is not None:
+            self._processes.shutdown(wait=False, cancel_futures=True)
+            self._processes = None
+        if self._threads is not None:
+            self._threads.shutdown(wait=False)
+            self._threads = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            body = await self._read_body(receive)
+            status, headers, data = await self.handle(scope, body)
+            await send({
+                'type': 'http.response.start',
+                'status': status,
+                'headers': [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers],
+            })
+            await send({'type': 'http.response.body', 'body': data})
+        elif scope['type'] == 'websocket':
+            # /api/live solo está disponible en el servidor WSGI
+            await send({'type': 'websocket.close', 'code': 1008})
+
+    async def handle(self, scope: dict, body: bytes) -> Response:
+        """Respuesta (código, cabeceras, cuerpo) para una petición HTTP."""
+        self.start()
+        path = scope['path']
+        if path == '/api/health':
+            return _json_response(200, {'status': 'ok'})
+
+        environ = build_environ(scope, body)
+        loop = asyncio.get_running_loop()
+        if path not in SIMULATION_PATHS:
+            return await loop.run_in_executor(self._threads, run_wsgi, environ, body)
+
+        if self.pending >= self.max_pending:
+            return _json_response(503, {'error': 'Servidor ocupado, reintenta en unos segundos'},
+                                  [('Retry-After', '1')])
+
+        # La plaza se libera cuando el proceso termina (no al vencer el plazo),
+        # así el límite refleja el trabajo que realmente ocupa el pool
+        self.pending += 1
+        future = self._processes.submit(run_wsgi, environ, body)
+        future.add_done_callback(lambda _: self._release(loop))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            future.cancel()
+            return _json_response(504, {'error': f'La simulación superó {self.timeout:g} s'})
+        except Exception as e:
+            # p. ej. un proceso del pool terminó de forma inesperada
+            return _json_response(500, {'error': str(e)})
+
+    def _release(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Libera una plaza del pool (desde el hilo que completa el futuro)."""
+        def decrement():
+            self.pending -= 1
+        try:
+            loop.call_soon_threadsafe(decrement)
+        except RuntimeError:
+            # El bucle ya se cerró (apagado del servidor)
+            pass
+
+    @staticmethod
+    async def _read_body(receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body'):
+                return b''.join(chunks)
+
+    async def _lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self.start()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+app = PharmaKinASGI()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+"""
+Compila la base de datos de principios activos al formato binario
+que el servidor abre con mmap (ver catalog.CompiledCatalog).
+
+Uso: python build_catalog.py [--source data/active_principles.json] [--target data/active_principles.bin]
+
+Si el JSON se edita después de compilar, el servidor recompila el .bin al
+detectar el cambio; si no puede escribirlo, usa el JSON directamente hasta
+que se vuelva a ejecutar este script.
+"""
+
+import argparse
+import os
+
+from catalog import compile_catalog
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Compila el catálogo de principios activos")
+    p.add_argument("--source", type=str, default=os.path.join(DATA_DIR, 'active_principles.json'),
+                   help="catálogo JSON de origen")
+    p.add_argument("--target", type=str, default=os.path.join(DATA_DIR, 'active_principles.bin'),
+                   help="archivo binario de salida")
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    n = compile_catalog(args.source, args.target)
+    print(f"Catálogo compilado: {n} registros -> {args.target}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,501 @@
+"""
+Catálogo de principios activos en memoria
+Carga `data/active_principles.json` una vez y solo lo vuelve a leer si el
+archivo cambia (tamaño o fecha de modificación), por ejemplo al editar el
+volumen de datos de Docker. Cada versión del catálogo tiene una ETag
+(hash del contenido) para responder 304 a los clientes que ya la tienen.
+
+Para catálogos grandes existe además un formato binario compilado
+(`build_catalog.py`) que se abre con mmap en tiempo O(1) y decodifica
+cada registro solo cuando se pide (ver CompiledCatalog).
+"""
+
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Campos que necesita el selector de fármacos del panel principal
+COMPACT_FIELDS = ('id', 'commercial_name', 'pharmacokinetic_params')
+
+# Campos en los que busca /api/active-principles/search
+SEARCH_FIELDS = ('commercial_name', 'formula_name', 'description')
+
+# Columnas de la tabla numérica de parámetros farmacocinéticos (pk_table)
+PK_FIELDS = ('half_life', 'volume', 'clearance', 'ka', 'cme', 'cmt')
+
+
+def project(record: dict, fields: Iterable[str]) -> dict:
+    """Copia de `record` solo con los campos pedidos que existan."""
+    return {f: record[f] for f in fields if f in record}
+
+
+def search_text(record: dict) -> str:
+    """Texto en minúsculas de los campos de búsqueda, separados por NUL
+    para que una consulta no coincida a caballo entre dos campos."""
+    return '\0'.join(str(record.get(f) or '') for f in SEARCH_FIELDS).lower()
+
+
+def pk_row(record: dict) -> List[float]:
+    """Fila de PK_FIELDS de `record` como floats (NaN si falta el parámetro)."""
+    pk = record.get('pharmacokinetic_params') or {}
+    return [float(pk[f]) if pk.get(f) is not None else np.nan for f in PK_FIELDS]
+
+
+class ActivePrincipleCatalog:
+    """
+    Catálogo de principios activos con versión (ETag).
+
+    Parámetros:
+    -----------
+    path : str
+        Ruta del archivo JSON con la lista de principios activos
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.records: List[dict] = []
+        self.by_id: Dict[int, dict] = {}
+        self.compact: List[dict] = []
+        self._ids: List[int] = []
+        self._id_array = np.zeros(0, dtype='<i8')
+        self._params = np.zeros((0, len(PK_FIELDS)))
+        self.etag = hashlib.sha1(b'[]').hexdigest()[:20]
+        self._signature = None
+        self._lock = threading.Lock()
+
+    def refresh(self) -> 'ActivePrincipleCatalog':
+        """Recarga el archivo si cambió desde la última lectura."""
+        try:
+            st = os.stat(self.path)
+            signature = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            signature = None
+        if signature == self._signature:
+            return self
+
+        with self._lock:
+            if signature != self._signature:
+                self._load(signature)
+        return self
+
+    def _load(self, signature) -> None:
+        raw = b'[]'
+        if signature is not None:
+            with open(self.path, 'rb') as f:
+                raw = f.read()
+        records = json.loads(raw.decode('utf-8'))
+        # Orden estable por ID para paginar con cursor
+        records.sort(key=lambda p: p['id'])
+
+        self.records = records
+        self.by_id = {p['id']: p for p in records}
+        self.compact = [project(p, COMPACT_FIELDS) for p in records]
+        self._ids = [p['id'] for p in records]
+        self._id_array = np.array(self._ids, dtype='<i8')
+        self._params = np.array([pk_row(p) for p in records], dtype=float).reshape(-1, len(PK_FIELDS))
+        self.etag = hashlib.sha1(raw).hexdigest()[:20]
+        self._signature = signature
+
+    def get(self, principle_id: int) -> Optional[dict]:
+        """Principio activo por ID (None si no existe)."""
+        return self.by_id.get(principle_id)
+
+    def pharmacokinetic_params(self, principle_id: int) -> Optional[dict]:
+        """Parámetros farmacocinéticos del principio activo `principle_id`."""
+        record = self.by_id.get(principle_id)
+        return record.get('pharmacokinetic_params') if record else None
+
+    def commercial_name(self, principle_id: int) -> Optional[str]:
+        """Nombre comercial del principio activo `principle_id`."""
+        record = self.by_id.get(principle_id)
+        return record.get('commercial_name') if record else None
+
+    def pk_table(self, ids: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Parámetros farmacocinéticos numéricos de varios principios activos,
+        para simularlos como un lote.
+
+        Retorna:
+        --------
+        tuple
+            (found, params): found[j] indica si ids[j] existe y params es
+            un arreglo (len(ids), len(PK_FIELDS)) con NaN en los campos
+            ausentes (y en las filas de IDs inexistentes)
+        """
+        return _pk_lookup(self._id_array, self._params, ids)
+
+    def search(self, query: str) -> List[dict]:
+        """
+        Registros cuyo nombre comercial, fórmula o descripción contienen
+        `query` (sin distinguir mayúsculas); todos si `query` está vacío.
+        """
+        query = query.lower()
+        if not query:
+            return self.records
+        return [p for p in self.records if query in search_text(p)]
+
+    def page(self, cursor: Optional[int] = None, limit: Optional[int] = None,
+             compact: bool = False) -> Tuple[List[dict], Optional[int]]:
+        """
+        Página de registros ordenados por ID.
+
+        Parámetros:
+        -----------
+        cursor : int, opcional
+            ID del último registro de la página anterior; la página empieza
+            en el primer ID mayor que el cursor
+        limit : int, opcional
+            Tamaño máximo de la página (sin límite si es None)
+        compact : bool
+            Usar la proyección compacta precalculada (COMPACT_FIELDS)
+
+        Retorna:
+        --------
+        tuple
+            (registros, cursor de la página siguiente o None si es la última)
+        """
+        source = self.compact if compact else self.records
+        start = 0 if cursor is None else bisect.bisect_right(self._ids, cursor)
+        end = len(source) if limit is None else min(len(source), start + limit)
+        next_cursor = self._ids[end - 1] if end < len(source) and end > start else None
+        return source[start:end], next_cursor
+
+
+
+
+# -----------------------------
+# CATÁLOGO COMPILADO (BINARIO)
+# -----------------------------
+#
+# Estructura del archivo (little-endian):
+#   cabecera     : magic (8 bytes), versión (u32), número de registros n (u32),
+#                  tamaño del texto de búsqueda (u64), SHA-1 del JSON de origen
+#                  (20 bytes), relleno (4 bytes)
+#   índice       : n entradas de ancho fijo ordenadas por id (INDEX_DTYPE)
+#   parámetros   : n x len(PK_FIELDS) float64 (NaN si falta el parámetro)
+#   búsqueda     : search_text() de cada registro terminado en NUL (UTF-8)
+#   blob         : JSON completo y JSON compacto (COMPACT_FIELDS) de cada registro
+
+CATALOG_MAGIC = b'PKCATLG\0'
+CATALOG_FORMAT_VERSION = 2
+HEADER = struct.Struct('<8sIIQ20s4x')
+INDEX_DTYPE = np.dtype([
+    ('id', '<i8'),
+    ('record_offset', '<u8'),
+    ('record_length', '<u4'),
+    ('compact_offset', '<u8'),
+    ('compact_length', '<u4'),
+    ('search_offset', '<u8'),
+])
+
+
+def _pk_lookup(sorted_ids: np.ndarray, params: np.ndarray, ids: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+    """Filas de `params` (alineada con `sorted_ids`) para los `ids` pedidos."""
+    ids = np.asarray(ids, dtype='<i8')
+    table = np.full((len(ids), len(PK_FIELDS)), np.nan)
+    if len(sorted_ids) == 0:
+        return np.zeros(len(ids), dtype=bool), table
+    positions = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids) - 1)
+    found = sorted_ids[positions] == ids
+    table[found] = params[positions[found]]
+    return found, table
+
+
+def _encode(record: dict) -> bytes:
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def compile_catalog(source: str, target: str) -> int:
+    """
+    Compila el catálogo JSON `source` al formato binario `target`.
+
+    Retorna:
+    --------
+    int
+        Número de registros escritos
+    """
+    with open(source, 'rb') as f:
+        raw = f.read()
+    records = sorted(json.loads(raw.decode('utf-8')), key=lambda p: p['id'])
+    n = len(records)
+
+    params = np.array([pk_row(p) for p in records], dtype='<f8').reshape(n, len(PK_FIELDS))
+    record_lengths, compact_lengths, search_lengths = [], [], []
+    chunks, texts = [], []
+    for i, record in enumerate(records):
+        encoded = _encode(record)
+        # El JSON compacto conserva los tipos y claves originales (50 sigue siendo 50)
+        compact = _encode(project(record, COMPACT_FIELDS))
+        text = search_text(record).encode('utf-8') + b'\0'
+        chunks += (encoded, compact)
+        texts.append(text)
+        record_lengths.append(len(encoded))
+        compact_lengths.append(len(compact))
+        search_lengths.append(len(text))
+    blob = b''.join(chunks)
+    search = b''.join(texts)
+
+    # Cada registro va seguido de su JSON compacto dentro del blob
+    sizes = np.column_stack((record_lengths, compact_lengths)).reshape(-1).astype(np.uint64)
+    offsets = np.concatenate(([0], np.cumsum(sizes)[:-1])).astype(np.uint64)
+    index = np.zeros(n, dtype=INDEX_DTYPE)
+    index['id'] = [p['id'] for p in records]
+    index['record_offset'] = offsets[0::2]
+    index['record_length'] = record_lengths
+    index['compact_offset'] = offsets[1::2]
+    index['compact_length'] = compact_lengths
+    index['search_offset'] = np.concatenate(([0], np.cumsum(search_lengths)[:-1])).astype(np.uint64)
+
+    # Nombre temporal por proceso: varios procesos pueden recompilar a la vez
+    tmp = f'{target}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(HEADER.pack(CATALOG_MAGIC, CATALOG_FORMAT_VERSION, n, len(search),
+                            hashlib.sha1(raw).digest()))
+        f.write(index.tobytes())
+        f.write(params.tobytes())
+        f.write(search)
+        f.write(blob)
+    # Reemplazo atómico: un servidor con el archivo anterior mapeado no se ve afectado
+    os.replace(tmp, target)
+    return n
+
+
+class CompiledCatalog:
+    """
+    Catálogo compilado con acceso perezoso por mmap.
+
+    Abrirlo solo lee la cabecera y crea vistas NumPy sobre el índice y la
+    tabla de parámetros; los registros se decodifican al pedirlos, así que
+    el arranque y la recarga cuestan O(1) y la memoria no crece con el
+    tamaño del catálogo. Expone la misma interfaz que ActivePrincipleCatalog.
+
+    Parámetros:
+    -----------
+    path : str
+        Ruta del archivo generado por `compile_catalog`
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.etag = hashlib.sha1(b'[]').hexdigest()[:20]
+        self._signature = None
+        self._lock = threading.Lock()
+        self._mmap: Optional[mmap.mmap] = None
+        self._ids = np.zeros(0, dtype='<i8')
+        self._index = np.zeros(0, dtype=INDEX_DTYPE)
+        self._params = np.zeros((0, len(PK_FIELDS)))
+        self._search_span = (0, 0)
+        self._blob = memoryview(b'')
+
+    def refresh(self) -> 'CompiledCatalog':
+        """Vuelve a mapear el archivo si cambió desde la última apertura."""
+        st = os.stat(self.path)
+        signature = (st.st_mtime_ns, st.st_size)
+        if signature == self._signature:
+            return self
+        with self._lock:
+            if signature != self._signature:
+                self._open(signature)
+        return self
+
+    def _open(self, signature) -> None:
+        with open(self.path, 'rb') as f:
+            # mmap de un archivo vacío lanza ValueError
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, n, search_size, digest = HEADER.unpack_from(mm, 0)
+        except struct.error:
+            magic = version = None
+        if magic != CATALOG_MAGIC or version != CATALOG_FORMAT_VERSION:
+            mm.close()
+            raise ValueError(f'Catálogo compilado no válido: {self.path}')
+
+        index_start = HEADER.size
+        params_start = index_start + n * INDEX_DTYPE.itemsize
+        search_start = params_start + n * len(PK_FIELDS) * 8
+        blob_start = search_start + search_size
+
+        # Vistas sin copia sobre el archivo mapeado
+        previous = self._mmap
+        self._mmap = mm
+        self._index = np.frombuffer(mm, dtype=INDEX_DTYPE, count=n, offset=index_start)
+        self._ids = self._index['id']
+        self._params = np.frombuffer(mm, dtype='<f8', count=n * len(PK_FIELDS),
+                                     offset=params_start).reshape(n, len(PK_FIELDS))
+        self._search_span = (search_start, blob_start)
+        self._blob = memoryview(mm)[blob_start:]
+        self.etag = digest.hex()[:20]
+        self._signature = signature
+
+        if previous is not None:
+            try:
+                previous.close()
+            except BufferError:
+                # Una petición en curso aún usa vistas del mapa anterior; se
+                # libera cuando esas vistas se recolectan
+                pass
+
+    def close(self) -> None:
+        """Libera el archivo mapeado."""
+        with self._lock:
+            mm = self._mmap
+            self.__init__(self.path)
+            if mm is not None:
+                try:
+                    mm.close()
+                except BufferError:
+                    pass
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _decode(self, i: int) -> dict:
+        entry = self._index[i]
+        start = int(entry['record_offset'])
+        return json.loads(bytes(self._blob[start:start + int(entry['record_length'])]).decode('utf-8'))
+
+    def _decode_compact(self, i: int) -> dict:
+        entry = self._index[i]
+        start = int(entry['compact_offset'])
+        return json.loads(bytes(self._blob[start:start + int(entry['compact_length'])]).decode('utf-8'))
+
+    def _position(self, principle_id: int) -> Optional[int]:
+        i = int(np.searchsorted(self._ids, principle_id))
+        return i if i < len(self._ids) and self._ids[i] == principle_id else None
+
+    def get(self, principle_id: int) -> Optional[dict]:
+        """Principio activo por ID, decodificado bajo demanda (búsqueda binaria)."""
+        i = self._position(principle_id)
+        return self._decode(i) if i is not None else None
+
+    def pharmacokinetic_params(self, principle_id: int) -> Optional[dict]:
+        """Solo los parámetros farmacocinéticos, leídos del JSON compacto."""
+        i = self._position(principle_id)
+        return self._decode_compact(i).get('pharmacokinetic_params') if i is not None else None
+
+    def commercial_name(self, principle_id: int) -> Optional[str]:
+        """Nombre comercial, leído del JSON compacto."""
+        i = self._position(principle_id)
+        return self._decode_compact(i).get('commercial_name') if i is not None else None
+
+    def pk_table(self, ids: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """Igual que ActivePrincipleCatalog.pk_table, leída directamente de la
+        tabla de float64 mapeada (sin decodificar JSON)."""
+        return _pk_lookup(self._ids, self._params, ids)
+
+    @property
+    def records(self) -> List[dict]:
+        """Todos los registros (decodifica el catálogo completo)."""
+        return [self._decode(i) for i in range(len(self._ids))]
+
+    def search(self, query: str) -> List[dict]:
+        """
+        Igual que ActivePrincipleCatalog.search, pero recorre solo la sección
+        de texto de búsqueda (bytes.find) y decodifica únicamente los
+        registros que coinciden.
+        """
+        query = query.lower().replace('\0', '')
+        if not query:
+            return self.records
+        needle = query.encode('utf-8')
+        mm = self._mmap
+        begin, end = self._search_span
+        starts = self._index['search_offset']
+        matches = []
+        pos = mm.find(needle, begin, end) if mm is not None else -1
+        while pos != -1:
+            i = int(np.searchsorted(starts, pos - begin, side='right')) - 1
+            matches.append(i)
+            # Continuar en el texto del registro siguiente
+            following = begin + int(starts[i + 1]) if i + 1 < len(starts) else end
+            pos = mm.find(needle, following, end)
+        return [self._decode(i) for i in matches]
+
+    def page(self, cursor: Optional[int] = None, limit: Optional[int] = None,
+             compact: bool = False) -> Tuple[List[dict], Optional[int]]:
+        """Igual que ActivePrincipleCatalog.page, decodificando solo la página."""
+        n = len(self._ids)
+        start = 0 if cursor is None else int(np.searchsorted(self._ids, cursor, side='right'))
+        end = n if limit is None else min(n, start + limit)
+        decode = self._decode_compact if compact else self._decode
+        next_cursor = int(self._ids[end - 1]) if end < n and end > start else None
+        return [decode(i) for i in range(start, end)], next_cursor
+
+
+class AutoCatalog:
+    """
+    Catálogo que usa la versión compilada (mismo nombre con extensión .bin)
+    mientras esté al día con el JSON.
+
+    En cada refresh() compara también la fecha del JSON: si se editó después
+    de compilar, o si el .bin no es válido (otra versión del formato,
+    archivo truncado), lo recompila y, si no se puede escribir (volumen de
+    solo lectura, por ejemplo), sirve el catálogo JSON en memoria hasta que
+    el .bin vuelva a estar al día. Delega el resto de la interfaz en el
+    catálogo activo.
+
+    Parámetros:
+    -----------
+    json_path : str
+        Ruta del catálogo JSON de origen
+    """
+
+    def __init__(self, json_path: str):
+        self.json_path = json_path
+        self.compiled_path = os.path.splitext(json_path)[0] + '.bin'
+        self._compiled = CompiledCatalog(self.compiled_path)
+        self._fallback: Optional[ActivePrincipleCatalog] = None
+        self._active = self._compiled
+        self._lock = threading.Lock()
+
+    def _stale(self) -> bool:
+        try:
+            return os.path.getmtime(self.compiled_path) < os.path.getmtime(self.json_path)
+        except OSError:
+            return True
+
+    def refresh(self) -> 'AutoCatalog':
+        """Recarga el catálogo activo, recompilando si el .bin no está al día."""
+        if not self._stale() and self._open_compiled():
+            return self
+        with self._lock:
+            try:
+                compile_catalog(self.json_path, self.compiled_path)
+            except (OSError, ValueError):
+                pass
+        if not self._stale() and self._open_compiled():
+            return self
+        if self._fallback is None:
+            self._fallback = ActivePrincipleCatalog(self.json_path)
+        self._active = self._fallback.refresh()
+        return self
+
+    def _open_compiled(self) -> bool:
+        """Activa el catálogo compilado; False si el .bin no se puede abrir."""
+        try:
+            self._active = self._compiled.refresh()
+        except (OSError, ValueError):
+            return False
+        return True
+
+    def __getattr__(self, name):
+        # Solo se llama para atributos que no son de AutoCatalog
+        return getattr(self._active, name)
+
+
+def open_catalog(json_path: str):
+    """
+    Abre el catálogo compilado (AutoCatalog) si existe el .bin junto al
+    JSON; si no, el catálogo JSON en memoria.
+    """
+    compiled_path = os.path.splitext(json_path)[0] + '.bin'
+    if not os.path.exists(compiled_path):
+        return ActivePrincipleCatalog(json_path)
+    return AutoCatalog(json_path).refresh()
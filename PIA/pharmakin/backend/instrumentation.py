@@ -0,0 +1,150 @@
+"""
+Instrumentación de PharmaKin
+Mide cuánto tarda cada etapa de la simulación (lectura de parámetros,
+solución exacta, cada integrador, errores, serialización) y cada endpoint,
+y expone los resultados en formato de texto de Prometheus.
+
+Cada etapa guarda una ventana móvil de las últimas mediciones para
+calcular percentiles (p50/p95/p99), además del conteo y la suma
+acumulados. Con PHARMAKIN_TIMING=0 las mediciones se desactivan y
+`span` no hace más que comprobar una bandera.
+"""
+
+import cProfile
+import io
+import math
+import os
+import pstats
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Tuple
+
+# Número de mediciones recientes que se conservan por serie
+WINDOW_SIZE = 1024
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+enabled = os.getenv('PHARMAKIN_TIMING', '1') != '0'
+
+
+class _Series:
+    """Ventana móvil de duraciones (segundos) más totales acumulados."""
+
+    __slots__ = ('samples', 'count', 'total')
+
+    def __init__(self):
+        self.samples = deque(maxlen=WINDOW_SIZE)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+
+
+_lock = threading.Lock()
+_series: Dict[Tuple[str, str], _Series] = {}
+
+
+def record(kind: str, name: str, seconds: float) -> None:
+    """Registra una duración para la serie (kind, name), p. ej. ('stage', 'euler')."""
+    key = (kind, name)
+    with _lock:
+        series = _series.get(key)
+        if series is None:
+            series = _series[key] = _Series()
+        series.add(seconds)
+
+
+@contextmanager
+def span(name: str, kind: str = 'stage'):
+    """
+    Mide la duración del bloque `with` y la registra bajo `name`.
+
+    Uso:
+        with span('exact_solution'):
+            C = exact_solution(...)
+    """
+    if not enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(kind, name, time.perf_counter() - start)
+
+
+def _quantile(sorted_samples: list, q: float) -> float:
+    """Percentil por el método del rango más cercano."""
+    if not sorted_samples:
+        return 0.0
+    idx = min(len(sorted_samples) - 1, max(0, math.ceil(q * len(sorted_samples)) - 1))
+    return sorted_samples[idx]
+
+
+def snapshot() -> dict:
+    """
+    Copia de las estadísticas actuales.
+
+    Retorna:
+    --------
+    dict
+        {kind: {name: {'count', 'sum', 'p50', 'p95', 'p99'}}}
+    """
+    with _lock:
+        items = [(key, list(s.samples), s.count, s.total) for key, s in _series.items()]
+
+    result: Dict[str, dict] = {}
+    for (kind, name), samples, count, total in items:
+        samples.sort()
+        stats = {'count': count, 'sum': total}
+        for q in QUANTILES:
+            stats[f'p{int(q * 100)}'] = _quantile(samples, q)
+        result.setdefault(kind, {})[name] = stats
+    return result
+
+
+def reset() -> None:
+    """Descarta todas las mediciones registradas."""
+    with _lock:
+        _series.clear()
+
+
+def prometheus_text() -> str:
+    """Exporta las estadísticas como métricas `summary` de Prometheus."""
+    lines = []
+    descriptions = {'stage': 'etapa de la simulación', 'endpoint': 'endpoint de la API'}
+    for kind, by_name in sorted(snapshot().items()):
+        metric = f'pharmakin_{kind}_duration_seconds'
+        label = kind
+        description = descriptions.get(kind, kind)
+        lines.append(f'# HELP {metric} Duración por {description} (ventana de {WINDOW_SIZE} muestras)')
+        lines.append(f'# TYPE {metric} summary')
+        for name, stats in sorted(by_name.items()):
+            for q in QUANTILES:
+                value = stats[f'p{int(q * 100)}']
+                lines.append(f'{metric}{{{label}="{name}",quantile="{q}"}} {value:.9f}')
+            lines.append(f'{metric}_sum{{{label}="{name}"}} {stats["sum"]:.9f}')
+            lines.append(f'{metric}_count{{{label}="{name}"}} {stats["count"]}')
+    return '\n'.join(lines) + '\n'
+
+
+def profile_call(func: Callable, *args, limit: int = 25, **kwargs):
+    """
+    Ejecuta `func` bajo cProfile.
+
+    Retorna:
+    --------
+    tuple
+        (resultado de func, resumen de texto con las `limit` funciones
+        de mayor tiempo acumulado)
+    """
+    profiler = cProfile.Profile()
+    result = profiler.runcall(func, *args, **kwargs)
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(limit)
+    return result, out.getvalue()
@@ -0,0 +1,209 @@
+"""
+Canal en vivo de parámetros para PharmaKin
+Atiende las actualizaciones de parámetros de una conexión persistente
+(WebSocket) con un único hilo de trabajo por conexión:
+
+- Agrupa ráfagas de actualizaciones (debounce): solo se simula la última.
+- Cancela la simulación en curso en cuanto llegan parámetros nuevos.
+- Envía la primera respuesta completa y, después, solo las diferencias
+  (deltas) respecto a la última respuesta enviada.
+- Opcionalmente, antes de cada simulación envía una vista previa
+  aproximada (preview.py), que cuesta menos de un milisegundo.
+
+Protocolo (JSON):
+    cliente -> {"type": "params", "id": 7, "params": {...cuerpo de /api/simulate...}}
+    servidor -> {"type": "preview", "id": 7, "data": {...}}
+              | {"type": "result", "id": 7, "data": {...}}
+              | {"type": "delta", "id": 7, "changes": [...]}
+              | {"type": "error", "id": 7, "error": "..."}
+              | {"type": "error", "id": 7, "error": "...", "preview": true}
+
+Un error con "preview": true indica que falló solo la vista previa; la
+simulación completa de ese id se envía igualmente. Un mensaje que no es
+JSON válido recibe un error con "id": null y la conexión sigue abierta.
+
+Cada cambio de un delta tiene la ruta de la clave ("path") y:
+    {"path": [...], "value": v}              reemplaza el valor
+    {"path": [...], "from": i, "values": []} conserva los primeros i
+                                              elementos de la lista y
+                                              agrega `values`
+    {"path": [...], "removed": true}         elimina la clave
+"""
+
+import json
+import threading
+import time
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from numerical_methods import SimulationCancelled
+
+
+def common_prefix_length(old: list, new: list) -> int:
+    """Número de elementos iniciales iguales en ambas listas."""
+    m = min(len(old), len(new))
+    if m == 0:
+        return 0
+    try:
+        different = np.flatnonzero(np.asarray(old[:m]) != np.asarray(new[:m]))
+    except (TypeError, ValueError):
+        # Listas no numéricas: comparación elemento a elemento
+        different = [i for i in range(m) if old[i] != new[i]][:1]
+    return int(different[0]) if len(different) else m
+
+
+def diff_results(old: dict, new: dict, path: tuple = ()) -> List[dict]:
+    """
+    Lista de cambios que transforman `old` en `new` (ver el protocolo
+    en la documentación del módulo). Las listas se comparan por prefijo,
+    así que extender una serie solo envía la cola nueva.
+    """
+    changes = []
+    for key, value in new.items():
+        p = list(path) + [key]
+        if key not in old:
+            changes.append({'path': p, 'value': value})
+        elif isinstance(value, dict) and isinstance(old[key], dict):
+            changes.extend(diff_results(old[key], value, tuple(p)))
+        elif isinstance(value, list) and isinstance(old[key], list):
+            prefix = common_prefix_length(old[key], value)
+            if prefix == len(value) == len(old[key]):
+                continue
+            changes.append({'path': p, 'from': prefix, 'values': value[prefix:]})
+        elif value != old[key]:
+            changes.append({'path': p, 'value': value})
+    for key in old:
+        if key not in new:
+            changes.append({'path': list(path) + [key], 'removed': True})
+    return changes
+
+
+def decode_message(raw) -> dict:
+    """Mensaje del cliente; ValueError si no es un objeto JSON válido."""
+    message = json.loads(raw)
+    if not isinstance(message, dict):
+        raise ValueError('se esperaba un objeto JSON')
+    return message
+
+
+class LiveSession:
+    """
+    Sesión de simulación en vivo de una conexión.
+
+    Parámetros:
+    -----------
+    compute : Callable
+        compute(params, cancel_event) -> dict con el resultado de la
+        simulación; debe lanzar SimulationCancelled si se activa el evento
+    send : Callable
+        Envía un mensaje (dict) al cliente
+    debounce : float
+        Segundos sin nuevas actualizaciones antes de empezar a simular
+    preview : Callable, opcional
+        preview(params) -> dict con una curva aproximada que se envía
+        antes de la simulación completa (sus errores se envían como
+        mensaje de error con "preview": true)
+    """
+
+    def __init__(self, compute: Callable, send: Callable[[dict], None], debounce: float = 0.05,
+                 preview: Optional[Callable[[dict], dict]] = None):
+        self._compute = compute
+        # El hilo de trabajo y el de recepción (reject) envían por la misma conexión
+        self._send_lock = threading.Lock()
+
+        def locked_send(message: dict) -> None:
+            with self._send_lock:
+                send(message)
+        self._send = locked_send
+        self.debounce = debounce
+        self._preview = preview
+
+        self._cond = threading.Condition()
+        self._pending: Optional[dict] = None
+        self._received_at = 0.0
+        self._cancel: Optional[threading.Event] = None
+        self._closed = False
+        self._last_sent: Optional[dict] = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        """Arranca el hilo de trabajo de la sesión."""
+        self._thread.start()
+
+    def submit(self, message: dict) -> None:
+        """
+        Registra una actualización de parámetros. Sustituye a la pendiente
+        (si la hay) y cancela la simulación en curso.
+        """
+        with self._cond:
+            self._pending = message
+            self._received_at = time.monotonic()
+            if self._cancel is not None:
+                self._cancel.set()
+            self._cond.notify()
+
+    def reject(self, error: str, request_id=None) -> None:
+        """Responde con un mensaje de error sin afectar a la simulación en curso."""
+        self._send({'type': 'error', 'id': request_id, 'error': error})
+
+    def close(self) -> None:
+        """Detiene la sesión y cancela el trabajo en curso."""
+        with self._cond:
+            self._closed = True
+            if self._cancel is not None:
+                self._cancel.set()
+            self._cond.notify()
+
+    def _next_message(self) -> Optional[dict]:
+        """Espera la siguiente actualización ya "asentada" (tras el debounce)."""
+        with self._cond:
+            while self._pending is None and not self._closed:
+                self._cond.wait()
+            # Esperar a que la ráfaga termine: cada mensaje nuevo reinicia el plazo
+            while not self._closed:
+                remaining = self._received_at + self.debounce - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            if self._closed:
+                return None
+            message, self._pending = self._pending, None
+            self._cancel = threading.Event()
+            return message
+
+    def _run(self) -> None:
+        while True:
+            message = self._next_message()
+            if message is None:
+                return
+            cancel = self._cancel
+            request_id = message.get('id')
+            params = message.get('params') or {}
+
+            if self._preview is not None:
+                try:
+                    self._send({'type': 'preview', 'id': request_id, 'data': self._preview(params)})
+                except Exception as e:
+                    self._send({'type': 'error', 'id': request_id, 'error': str(e), 'preview': True})
+
+            try:
+                result = self._compute(params, cancel)
+            except SimulationCancelled:
+                continue
+            except Exception as e:
+                self._send({'type': 'error', 'id': request_id, 'error': str(e)})
+                continue
+
+            # Si llegaron parámetros nuevos mientras terminaba, este
+            # resultado ya no le interesa a nadie
+            if cancel.is_set():
+                continue
+            self._send(self._encode(request_id, result))
+
+    def _encode(self, request_id, result: dict) -> dict:
+        """Mensaje completo la primera vez; después, solo el delta."""
+        previous, self._last_sent = self._last_sent, result
+        if previous is None:
+            return {'type': 'result', 'id': request_id, 'data': result}
+        return {'type': 'delta', 'id': request_id, 'changes': diff_results(previous, result)}
@@ -1,19 +1,27 @@
 """
 Módulo de Métodos Numéricos para Farmacocinética
 Implementa los métodos de Euler, Runge-Kutta y solución exacta
+(más Euler implícito, Crank-Nicolson y BDF2 para casos rígidos)
 para resolver la ecuación diferencial: V * dC/dt = u(t) - Q * C(t)
 """
 
+import threading
+
 import numpy as np
 from typing import List, Tuple, Callable
 
+from instrumentation import span
+from pk_metrics import compute_metrics
+from simulation_cache import CheckpointCache
+
 
 def exact_solution(
     t: np.ndarray,
     V: float,
     Q: float,
     u: Callable[[float], float],
-    C0: float = 0.0
+    C0: float = 0.0,
+    dt: float = None
 ) -> np.ndarray:
     """
     Solución exacta de la ecuación diferencial farmacocinética.
@@ -36,13 +44,18 @@ def exact_solution(
         Función que describe la tasa de administración u(t)
     C0 : float
         Concentración inicial (mg/L), por defecto 0
+    dt : float, opcional
+        Paso de la malla; por defecto t[1] - t[0]. Al reanudar sobre un
+        tramo de la malla se pasa el paso original para no arrastrar el
+        redondeo de la resta
     
     Retorna:
     --------
     np.ndarray
         Concentraciones en cada punto de tiempo
     """
-    dt = t[1] - t[0] if len(t) > 1 else 0.1
+    if dt is None:
+        dt = t[1] - t[0] if len(t) > 1 else 0.1
     C = np.zeros_like(t)
     C[0] = C0
     
@@ -51,33 +64,27 @@ def exact_solution(
     
     # Factor de integración: e^(-k*t)
     # Usamos integración numérica mejorada (regla del trapecio compuesta)
+    #
+    # Multiplicando por e^(-k*t[i]) dentro de la suma, cada término queda
+    # u(t[j]) * e^(-k*(t[i] - t[j])), con exponente siempre negativo: así
+    # e^(k*s) nunca se desborda aunque k*t sea grande (parámetros rígidos).
+    # La suma S_i = Σ_{j<=i} u(t[j]) * e^(-k*(t[i] - t[j])) cumple la
+    # recurrencia S_i = e^(-k*dt) * S_{i-1} + u(t[i]), por lo que basta
+    # un recorrido de la malla en lugar de recalcular la integral completa.
+    u_vals = np.array([u(s) for s in t], dtype=float)
+    decay = np.exp(-k * dt)
+    
+    S = u_vals[0]
     for i in range(1, len(t)):
-        # Integración numérica del término u(s)/V * e^(k*s) desde 0 hasta t[i]
-        # Usando regla del trapecio compuesta para mayor precisión
-        integral = 0.0
-        
-        # Punto inicial
-        s0 = 0.0
-        exp_factor_0 = np.exp(k * s0)
-        u0 = u(s0)
-        integral += 0.5 * (u0 / V) * exp_factor_0 * dt
-        
-        # Puntos intermedios
-        for j in range(1, i):
-            s = t[j]
-            exp_factor = np.exp(k * s)
-            u_val = u(s)
-            integral += (u_val / V) * exp_factor * dt
+        S = decay * S + u_vals[i]
         
-        # Punto final
-        s_final = t[i]
-        exp_factor_final = np.exp(k * s_final)
-        u_final = u(s_final)
-        integral += 0.5 * (u_final / V) * exp_factor_final * dt
+        # Regla del trapecio: los extremos (s = t[0] y s = t[i]) pesan 1/2
+        e_i = np.exp(-k * (t[i] - t[0]))
+        integral = (dt / V) * (S - 0.5 * u_vals[0] * e_i - 0.5 * u_vals[i])
         
         # Solución exacta usando factor integrante
         # C(t) = e^(-k*t) * [C0 + ∫(u(s)/V * e^(k*s)) ds]
-        C[i] = np.exp(-k * t[i]) * (C0 + integral)
+        C[i] = e_i * C0 + integral
     
     return C
 
@@ -87,7 +94,8 @@ def euler_method(
     V: float,
     Q: float,
     u: Callable[[float], float],
-    C0: float = 0.0
+    C0: float = 0.0,
+    dt: float = None
 ) -> np.ndarray:
     """
     Método de Euler para resolver la ecuación diferencial farmacocinética.
@@ -109,13 +117,16 @@ def euler_method(
         Función de tasa de administración u(t)
     C0 : float
         Concentración inicial (mg/L)
+    dt : float, opcional
+        Paso de la malla; por defecto t[1] - t[0]
     
     Retorna:
     --------
     np.ndarray
         Concentraciones aproximadas en cada punto de tiempo
     """
-    dt = t[1] - t[0] if len(t) > 1 else 0.1
+    if dt is None:
+        dt = t[1] - t[0] if len(t) > 1 else 0.1
     C = np.zeros_like(t)
     C[0] = C0
     
@@ -135,7 +146,8 @@ def runge_kutta_4(
     V: float,
     Q: float,
     u: Callable[[float], float],
-    C0: float = 0.0
+    C0: float = 0.0,
+    dt: float = None
 ) -> np.ndarray:
     """
     Método de Runge-Kutta de cuarto orden (RK4) para resolver la EDO.
@@ -161,13 +173,16 @@ def runge_kutta_4(
         Función de tasa de administración u(t)
     C0 : float
         Concentración inicial (mg/L)
+    dt : float, opcional
+        Paso de la malla; por defecto t[1] - t[0]
     
     Retorna:
     --------
     np.ndarray
         Concentraciones aproximadas en cada punto de tiempo
     """
-    dt = t[1] - t[0] if len(t) > 1 else 0.1
+    if dt is None:
+        dt = t[1] - t[0] if len(t) > 1 else 0.1
     C = np.zeros_like(t)
     C[0] = C0
     
@@ -196,7 +211,223 @@ def runge_kutta_4(
     return C
 
 
-def calculate_error(exact: np.ndarray, approximate: np.ndarray) -> dict:
+# Versión de los integradores: forma parte de la ETag de las simulaciones,
+# así que debe incrementarse con cualquier cambio en los resultados numéricos
+SOLVER_VERSION = '1'
+
+
+# Límites de estabilidad absoluta sobre el eje real para z = Q*dt/V.
+# Euler explícito es estable si |1 - z| <= 1 (z <= 2); RK4 si z <= ~2.785.
+EULER_STABILITY_LIMIT = 2.0
+RK4_STABILITY_LIMIT = 2.785
+
+# Valores del parámetro `implicit` de simulate_pharmacokinetics
+IMPLICIT_MODES = ('auto', 'always', 'never')
+
+
+def stiffness_ratio(V: float, Q: float, dt: float) -> float:
+    """
+    Cociente adimensional z = Q*dt/V que mide la rigidez del paso.
+    
+    La parte homogénea de la EDO es dC/dt = -k*C con k = Q/V, por lo que
+    cada paso de un método explícito multiplica el error por un factor
+    que solo depende de z = k*dt. Si z sale de la región de estabilidad
+    del método, la solución oscila y crece sin control.
+    """
+    return Q * dt / V
+
+
+def is_stiff(V: float, Q: float, dt: float, limit: float = EULER_STABILITY_LIMIT) -> bool:
+    """Indica si el paso dt es inestable para un método con límite `limit`."""
+    return stiffness_ratio(V, Q, dt) > limit
+
+
+def backward_euler(
+    t: np.ndarray,
+    V: float,
+    Q: float,
+    u: Callable[[float], float],
+    C0: float = 0.0,
+    dt: float = None
+) -> np.ndarray:
+    """
+    Método de Euler implícito (hacia atrás) para la EDO farmacocinética.
+    
+    La eliminación -Q*C (la parte rígida) se evalúa al final del paso:
+    V * (C[i+1] - C[i]) / dt = u(t[i]) - Q * C[i+1]
+    
+    Como la ecuación es lineal en C, el paso implícito se despeja en forma
+    cerrada, sin resolver ninguna ecuación no lineal:
+    C[i+1] = (C[i] + dt * u(t[i]) / V) / (1 + k*dt),   k = Q/V
+    
+    El factor 1/(1 + k*dt) está entre 0 y 1 para cualquier dt > 0, así que
+    el método es L-estable: nunca oscila ni se desborda. La entrada u(t) no
+    depende de C (no afecta la estabilidad) y se toma al inicio del paso,
+    igual que en `euler_method`, para que los bolos IV de la malla se
+    administren completos.
+    
+    Parámetros y retorno: iguales a `euler_method`.
+    """
+    if dt is None:
+        dt = t[1] - t[0] if len(t) > 1 else 0.1
+    C = np.zeros_like(t)
+    C[0] = C0
+    
+    k = Q / V
+    factor = 1.0 / (1.0 + k * dt)
+    
+    for i in range(len(t) - 1):
+        C[i + 1] = (C[i] + dt * u(t[i]) / V) * factor
+    
+    return C
+
+
+def crank_nicolson(
+    t: np.ndarray,
+    V: float,
+    Q: float,
+    u: Callable[[float], float],
+    C0: float = 0.0,
+    dt: float = None
+) -> np.ndarray:
+    """
+    Método del trapecio (Crank-Nicolson) para la EDO farmacocinética.
+    
+    Promedia la derivada al inicio y al final del paso:
+    C[i+1] = C[i] + dt/2 * [f(t[i], C[i]) + f(t[i+1], C[i+1])]
+    
+    Despejando C[i+1] en la ecuación lineal:
+    C[i+1] = ((1 - k*dt/2) * C[i] + dt/(2V) * (u(t[i]) + u(t[i+1]))) / (1 + k*dt/2)
+    
+    Es de segundo orden y A-estable (nunca se desborda), pero no L-estable:
+    con k*dt muy grande el factor tiende a -1 y aparecen oscilaciones
+    amortiguadas lentamente. Para esos casos conviene `bdf2`.
+    
+    Parámetros y retorno: iguales a `euler_method`.
+    """
+    if dt is None:
+        dt = t[1] - t[0] if len(t) > 1 else 0.1
+    C = np.zeros_like(t)
+    C[0] = C0
+    
+    k = Q / V
+    denom = 1.0 + k * dt / 2
+    gain = (1.0 - k * dt / 2) / denom
+    
+    u_prev = u(t[0])
+    for i in range(len(t) - 1):
+        u_next = u(t[i + 1])
+        C[i + 1] = gain * C[i] + dt * (u_prev + u_next) / (2 * V * denom)
+        u_prev = u_next
+    
+    return C
+
+
+def bdf2(
+    t: np.ndarray,
+    V: float,
+    Q: float,
+    u: Callable[[float], float],
+    C0: float = 0.0,
+    C_prev: float = None,
+    dt: float = None
+) -> np.ndarray:
+    """
+    Fórmula de diferenciación hacia atrás de orden 2 (BDF2).
+    
+    Aproxima la derivada en t[i+1] con los tres últimos puntos:
+    (3*C[i+1] - 4*C[i] + C[i-1]) / (2*dt) = (u(t[i+1]) - Q*C[i+1]) / V
+    
+    Despejando en forma cerrada:
+    C[i+1] = (4*C[i] - C[i-1] + 2*dt*u(t[i+1])/V) / (3 + 2*k*dt)
+    
+    Es de segundo orden y L-estable: para k*dt grande amortigua de
+    inmediato, sin las oscilaciones de Crank-Nicolson. Al necesitar dos
+    valores previos, el primer paso se da con `backward_euler`, salvo que
+    se reanude una integración previa y se conozca `C_prev` = C(t[0] - dt).
+    
+    Parámetros y retorno: iguales a `euler_method`.
+    """
+    if dt is None:
+        dt = t[1] - t[0] if len(t) > 1 else 0.1
+    C = np.zeros_like(t)
+    C[0] = C0
+    if len(t) < 2:
+        return C
+    
+    k = Q / V
+    denom = 3.0 + 2.0 * k * dt
+    
+    if C_prev is None:
+        # Paso de arranque con Euler implícito
+        C[1] = (C[0] + dt * u(t[0]) / V) / (1.0 + k * dt)
+    else:
+        # Reanudación: ya se conoce el valor anterior a t[0]
+        C[1] = (4 * C[0] - C_prev + 2 * dt * u(t[1]) / V) / denom
+    
+    for i in range(1, len(t) - 1):
+        C[i + 1] = (4 * C[i] - C[i - 1] + 2 * dt * u(t[i + 1]) / V) / denom
+    
+    return C
+
+
+# Modos de precisión para el cálculo y la serialización de las series.
+# 'float64' conserva la precisión completa (vistas de análisis de error);
+# 'float32' calcula y transmite con ~7 cifras significativas (gráficas);
+# 'fixed' redondea a un número fijo de decimales antes de serializar.
+PRECISIONS = ('float64', 'float32', 'fixed')
+# Rango de decimales admitido en el modo 'fixed' (más de 15 no cabe en un float64)
+MAX_DECIMALS = 15
+FLOAT32_DIGITS = 7
+
+
+def round_significant(values: np.ndarray, digits: int) -> np.ndarray:
+    """
+    Redondea cada valor a `digits` cifras significativas (vectorizado).
+    
+    Dividir el entero redondeado entre una potencia de 10 exacta produce
+    el double más cercano al decimal, cuya representación JSON es corta.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    magnitude = np.zeros_like(values)
+    np.floor(np.log10(np.abs(values), out=magnitude, where=values != 0),
+             out=magnitude, where=values != 0)
+    scale = 10.0 ** (digits - 1 - magnitude)
+    return np.round(values * scale) / scale
+
+
+def serialize_array(values: np.ndarray, precision: str = 'float64', decimals: int = 4) -> list:
+    """
+    Convierte un arreglo a lista de Python según el modo de precisión.
+    
+    Parámetros:
+    -----------
+    values : np.ndarray
+        Arreglo a serializar
+    precision : str
+        'float64' (repr completo), 'float32' (7 cifras significativas)
+        o 'fixed' (`decimals` decimales)
+    decimals : int
+        Número de decimales en el modo 'fixed'
+    
+    Retorna:
+    --------
+    list
+        Lista de floats lista para `jsonify`
+    """
+    if precision == 'float32':
+        return round_significant(values, FLOAT32_DIGITS).tolist()
+    if precision == 'fixed':
+        return np.round(np.asarray(values, dtype=np.float64), decimals).tolist()
+    return values.tolist()
+
+
+def calculate_error(
+    exact: np.ndarray,
+    approximate: np.ndarray,
+    precision: str = 'float64',
+    decimals: int = 4
+) -> dict:
     """
     Calcula métricas de error entre solución exacta y aproximada.
     
@@ -206,6 +437,10 @@ def calculate_error(exact: np.ndarray, approximate: np.ndarray) -> dict:
         Valores de la solución exacta
     approximate : np.ndarray
         Valores de la solución aproximada
+    precision : str
+        Modo de serialización de los arreglos de error (ver `serialize_array`)
+    decimals : int
+        Decimales en el modo 'fixed'
     
     Retorna:
     --------
@@ -231,8 +466,8 @@ def calculate_error(exact: np.ndarray, approximate: np.ndarray) -> dict:
     max_relative_error = np.max(relative_error)
     
     return {
-        'absolute_error': absolute_error.tolist(),
-        'relative_error': relative_error.tolist(),
+        'absolute_error': serialize_array(absolute_error, precision, decimals),
+        'relative_error': serialize_array(relative_error, precision, decimals),
         'rmse': float(rmse),
         'max_error': float(max_error),
         'max_relative_error': float(max_relative_error),
@@ -240,52 +475,37 @@ def calculate_error(exact: np.ndarray, approximate: np.ndarray) -> dict:
     }
 
 
-def simulate_pharmacokinetics(
-    t_max: float,
-    dt: float,
-    V: float,
-    Q: float,
-    dose: float,
+def administration_rate(
     route: str,
-    ka: float = None,
+    dose: float,
+    ka: float = 1.0,
     num_doses: int = 1,
-    interval: float = 0.0
-) -> dict:
+    interval: float = 0.0,
+    dt: float = 0.1
+) -> Callable[[float], float]:
     """
-    Simula la farmacocinética usando múltiples métodos numéricos.
+    Construye la tasa de administración u(t) de una pauta de dosificación.
     
     Parámetros:
     -----------
-    t_max : float
-        Tiempo máximo de simulación (horas)
-    dt : float
-        Paso de tiempo (horas)
-    V : float
-        Volumen plasmático efectivo (L)
-    Q : float
-        Tasa de eliminación metabólica (L/h)
-    dose : float
-        Dosis administrada (mg)
     route : str
         Vía de administración: 'iv', 'oral', 'topical'
+    dose : float
+        Dosis administrada (mg)
     ka : float
-        Constante de absorción (1/h) para vía oral
+        Constante de absorción (1/h)
     num_doses : int
         Número de dosis
     interval : float
         Intervalo entre dosis (horas)
+    dt : float
+        Paso de tiempo (ancho del bolo IV)
     
     Retorna:
     --------
-    dict
-        Diccionario con resultados de todos los métodos
+    Callable
+        Función u(t) en mg/h
     """
-    # Crear array de tiempos
-    t = np.arange(0, t_max + dt, dt)
-    # Constante de absorción efectiva (si no se proporciona, usar 1.0)
-    ka_effective = ka if ka is not None else 1.0
-    
-    # Definir función de administración u(t)
     def u(t_val: float) -> float:
         """Función que describe la tasa de administración"""
         if route == 'iv':
@@ -306,11 +526,11 @@ def simulate_pharmacokinetics(
                 dose_time = i * interval
                 if t_val >= dose_time:
                     time_since_dose = t_val - dose_time
-                    total += ka_effective * F * dose * np.exp(-ka_effective * time_since_dose)
+                    total += ka * F * dose * np.exp(-ka * time_since_dose)
             return total
         elif route == 'topical':
             # Para pomadas, modelo simplificado de absorción lenta
-            ka_topical = ka_effective * 0.3
+            ka_topical = ka * 0.3
             total = 0.0
             for i in range(num_doses):
                 dose_time = i * interval
@@ -321,26 +541,393 @@ def simulate_pharmacokinetics(
         else:
             return 0.0
     
+    return u
+
+
+class SimulationCancelled(Exception):
+    """La simulación se interrumpió porque se solicitó su cancelación"""
+
+
+# Trayectorias ya calculadas por prefijo de parámetros (ver simulation_cache)
+checkpoint_cache = CheckpointCache(maxsize=32)
+
+
+def simulate_pharmacokinetics(
+    t_max: float,
+    dt: float,
+    V: float,
+    Q: float,
+    dose: float,
+    route: str,
+    ka: float = None,
+    num_doses: int = 1,
+    interval: float = 0.0,
+    metrics_only: bool = False,
+    cme: float = None,
+    cmt: float = None,
+    implicit: str = 'auto',
+    precision: str = 'float64',
+    decimals: int = 4,
+    incremental: bool = False,
+    cancel: threading.Event = None
+) -> dict:
+    """
+    Simula la farmacocinética usando múltiples métodos numéricos.
+    
+    Parámetros:
+    -----------
+    t_max : float
+        Tiempo máximo de simulación (horas)
+    dt : float
+        Paso de tiempo (horas)
+    V : float
+        Volumen plasmático efectivo (L)
+    Q : float
+        Tasa de eliminación metabólica (L/h)
+    dose : float
+        Dosis administrada (mg)
+    route : str
+        Vía de administración: 'iv', 'oral', 'topical'
+    ka : float
+        Constante de absorción (1/h) para vía oral
+    num_doses : int
+        Número de dosis
+    interval : float
+        Intervalo entre dosis (horas)
+    metrics_only : bool
+        Si es True, solo se devuelven las métricas resumen (AUC, Cmax, ...)
+        de cada método en lugar de las series completas
+    cme : float
+        Concentración mínima efectiva (mg/L), opcional para las métricas
+    cmt : float
+        Concentración mínima tóxica (mg/L), opcional para las métricas
+    implicit : str
+        Uso de integradores implícitos para las series 'euler' y
+        'runge_kutta': 'auto' (solo si Q*dt/V excede el límite de
+        estabilidad del método explícito), 'always' o 'never'
+    precision : str
+        'float64' (por defecto, necesario para el análisis de error),
+        'float32' (cálculo en precisión simple y series con 7 cifras
+        significativas) o 'fixed' (series redondeadas a `decimals`)
+    decimals : int
+        Decimales de las series en el modo 'fixed'
+    incremental : bool
+        Si es True, reutiliza las trayectorias en caché del mismo prefijo
+        de parámetros y solo integra el tramo nuevo (más dosis o t_max).
+        Desactivado por defecto: solo los endpoints interactivos lo activan
+    cancel : threading.Event, opcional
+        Si se activa durante el cálculo, la simulación se interrumpe con
+        SimulationCancelled (p. ej. al llegar parámetros más recientes)
+    
+    Retorna:
+    --------
+    dict
+        Diccionario con resultados de todos los métodos
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Valor de 'precision' no válido: {precision}")
+    
+    # Crear array de tiempos (en float32 todas las series heredan ese tipo,
+    # ya que los métodos reservan C con np.zeros_like(t))
+    dtype = np.float32 if precision == 'float32' else np.float64
+    t = np.arange(0, t_max + dt, dt, dtype=dtype)
+    # Constante de absorción efectiva (si no se proporciona, usar 1.0)
+    ka_effective = ka if ka is not None else 1.0
+    
+    # Definir función de administración u(t)
+    u = administration_rate(route, dose, ka_effective, num_doses, interval, dt)
+    
+    if cancel is not None:
+        # Todos los métodos evalúan u(t) en cada paso: basta revisar la
+        # bandera de cancelación ahí para interrumpir cualquier integrador
+        uncancellable = u
+        
+        def u(t_val: float) -> float:
+            if cancel.is_set():
+                raise SimulationCancelled()
+            return uncancellable(t_val)
+    
+    if implicit not in IMPLICIT_MODES:
+        raise ValueError(f"Valor de 'implicit' no válido: {implicit}")
+    
+    # Con parámetros rígidos (Q*dt/V grande) los métodos explícitos son
+    # inestables; se sustituyen por su contraparte implícita L-estable
+    use_backward_euler = implicit == 'always' or (
+        implicit == 'auto' and is_stiff(V, Q, dt, EULER_STABILITY_LIMIT))
+    use_bdf2 = implicit == 'always' or (
+        implicit == 'auto' and is_stiff(V, Q, dt, RK4_STABILITY_LIMIT))
+    
+    # Integrador que produce realmente cada serie
+    solvers = {
+        'euler': 'backward_euler' if use_backward_euler else 'euler',
+        'runge_kutta': 'bdf2' if use_bdf2 else 'runge_kutta_4'
+    }
+    
+    # Re-simulación incremental: si ya se simuló el mismo prefijo de
+    # parámetros (p. ej. con menos dosis o menor t_max), se reanuda cada
+    # integrador desde el último estado válido y solo se calcula el tramo nuevo
+    cache_key = (route, V, Q, ka_effective, dose, dt, interval, t.dtype.str,
+                 solvers['euler'], solvers['runge_kutta'])
+    start, cached = 0, None
+    if incremental:
+        start, cached = checkpoint_cache.resume_point(cache_key, t, num_doses, interval, dt)
+    t_seg = t[start:]
+    
+    def initial(name: str) -> float:
+        """Estado inicial del tramo a integrar para la serie `name`"""
+        return cached[name][start] if cached is not None else 0.0
+    
+    def joined(name: str, C_seg: np.ndarray) -> np.ndarray:
+        """Concatena el tramo recién integrado al prefijo en caché"""
+        if cached is None:
+            return C_seg
+        return np.concatenate((cached[name][:start], C_seg))
+    
     # Calcular soluciones con diferentes métodos
-    C_exact = exact_solution(t, V, Q, u, C0=0.0)
-    C_euler = euler_method(t, V, Q, u, C0=0.0)
-    C_rk4 = runge_kutta_4(t, V, Q, u, C0=0.0)
+    # Paso de la malla completa (un tramo reanudado debe usar el mismo)
+    h = t[1] - t[0] if len(t) > 1 else dt
+    with span('exact_solution'):
+        C_exact = joined('exact', exact_solution(t_seg, V, Q, u, C0=initial('exact'), dt=h))
+    with span(solvers['euler']):
+        if use_backward_euler:
+            C_seg = backward_euler(t_seg, V, Q, u, C0=initial('euler'), dt=h)
+        else:
+            C_seg = euler_method(t_seg, V, Q, u, C0=initial('euler'), dt=h)
+        C_euler = joined('euler', C_seg)
+    with span(solvers['runge_kutta']):
+        if use_bdf2:
+            C_prev = cached['runge_kutta'][start - 1] if cached is not None else None
+            C_seg = bdf2(t_seg, V, Q, u, C0=initial('runge_kutta'), C_prev=C_prev, dt=h)
+        else:
+            C_seg = runge_kutta_4(t_seg, V, Q, u, C0=initial('runge_kutta'), dt=h)
+        C_rk4 = joined('runge_kutta', C_seg)
+    
+    if incremental:
+        checkpoint_cache.store(cache_key, t, num_doses, {
+            'exact': C_exact,
+            'euler': C_euler,
+            'runge_kutta': C_rk4
+        })
+    
+    if metrics_only:
+        # Respuesta compacta: solo indicadores resumen por método
+        dose_times = np.arange(num_doses) * interval
+        with span('compute_metrics'):
+            return {
+                'solvers': solvers,
+                'metrics': {
+                    'exact': compute_metrics(t, C_exact, dose_times, cme, cmt),
+                    'euler': compute_metrics(t, C_euler, dose_times, cme, cmt),
+                    'runge_kutta': compute_metrics(t, C_rk4, dose_times, cme, cmt)
+                }
+            }
     
     # Calcular errores
-    error_euler = calculate_error(C_exact, C_euler)
-    error_rk4 = calculate_error(C_exact, C_rk4)
+    with span('calculate_error'):
+        error_euler = calculate_error(C_exact, C_euler, precision, decimals)
+        error_rk4 = calculate_error(C_exact, C_rk4, precision, decimals)
     
     # Preparar resultados
-    results = {
-        'time': t.tolist(),
-        'exact': C_exact.tolist(),
-        'euler': C_euler.tolist(),
-        'runge_kutta': C_rk4.tolist(),
-        'errors': {
-            'euler': error_euler,
-            'runge_kutta': error_rk4
+    with span('tolist'):
+        results = {
+            'time': serialize_array(t, precision, decimals),
+            'exact': serialize_array(C_exact, precision, decimals),
+            'euler': serialize_array(C_euler, precision, decimals),
+            'runge_kutta': serialize_array(C_rk4, precision, decimals),
+            'errors': {
+                'euler': error_euler,
+                'runge_kutta': error_rk4
+            },
+            'solvers': solvers,
+            'stiffness': stiffness_ratio(V, Q, dt)
         }
-    }
     
     return results
 
+
+
+# -----------------------------
+# SIMULACIÓN POR LOTES
+# -----------------------------
+
+def administration_rates(
+    t: np.ndarray,
+    route: str,
+    dose: float,
+    ka: np.ndarray,
+    num_doses: int = 1,
+    interval: float = 0.0,
+    dt: float = 0.1
+) -> np.ndarray:
+    """
+    Tasa de administración u(t) de varios fármacos a la vez.
+    
+    Versión vectorizada de `administration_rate` (mismo modelo y mismas
+    operaciones, por lo que los valores coinciden): la fila j corresponde
+    a la constante de absorción ka[j].
+    
+    Parámetros:
+    -----------
+    t : np.ndarray
+        Malla de tiempos (n puntos)
+    route : str
+        Vía de administración: 'iv', 'oral', 'topical'
+    dose : float
+        Dosis administrada (mg)
+    ka : np.ndarray
+        Constante de absorción (1/h) de cada fármaco (N valores)
+    num_doses : int
+        Número de dosis
+    interval : float
+        Intervalo entre dosis (horas)
+    dt : float
+        Paso de tiempo (ancho del bolo IV)
+    
+    Retorna:
+    --------
+    np.ndarray
+        Arreglo (N, n) con u(t) de cada fármaco
+    """
+    ka = np.asarray(ka, dtype=float)[:, None]
+    total = np.zeros((ka.shape[0], len(t)))
+    
+    if route == 'iv':
+        # El bolo no depende de ka: la misma fila para todos los fármacos
+        for i in range(num_doses):
+            total += np.where(np.abs(t - i * interval) < dt/2, dose / dt, 0.0)
+        return total
+    
+    if route == 'oral':
+        rate = ka * 1.0  # Biodisponibilidad F = 1
+    elif route == 'topical':
+        rate = ka * 0.3
+    else:
+        return total
+    
+    for i in range(num_doses):
+        time_since_dose = t - i * interval
+        active = time_since_dose >= 0
+        # Antes de la dosis se evalúa la exponencial en 0 (y se descarta)
+        # para no desbordar e^{+ka*s}
+        absorbed = rate * dose * np.exp(-rate * np.where(active, time_since_dose, 0.0))
+        total += np.where(active, absorbed, 0.0)
+    return total
+
+
+def exact_solution_batch(
+    t: np.ndarray,
+    V: np.ndarray,
+    Q: np.ndarray,
+    u_vals: np.ndarray,
+    dt: float = None
+) -> np.ndarray:
+    """
+    Solución exacta de N fármacos en una sola pasada por la malla.
+    
+    Misma recurrencia que `exact_solution` (con C0 = 0), pero el estado
+    S es un vector con un elemento por fármaco, así que el bucle de Python
+    recorre la malla una vez en lugar de una vez por fármaco.
+    
+    Parámetros:
+    -----------
+    t : np.ndarray
+        Malla de tiempos (n puntos)
+    V, Q : np.ndarray
+        Volumen (L) y tasa de eliminación (L/h) de cada fármaco (N valores)
+    u_vals : np.ndarray
+        Tasa de administración (N, n), p. ej. de `administration_rates`
+    dt : float, opcional
+        Paso de la malla; por defecto t[1] - t[0]
+    
+    Retorna:
+    --------
+    np.ndarray
+        Concentraciones (N, n)
+    """
+    if dt is None:
+        dt = t[1] - t[0] if len(t) > 1 else 0.1
+    V = np.asarray(V, dtype=float)[:, None]
+    k = np.asarray(Q, dtype=float)[:, None] / V
+    decay = np.exp(-k[:, 0] * dt)
+    
+    # S_i = e^(-k*dt) * S_{i-1} + u(t[i]) para todos los fármacos a la vez
+    S = np.empty_like(u_vals)
+    S[:, 0] = u_vals[:, 0]
+    for i in range(1, len(t)):
+        S[:, i] = decay * S[:, i - 1] + u_vals[:, i]
+    
+    e = np.exp(-k * (t - t[0]))
+    C = (dt / V) * (S - 0.5 * u_vals[:, :1] * e - 0.5 * u_vals)
+    C[:, 0] = 0.0
+    return C
+
+
+def simulate_batch(
+    t_max: float,
+    dt: float,
+    V: List[float],
+    Q: List[float],
+    ka: List[float],
+    dose: float,
+    route: str,
+    num_doses: int = 1,
+    interval: float = 0.0,
+    cme: List[float] = None,
+    cmt: List[float] = None,
+    metrics_only: bool = False,
+    precision: str = 'float64',
+    decimals: int = 4
+) -> dict:
+    """
+    Simula varios fármacos con la misma pauta de administración.
+    
+    Todos comparten la malla de tiempos y u(t) se calcula como un arreglo
+    (N, n), de modo que la solución exacta de los N fármacos se obtiene en
+    una sola pasada. Las curvas coinciden con la serie 'exact' de
+    `simulate_pharmacokinetics` para cada fármaco por separado.
+    
+    Parámetros:
+    -----------
+    t_max, dt, dose, route, num_doses, interval :
+        Pauta común (ver `simulate_pharmacokinetics`)
+    V, Q, ka : List[float]
+        Parámetros de cada fármaco (ka None -> 1.0, como en la simulación
+        individual)
+    cme, cmt : List[float], opcional
+        Umbrales de cada fármaco para las métricas (None si no aplica)
+    metrics_only : bool
+        Si es True, se omiten las series de concentración
+    precision, decimals :
+        Modo de serialización de las series (ver `serialize_array`)
+    
+    Retorna:
+    --------
+    dict
+        {'time': [...], 'concentrations': [[...], ...], 'metrics': [{...}, ...]}
+        con una entrada por fármaco en el orden recibido
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Valor de 'precision' no válido: {precision}")
+    
+    n_drugs = len(V)
+    cme = cme if cme is not None else [None] * n_drugs
+    cmt = cmt if cmt is not None else [None] * n_drugs
+    ka = [k if k is not None else 1.0 for k in ka]
+    
+    t = np.arange(0, t_max + dt, dt)
+    h = t[1] - t[0] if len(t) > 1 else dt
+    with span('administration_rates'):
+        u_vals = administration_rates(t, route, dose, ka, num_doses, interval, dt)
+    with span('exact_solution_batch'):
+        C = exact_solution_batch(t, V, Q, u_vals, dt=h)
+    
+    dose_times = np.arange(num_doses) * interval
+    with span('compute_metrics'):
+        metrics = [compute_metrics(t, C[j], dose_times, cme[j], cmt[j]) for j in range(n_drugs)]
+    
+    results = {'metrics': metrics}
+    if not metrics_only:
+        with span('tolist'):
+            results['time'] = serialize_array(t, precision, decimals)
+            results['concentrations'] = [serialize_array(row, precision, decimals) for row in C]
+    return results
@@ -0,0 +1,158 @@
+"""
+Módulo de Métricas Farmacocinéticas
+Calcula indicadores resumen de una curva de concentración C(t):
+AUC (trapecio y log-trapecio), Cmax/Tmax por intervalo de dosis,
+tiempo por encima de CME/CMT y concentraciones valle por dosis.
+
+Todas las reducciones están vectorizadas con NumPy; los intervalos de
+dosis se procesan con `np.maximum.reduceat` / `np.minimum.reduceat`
+sobre los segmentos de la malla, sin bucles de Python por punto.
+"""
+
+import numpy as np
+from typing import Optional
+
+
+def dose_segment_starts(t: np.ndarray, dose_times: np.ndarray) -> np.ndarray:
+    """
+    Índices de la malla donde comienza cada intervalo de dosis.
+
+    Parámetros:
+    -----------
+    t : np.ndarray
+        Malla de tiempos (creciente, paso uniforme)
+    dose_times : np.ndarray
+        Tiempos de administración de cada dosis (horas)
+
+    Retorna:
+    --------
+    np.ndarray
+        Índices únicos y crecientes; el primero siempre es 0
+    """
+    dt = t[1] - t[0] if len(t) > 1 else 0.0
+    # Solo dosis dentro de la ventana simulada
+    dose_times = np.asarray(dose_times, dtype=float)
+    dose_times = dose_times[dose_times <= t[-1]]
+    # Tolerancia de medio paso para absorber el redondeo de np.arange
+    starts = np.searchsorted(t, dose_times - 0.5 * dt, side='left')
+    starts = np.unique(np.concatenate(([0], starts)))
+    return starts[starts < len(t)]
+
+
+def auc_trapezoid(t: np.ndarray, C: np.ndarray) -> float:
+    """
+    Área bajo la curva con la regla del trapecio lineal:
+    AUC = Σ (t[i+1] - t[i]) * (C[i] + C[i+1]) / 2
+    """
+    h = np.diff(t)
+    return float(np.dot(h, 0.5 * (C[:-1] + C[1:])))
+
+
+def auc_log_trapezoid(t: np.ndarray, C: np.ndarray) -> float:
+    """
+    AUC con el método "lineal hacia arriba / logarítmico hacia abajo".
+
+    En los tramos donde la concentración desciende (y ambos extremos son
+    positivos) la eliminación es exponencial, así que se usa:
+        (C[i] - C[i+1]) * h / ln(C[i] / C[i+1])
+    En los tramos ascendentes o con valores no positivos se usa el trapecio.
+    """
+    h = np.diff(t)
+    c0 = C[:-1]
+    c1 = C[1:]
+    linear = 0.5 * (c0 + c1) * h
+
+    use_log = (c1 < c0) & (c1 > 0)
+    # Evitar log(0) / divisiones por cero fuera de la máscara
+    ratio = np.where(use_log, c0 / np.where(use_log, c1, 1.0), np.e)
+    log_area = (c0 - c1) * h / np.log(ratio)
+
+    return float(np.sum(np.where(use_log, log_area, linear)))
+
+
+def time_above(t: np.ndarray, C: np.ndarray, threshold: float) -> float:
+    """
+    Tiempo total (horas) en que C(t) está por encima de `threshold`.
+
+    Entre puntos de malla se interpola linealmente, de modo que los
+    cruces del umbral se ubican dentro del paso y no en sus extremos.
+    """
+    h = np.diff(t)
+    c0 = C[:-1]
+    c1 = C[1:]
+    above0 = c0 >= threshold
+    above1 = c1 >= threshold
+
+    # Fracción del paso por encima del umbral en los tramos con cruce
+    delta = np.abs(c1 - c0)
+    safe_delta = np.where(delta > 0, delta, 1.0)
+    crossing = (np.maximum(c0, c1) - threshold) / safe_delta
+
+    fraction = np.where(above0 & above1, 1.0,
+                        np.where(above0 ^ above1, crossing, 0.0))
+    return float(np.dot(h, fraction))
+
+
+def compute_metrics(
+    t: np.ndarray,
+    C: np.ndarray,
+    dose_times: np.ndarray,
+    cme: Optional[float] = None,
+    cmt: Optional[float] = None
+) -> dict:
+    """
+    Calcula las métricas resumen de una curva de concentración.
+
+    Parámetros:
+    -----------
+    t : np.ndarray
+        Malla de tiempos
+    C : np.ndarray
+        Concentraciones en cada punto de la malla (mg/L)
+    dose_times : np.ndarray
+        Tiempos de administración de cada dosis
+    cme : float, opcional
+        Concentración mínima efectiva (mg/L)
+    cmt : float, opcional
+        Concentración mínima tóxica (mg/L)
+
+    Retorna:
+    --------
+    dict
+        Diccionario con AUC, Cmax/Tmax global y por dosis, valles por dosis
+        y tiempos por encima de CME/CMT (si se proporcionan)
+    """
+    t = np.asarray(t, dtype=float)
+    C = np.asarray(C, dtype=float)
+
+    starts = dose_segment_starts(t, dose_times)
+
+    # Máximos y mínimos por segmento de dosis en una sola pasada
+    cmax_per_dose = np.maximum.reduceat(C, starts)
+    trough_per_dose = np.minimum.reduceat(C, starts)
+
+    # Tmax: primer índice de cada segmento que alcanza el máximo del segmento
+    seg_lengths = np.diff(np.append(starts, len(C)))
+    seg_max = np.repeat(cmax_per_dose, seg_lengths)
+    idx = np.arange(len(C))
+    first_max = np.minimum.reduceat(np.where(C == seg_max, idx, len(C)), starts)
+    tmax_per_dose = t[first_max]
+
+    i_max = int(np.argmax(C))
+
+    metrics = {
+        'auc': auc_trapezoid(t, C),
+        'auc_log': auc_log_trapezoid(t, C),
+        'cmax': float(C[i_max]),
+        'tmax': float(t[i_max]),
+        'cmax_per_dose': cmax_per_dose.tolist(),
+        'tmax_per_dose': tmax_per_dose.tolist(),
+        'trough_per_dose': trough_per_dose.tolist(),
+    }
+
+    if cme is not None:
+        metrics['time_above_cme'] = time_above(t, C, float(cme))
+    if cmt is not None:
+        metrics['time_above_cmt'] = time_above(t, C, float(cmt))
+
+    return metrics
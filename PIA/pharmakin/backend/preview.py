@@ -0,0 +1,198 @@
+"""
+Vista previa instantánea de simulaciones (tablas precalculadas)
+
+Mientras el usuario arrastra los controles de V, Q, dosis y ka no hace
+falta integrar la EDO en cada movimiento: el modelo es lineal, así que la
+curva de una dosis se puede escribir en variables adimensionales como
+
+    C(t) = (dosis / V) * f(tau, r),   tau = t / t_half,   r = ka / k
+
+con k = Q/V y t_half = ln(2)/k. La tabla f(tau, r) se calcula una sola vez
+(forma cerrada del modelo de absorción de primer orden) y cualquier
+posición de los controles se responde por interpolación bilineal en
+(log2 r, tau). Las dosis múltiples se suman desplazando tau
+(superposición). Después se ejecuta la simulación completa para refinar.
+
+Fuera del rango de la tabla (r fuera de [2^-8, 2^8]) o sin eliminación
+(Q = 0, donde tau no está definido) se evalúa directamente la forma
+cerrada, que es el límite exacto del modelo en esos casos.
+"""
+
+import threading
+from typing import Optional
+
+import numpy as np
+
+LN2 = np.log(2.0)
+
+# Malla de la tabla: r = ka/k en escala log2 y tau en vidas medias
+LOG2_R_MIN, LOG2_R_MAX, LOG2_R_STEP = -8.0, 8.0, 0.25
+TAU_MAX, TAU_STEP = 24.0, 1.0 / 32
+# Cerca de tau = 0 los nodos son geométricos (4 por octava) desde 2^-14:
+# con absorción rápida (r grande) todo el ascenso cabe en la primera celda
+TAU_LOG2_MIN = -14
+
+# Fracción de ka que se absorbe por vía tópica (ver simulate_pharmacokinetics)
+TOPICAL_FACTOR = 0.3
+
+
+def closed_form(s: np.ndarray, ka: float, k: float) -> np.ndarray:
+    """
+    C * V / dosis de una dosis de primer orden en el tiempo `s` tras la dosis:
+    ka/(ka-k) * (e^(-k*s) - e^(-ka*s)), con límite ka*s*e^(-k*s) si ka = k
+    (expm1 evita la cancelación con ka ~ k). Vale también con k = 0.
+    """
+    s = np.maximum(s, 0.0)
+    d = ka - k
+    absorbed = -np.expm1(-d * s) / d if d != 0 else s
+    return ka * np.exp(-k * s) * absorbed
+
+
+class PreviewTable:
+    """
+    Tabla f(tau, r) de curvas normalizadas de una dosis oral.
+
+    Atributos:
+    ----------
+    log2_r : np.ndarray
+        Nodos de log2(ka/k)
+    tau : np.ndarray
+        Nodos de tiempo en vidas medias
+    values : np.ndarray
+        Arreglo (len(log2_r), len(tau)) con C * V / dosis
+    """
+
+    def __init__(self):
+        self.log2_r = np.arange(LOG2_R_MIN, LOG2_R_MAX + LOG2_R_STEP / 2, LOG2_R_STEP)
+        near_zero = 2.0 ** np.arange(TAU_LOG2_MIN, np.log2(TAU_STEP), 0.25)
+        uniform = np.arange(0, TAU_MAX + TAU_STEP / 2, TAU_STEP)
+        self.tau = np.concatenate(([0.0], near_zero, uniform[1:]))
+
+        # f = r/(r-1) * (e^(-ln2*tau) - e^(-r*ln2*tau)); con r = 1 el límite
+        # es ln2*tau*e^(-ln2*tau). expm1 evita la cancelación con r ~ 1
+        r = 2.0 ** self.log2_r[:, None]
+        x = LN2 * self.tau[None, :]
+        elimination = np.exp(-x)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            absorbed = -np.expm1(-(r - 1) * x) / (r - 1)
+        absorbed = np.where(r == 1.0, x, absorbed)
+        self.values = np.ascontiguousarray(r * elimination * absorbed)
+
+        # La fase terminal decae con la menor de las dos constantes, para
+        # extrapolar más allá de TAU_MAX
+        self._tail_rate = LN2 * np.minimum(1.0, 2.0 ** self.log2_r)
+
+    def curve(self, tau: np.ndarray, r: float) -> np.ndarray:
+        """
+        f(tau, r) por interpolación bilineal (r se limita al rango de la
+        tabla; fuera de él preview_simulation usa `closed_form`).
+
+        Parámetros:
+        -----------
+        tau : np.ndarray
+            Tiempos en vidas medias (los negativos dan 0)
+        r : float
+            Cociente ka/k
+
+        Retorna:
+        --------
+        np.ndarray
+            Concentración normalizada C * V / dosis en cada tiempo
+        """
+        # Fila fraccionaria en log2 r
+        x = (np.clip(np.log2(r), LOG2_R_MIN, LOG2_R_MAX) - LOG2_R_MIN) / LOG2_R_STEP
+        i = min(int(x), len(self.log2_r) - 2)
+        wx = x - i
+
+        # Columna fraccionaria en tau
+        tau = np.asarray(tau, dtype=float)
+        clipped = np.clip(tau, 0.0, TAU_MAX)
+        j = np.minimum(np.searchsorted(self.tau, clipped, side='right') - 1, len(self.tau) - 2)
+        wy = (clipped - self.tau[j]) / (self.tau[j + 1] - self.tau[j])
+
+        rows = self.values[i:i + 2]
+        lower = rows[:, j] * (1 - wy) + rows[:, j + 1] * wy
+        f = lower[0] * (1 - wx) + lower[1] * wx
+
+        # Cola exponencial fuera de la tabla y nada antes de la dosis
+        beyond = tau > TAU_MAX
+        if beyond.any():
+            rate = self._tail_rate[i] * (1 - wx) + self._tail_rate[i + 1] * wx
+            f = np.where(beyond, f * np.exp(-rate * (tau - TAU_MAX)), f)
+        return np.where(tau >= 0, f, 0.0)
+
+
+_table: Optional[PreviewTable] = None
+_table_lock = threading.Lock()
+
+
+def preview_table() -> PreviewTable:
+    """Tabla compartida, construida en el primer uso."""
+    global _table
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                _table = PreviewTable()
+    return _table
+
+
+def preview_simulation(
+    t_max: float,
+    dt: float,
+    V: float,
+    Q: float,
+    dose: float,
+    route: str,
+    ka: float = None,
+    num_doses: int = 1,
+    interval: float = 0.0,
+    **_ignored
+) -> dict:
+    """
+    Curva aproximada de concentración para los parámetros dados.
+
+    Acepta los mismos argumentos que `simulate_pharmacokinetics` (los que
+    no afectan la curva se ignoran) y usa la misma malla de tiempos, así
+    que la simulación completa puede reemplazar la vista previa punto a
+    punto. Lanza ValueError si V <= 0 o Q < 0. La vía IV no necesita tabla: cada bolo decae como e^(-k*t),
+    con la misma condición inicial que la serie 'exact' (ver más abajo).
+
+    Retorna:
+    --------
+    dict
+        {'time': [...], 'concentration': [...], 'preview': True}
+    """
+    if V <= 0 or Q < 0:
+        raise ValueError('La vista previa requiere V > 0 y Q >= 0')
+    t = np.arange(0, t_max + dt, dt)
+    k = Q / V
+    ka_effective = ka if ka is not None else 1.0
+
+    C = np.zeros_like(t)
+    nodes = np.arange(len(t))
+    for i in range(num_doses):
+        s = t - i * interval
+        if route == 'iv':
+            # Como en la serie 'exact', el bolo ocupa los nodos a menos de
+            # dt/2 de la dosis y la regla del trapecio le da medio peso en
+            # ese nodo; en t[0] (extremo de la integral) el medio peso se
+            # mantiene en toda la curva y C(t[0]) es la condición inicial 0
+            for j in np.flatnonzero(np.abs(t - i * interval) < dt / 2):
+                if j == 0:
+                    weight = np.where(nodes > 0, 0.5, 0.0)
+                else:
+                    weight = np.where(nodes > j, 1.0, np.where(nodes == j, 0.5, 0.0))
+                C += weight * np.exp(-k * np.maximum(t - t[j], 0.0))
+        elif route in ('oral', 'topical'):
+            rate = ka_effective * (TOPICAL_FACTOR if route == 'topical' else 1.0)
+            r = rate / k if k > 0 else np.inf
+            if r > 0 and LOG2_R_MIN <= np.log2(r) <= LOG2_R_MAX:
+                C += preview_table().curve(s * k / LN2, r)
+            else:
+                C += np.where(s >= 0, closed_form(s, rate, k), 0.0)
+
+    return {
+        'time': t.tolist(),
+        'concentration': (C * (dose / V)).tolist(),
+        'preview': True
+    }
@@ -0,0 +1,138 @@
+"""
+Caché de puntos de control (checkpoints) para re-simulación incremental
+
+Cuando el usuario solo agrega dosis o extiende t_max, la parte inicial de
+la curva no cambia: la entrada u(t) hasta la primera dosis distinta es la
+misma. Este módulo guarda las series ya calculadas por cada "prefijo" de
+parámetros (vía, V, Q, ka, dosis, dt, intervalo, ...) y determina desde
+qué punto de la malla se puede reanudar la integración, de modo que solo
+se calcula el tramo nuevo y se concatena al anterior.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+
+class CheckpointCache:
+    """
+    Caché LRU de trayectorias por prefijo de parámetros.
+
+    Cada entrada guarda la malla `t`, el número de dosis con el que se
+    calculó y un arreglo por serie ('exact', 'euler', 'runge_kutta').
+    Cualquier punto de esas series anterior a la primera dosis que
+    difiera es un estado válido para reanudar (en particular, el estado
+    en cada frontera de dosis).
+
+    Como t_max y dt los elige el cliente, la caché se acota también por
+    el total de bytes de los arreglos guardados, y no guarda trayectorias
+    mayores que `max_entry_bytes`.
+
+    Parámetros:
+    -----------
+    maxsize : int
+        Número máximo de trayectorias
+    max_bytes : int
+        Total máximo de bytes de los arreglos en caché
+    max_entry_bytes : int, opcional
+        Tamaño máximo de una trayectoria (por defecto max_bytes // 8)
+    """
+
+    def __init__(self, maxsize: int = 32, max_bytes: int = 64 * 2 ** 20,
+                 max_entry_bytes: Optional[int] = None):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes if max_entry_bytes is not None else max_bytes // 8
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        self._entries: "OrderedDict[Hashable, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def resume_point(
+        self,
+        key: Hashable,
+        t: np.ndarray,
+        num_doses: int,
+        interval: float,
+        dt: float
+    ) -> Tuple[int, Optional[Dict[str, np.ndarray]]]:
+        """
+        Busca el último índice de `t` cuyo estado ya está calculado.
+
+        Parámetros:
+        -----------
+        key : Hashable
+            Prefijo de parámetros que determina u(t) y los integradores
+        t : np.ndarray
+            Malla de tiempos de la nueva simulación
+        num_doses : int
+            Número de dosis de la nueva simulación
+        interval : float
+            Intervalo entre dosis (horas)
+        dt : float
+            Paso de tiempo (horas)
+
+        Retorna:
+        --------
+        tuple
+            (índice r, series en caché). Si r > 0, los valores de las
+            series hasta r (inclusive) son válidos para la nueva malla y
+            la integración puede reanudarse desde t[r]. (0, None) si no
+            hay nada reutilizable.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            else:
+                self.misses += 1
+        if entry is None:
+            return 0, None
+
+        cached_t = entry['t']
+        last = min(len(cached_t), len(t)) - 1
+
+        if entry['num_doses'] != num_doses:
+            # Las series coinciden hasta justo antes de la primera dosis que
+            # solo está en una de las dos simulaciones. Un bolo IV empieza a
+            # contar medio paso antes de su tiempo nominal.
+            first_diff = min(entry['num_doses'], num_doses) * interval
+            last = min(last, int(np.searchsorted(t, first_diff - dt / 2, side='left')) - 1)
+
+        # Las mallas deben coincidir punto a punto en el tramo reutilizado
+        reusable = last >= 1 and np.array_equal(cached_t[:last + 1], t[:last + 1])
+        with self._lock:
+            if reusable:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return (last, entry['series']) if reusable else (0, None)
+
+    def store(self, key: Hashable, t: np.ndarray, num_doses: int, series: Dict[str, np.ndarray]) -> None:
+        """
+        Guarda (o reemplaza) la trayectoria calculada para `key`; las
+        trayectorias mayores que `max_entry_bytes` no se guardan.
+        """
+        nbytes = t.nbytes + sum(C.nbytes for C in series.values())
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.nbytes -= previous['nbytes']
+            if nbytes > self.max_entry_bytes:
+                return
+            self._entries[key] = {'t': t, 'num_doses': num_doses, 'series': series, 'nbytes': nbytes}
+            self.nbytes += nbytes
+            while len(self._entries) > self.maxsize or self.nbytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= evicted['nbytes']
+
+    def clear(self) -> None:
+        """Vacía la caché y reinicia los contadores."""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
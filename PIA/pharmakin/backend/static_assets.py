@@ -0,0 +1,122 @@
+"""
+Servidor de archivos estáticos del frontend
+Indexa la carpeta del build (frontend/dist o static) una sola vez al
+arrancar y sirve cada petición desde ese índice en memoria, sin llamadas
+a os.path.exists / os.stat por petición:
+
+- Variantes precomprimidas (.br / .gz) si existen junto al archivo.
+- Assets con hash en el nombre (p. ej. index-Dntbf4lO.js) con
+  Cache-Control "immutable" de un año.
+- index.html y el resto con ETag y respuesta 304 para If-None-Match.
+"""
+
+import hashlib
+import mimetypes
+import os
+import re
+from typing import Dict, Optional
+
+from flask import Response
+
+# Vite agrega al nombre de los assets un hash base64url de 8 caracteres
+# (p. ej. index-Dntbf4lO.js); otros bundlers, un hash hexadecimal. Se exige
+# al menos un dígito, mayúscula o '_' para no confundir palabras como
+# logo-original.png con un hash
+HASHED_NAME = re.compile(
+    r'[-.](?:[0-9a-f]{8,}|(?=[a-z-]{0,7}[0-9A-Z_])[A-Za-z0-9_-]{8})\.[A-Za-z0-9]+$')
+
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE = 'no-cache'
+
+# Codificaciones precomprimidas en orden de preferencia
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+class StaticFile:
+    """Un archivo del build con su contenido y metadatos precalculados."""
+
+    __slots__ = ('data', 'mimetype', 'etag', 'cache_control', 'encoded')
+
+    def __init__(self, data: bytes, mimetype: str, cache_control: str):
+        self.data = data
+        self.mimetype = mimetype
+        self.etag = hashlib.sha1(data).hexdigest()[:20]
+        self.cache_control = cache_control
+        # Variantes precomprimidas: codificación -> bytes
+        self.encoded: Dict[str, bytes] = {}
+
+
+class StaticIndex:
+    """
+    Índice en memoria de la carpeta estática.
+
+    Parámetros:
+    -----------
+    root : str
+        Carpeta del build del frontend
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.files: Dict[str, StaticFile] = {}
+        self._scan()
+
+    @property
+    def index_html(self) -> Optional[StaticFile]:
+        return self.files.get('index.html')
+
+    def _scan(self) -> None:
+        compressed_suffixes = tuple(suffix for _, suffix in ENCODINGS)
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if name.endswith(compressed_suffixes):
+                    continue
+                full = os.path.join(dirpath, name)
+                rel = os.path.relpath(full, self.root).replace(os.sep, '/')
+                with open(full, 'rb') as f:
+                    data = f.read()
+
+                mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+                cache = IMMUTABLE_CACHE if HASHED_NAME.search(name) and rel != 'index.html' else REVALIDATE_CACHE
+                entry = StaticFile(data, mimetype, cache)
+
+                for encoding, suffix in ENCODINGS:
+                    if name + suffix in filenames:
+                        with open(full + suffix, 'rb') as f:
+                            entry.encoded[encoding] = f.read()
+
+                self.files[rel] = entry
+
+    def lookup(self, path: str) -> Optional[StaticFile]:
+        """Archivo para `path`; las rutas desconocidas reciben index.html (SPA)."""
+        return self.files.get(path) or self.index_html
+
+    def response(self, path: str, request) -> Optional[Response]:
+        """
+        Construye la respuesta para `path` según las cabeceras de `request`
+        (If-None-Match, Accept-Encoding). None si no hay index.html.
+        """
+        entry = self.lookup(path)
+        if entry is None:
+            return None
+
+        data, encoding = entry.data, None
+        for candidate, _ in ENCODINGS:
+            if candidate in entry.encoded and candidate in request.accept_encodings:
+                data, encoding = entry.encoded[candidate], candidate
+                break
+        # Cada representación (br, gzip, sin comprimir) tiene su propia ETag
+        etag = entry.etag if encoding is None else f'{entry.etag}-{encoding}'
+
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+        else:
+            response = Response(data, mimetype=entry.mimetype)
+            if encoding is not None:
+                response.headers['Content-Encoding'] = encoding
+        if entry.encoded:
+            response.vary.add('Accept-Encoding')
+
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = entry.cache_control
+        return response
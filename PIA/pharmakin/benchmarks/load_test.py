@@ -0,0 +1,420 @@
+#!/usr/bin/env python
+"""
+Pruebas de carga y latencia de la API de PharmaKin
+
+Reproduce cargas de trabajo realistas contra la aplicación Flask de
+`backend/app.py` con concurrencia configurable:
+
+- slider:  ráfagas de /api/simulate mientras se arrastra un control
+           (dosis, V o Q cambian un poco en cada petición)
+- catalog: listado compacto del catálogo y detalle de varios fármacos,
+           revalidando con If-None-Match lo que ya se descargó
+- search:  búsqueda letra por letra (una petición por tecla)
+- mixed:   mezcla de las tres (50% / 30% / 20%)
+
+El destino puede ser el cliente de pruebas de Flask (en el mismo proceso),
+un servidor local real (werkzeug en un hilo) o la URL de un servidor ya en
+marcha (p. ej. `uvicorn asgi:app`). El informe incluye req/s, percentiles
+de latencia globales y por endpoint y, si la aplicación corre en este
+proceso, los tiempos por etapa de la simulación (instrumentation.py).
+
+Los resultados se guardan como línea base JSON y se comparan con una
+anterior para detectar regresiones (código de salida 1).
+
+Uso:
+    python load_test.py --workload mixed --target client --requests 400
+    python load_test.py --target server --concurrency 8 --save baselines/mixed-server.json
+    python load_test.py --target http://localhost:5000 --compare baselines/mixed-server.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# (etiqueta del endpoint, método, ruta con consulta, cuerpo JSON o None)
+Request = Tuple[str, str, str, Optional[dict]]
+
+# Pesos de cada tipo de sesión en la carga 'mixed'
+MIXED_WEIGHTS = {'slider': 0.5, 'catalog': 0.3, 'search': 0.2}
+
+# Las etapas con menos muestras o diferencias menores a este umbral (ms)
+# no se consideran regresión: son ruido de medición
+MIN_STAGE_SAMPLES = 20
+MIN_DELTA_MS = 0.1
+
+
+# -----------------------------
+# SESIONES DE USUARIO
+# -----------------------------
+
+def slider_session(rng: random.Random, principles: List[dict]) -> List[Request]:
+    """Arrastre de un control del panel principal: 8 a 15 simulaciones seguidas."""
+    principle = rng.choice(principles)
+    pk = principle['pharmacokinetic_params']
+    num_doses, interval = rng.choice([(1, 0.0), (3, 8.0), (4, 6.0)])
+    body = {
+        't_max': num_doses * interval + 12, 'dt': 0.1,
+        'V': pk['volume'], 'Q': pk['clearance'], 'dose': 500.0,
+        'route': 'oral', 'ka': pk.get('ka'),
+        'num_doses': num_doses, 'interval': interval
+    }
+    control = rng.choice(['dose', 'V', 'Q'])
+    step = body[control] * rng.uniform(0.01, 0.05) * rng.choice([-1, 1])
+    requests = []
+    for _ in range(rng.randint(8, 15)):
+        body = dict(body, **{control: round(max(body[control] + step, 0.1), 3)})
+        requests.append(('/api/simulate', 'POST', '/api/simulate', body))
+    return requests
+
+
+def catalog_session(rng: random.Random, principles: List[dict]) -> List[Request]:
+    """Listado compacto y detalle de 2 a 5 fármacos (el listado se revalida al volver)."""
+    listing = ('/api/active-principles', 'GET', '/api/active-principles?view=compact', None)
+    requests = [listing]
+    for principle in rng.sample(principles, min(len(principles), rng.randint(2, 5))):
+        requests.append(('/api/active-principles/<id>', 'GET',
+                         f"/api/active-principles/{principle['id']}", None))
+        requests.append(listing)
+    return requests
+
+
+def search_session(rng: random.Random, principles: List[dict]) -> List[Request]:
+    """Búsqueda tecla a tecla del nombre de un fármaco (3 a 8 letras)."""
+    name = rng.choice(principles)['commercial_name'].lower()
+    letters = min(len(name), rng.randint(3, 8))
+    return [('/api/active-principles/search', 'GET',
+             '/api/active-principles/search?q=' + urllib.request.quote(name[:i]), None)
+            for i in range(1, letters + 1)]
+
+
+SESSIONS: Dict[str, Callable[[random.Random, List[dict]], List[Request]]] = {
+    'slider': slider_session,
+    'catalog': catalog_session,
+    'search': search_session,
+}
+WORKLOADS = tuple(SESSIONS) + ('mixed',)
+
+
+def build_sessions(workload: str, total: int, principles: List[dict], seed: int = 0) -> List[List[Request]]:
+    """Sesiones deterministas (según `seed`) hasta sumar al menos `total` peticiones."""
+    rng = random.Random(seed)
+    names, weights = zip(*MIXED_WEIGHTS.items())
+    sessions, count = [], 0
+    while count < total:
+        kind = rng.choices(names, weights)[0] if workload == 'mixed' else workload
+        session = SESSIONS[kind](rng, principles)
+        sessions.append(session)
+        count += len(session)
+    return sessions
+
+
+# -----------------------------
+# DESTINOS
+# -----------------------------
+
+class ClientTransport:
+    """Cliente de pruebas de Flask (sin red); uno por hilo de carga."""
+
+    def __init__(self, flask_app):
+        self._client = flask_app.test_client()
+        self._etags: Dict[str, str] = {}
+
+    def send(self, method: str, path: str, body: Optional[dict]) -> int:
+        headers = {'If-None-Match': self._etags[path]} if path in self._etags else {}
+        response = self._client.open(path, method=method, json=body, headers=headers)
+        if response.headers.get('ETag'):
+            self._etags[path] = response.headers['ETag']
+        return response.status_code
+
+
+class HTTPTransport:
+    """Peticiones HTTP reales a `base_url`; uno por hilo de carga."""
+
+    def __init__(self, base_url: str):
+        self._base_url = base_url.rstrip('/')
+        self._etags: Dict[str, str] = {}
+
+    def send(self, method: str, path: str, body: Optional[dict]) -> int:
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        request = urllib.request.Request(self._base_url + path, data=data, method=method)
+        if data is not None:
+            request.add_header('Content-Type', 'application/json')
+        if path in self._etags:
+            request.add_header('If-None-Match', self._etags[path])
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                status, etag = response.status, response.headers.get('ETag')
+        except urllib.error.HTTPError as e:
+            e.read()
+            status, etag = e.code, e.headers.get('ETag')
+        if etag:
+            self._etags[path] = etag
+        return status
+
+
+class LocalServer:
+    """Servidor werkzeug con hilos en un puerto libre de 127.0.0.1."""
+
+    def __init__(self, flask_app):
+        from werkzeug.serving import WSGIRequestHandler, make_server
+
+        class QuietHandler(WSGIRequestHandler):
+            # Una línea de registro por petición distorsiona la medición
+            def log_request(self, *args, **kwargs):
+                pass
+
+        self._server = make_server('127.0.0.1', 0, flask_app, threaded=True, request_handler=QuietHandler)
+        self.url = f'http://127.0.0.1:{self._server.port}'
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def __enter__(self) -> 'LocalServer':
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._thread.join()
+
+
+# -----------------------------
+# EJECUCIÓN E INFORME
+# -----------------------------
+
+def _percentiles_ms(seconds: List[float]) -> dict:
+    values = np.asarray(seconds) * 1000.0
+    if len(values) == 0:
+        return {'count': 0, 'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {'count': int(len(values)), 'mean': float(values.mean()),
+            'p50': float(p50), 'p95': float(p95), 'p99': float(p99)}
+
+
+def environment() -> dict:
+    """Datos de la máquina para saber si dos líneas base son comparables."""
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def run_load(
+    workload: str = 'mixed',
+    target: str = 'client',
+    concurrency: int = 4,
+    requests: int = 200,
+    seed: int = 0
+) -> dict:
+    """
+    Ejecuta una prueba de carga.
+
+    Parámetros:
+    -----------
+    workload : str
+        'slider', 'catalog', 'search' o 'mixed'
+    target : str
+        'client' (cliente de pruebas de Flask), 'server' (servidor local
+        en un hilo) o la URL base de un servidor en marcha
+    concurrency : int
+        Usuarios simultáneos (hilos), cada uno reproduce sesiones completas
+    requests : int
+        Número mínimo de peticiones (se completan las sesiones empezadas)
+    seed : int
+        Semilla de las sesiones generadas
+
+    Retorna:
+    --------
+    dict
+        Resultado con throughput, percentiles (ms) globales, por endpoint
+        y por etapa de la simulación (None si el servidor es externo)
+    """
+    if workload not in WORKLOADS:
+        raise ValueError(f'Carga de trabajo desconocida: {workload}')
+
+    in_process = target in ('client', 'server')
+    server = None
+    if in_process:
+        import app as backend
+        import instrumentation
+        flask_app = backend.app
+        principles = backend.catalog.refresh().page(compact=True)[0]
+        if target == 'server':
+            server = LocalServer(flask_app).__enter__()
+            make_transport = lambda: HTTPTransport(server.url)
+        else:
+            make_transport = lambda: ClientTransport(flask_app)
+    else:
+        with urllib.request.urlopen(target.rstrip('/') + '/api/active-principles?view=compact') as r:
+            principles = json.loads(r.read())
+        make_transport = lambda: HTTPTransport(target)
+
+    sessions = build_sessions(workload, requests, principles, seed)
+    queue_lock = threading.Lock()
+    pending = list(reversed(sessions))
+    samples: List[Tuple[str, float, int]] = []
+
+    def user() -> List[Tuple[str, float, int]]:
+        transport = make_transport()
+        measured = []
+        while True:
+            with queue_lock:
+                if not pending:
+                    return measured
+                session = pending.pop()
+            for label, method, path, body in session:
+                start = time.perf_counter()
+                status = transport.send(method, path, body)
+                measured.append((label, time.perf_counter() - start, status))
+
+    if in_process:
+        instrumentation.reset()
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            for measured in pool.map(lambda _: user(), range(concurrency)):
+                samples.extend(measured)
+        duration = time.perf_counter() - start
+    finally:
+        if server is not None:
+            server.__exit__(None, None, None)
+
+    by_endpoint: Dict[str, List[float]] = {}
+    for label, seconds, _ in samples:
+        by_endpoint.setdefault(label, []).append(seconds)
+
+    stages = None
+    if in_process:
+        stages = {
+            name: {'count': s['count'], 'p50': s['p50'] * 1000.0, 'p99': s['p99'] * 1000.0}
+            for name, s in instrumentation.snapshot().get('stage', {}).items()
+        }
+
+    return {
+        'workload': workload,
+        'target': target if in_process else 'url',
+        'concurrency': concurrency,
+        'requests': len(samples),
+        'seed': seed,
+        'environment': environment(),
+        'duration_s': duration,
+        'throughput_rps': len(samples) / duration if duration > 0 else 0.0,
+        'errors': sum(1 for _, _, status in samples if status >= 400),
+        'latency_ms': _percentiles_ms([s for _, s, _ in samples]),
+        'endpoints': {label: _percentiles_ms(values) for label, values in sorted(by_endpoint.items())},
+        'stages': stages,
+    }
+
+
+def compare_to_baseline(result: dict, baseline: dict, tolerance: float = 0.25) -> List[str]:
+    """
+    Regresiones de `result` respecto a `baseline`, o lista vacía si no hay.
+
+    Se considera regresión un throughput menor, más errores o un percentil
+    mayor que la línea base en más de `tolerance` (fracción): p50 y p99
+    globales y por endpoint, y p50 por etapa de la simulación. El p99 es
+    más ruidoso (depende de la contención por el GIL), así que se le
+    permite el doble de tolerancia; por etapa solo se compara el p50.
+    """
+    problems = []
+    if result['throughput_rps'] < baseline['throughput_rps'] * (1 - tolerance):
+        problems.append(f"throughput: {result['throughput_rps']:.1f} req/s "
+                        f"(línea base {baseline['throughput_rps']:.1f})")
+    if result['errors'] > baseline['errors']:
+        problems.append(f"errores: {result['errors']} (línea base {baseline['errors']})")
+
+    def check(name: str, current: dict, reference: dict, quantiles=('p50', 'p99'), min_count: int = 1) -> None:
+        if current.get('count', 0) < min_count or reference.get('count', 0) < min_count:
+            return
+        for q in quantiles:
+            allowed = tolerance * (2 if q == 'p99' else 1)
+            if current[q] > reference[q] * (1 + allowed) and current[q] - reference[q] > MIN_DELTA_MS:
+                problems.append(f'{name} {q}: {current[q]:.2f} ms (línea base {reference[q]:.2f} ms)')
+
+    check('latencia', result['latency_ms'], baseline['latency_ms'])
+    for label, stats in result['endpoints'].items():
+        if label in baseline['endpoints']:
+            check(f'endpoint {label}', stats, baseline['endpoints'][label])
+    for name, stats in (result.get('stages') or {}).items():
+        if name in (baseline.get('stages') or {}):
+            check(f'etapa {name}', stats, baseline['stages'][name], ('p50',), MIN_STAGE_SAMPLES)
+    return problems
+
+
+def format_report(result: dict) -> str:
+    """Resumen legible del resultado."""
+    lat = result['latency_ms']
+    lines = [
+        f"Carga '{result['workload']}' contra {result['target']} "
+        f"({result['concurrency']} usuarios, {result['requests']} peticiones)",
+        f"  {result['throughput_rps']:.1f} req/s, errores: {result['errors']}",
+        f"  latencia p50 {lat['p50']:.2f} ms, p95 {lat['p95']:.2f} ms, p99 {lat['p99']:.2f} ms",
+        "  por endpoint:",
+    ]
+    for label, stats in result['endpoints'].items():
+        lines.append(f"    {label:<32} n={stats['count']:<5} p50 {stats['p50']:8.2f} ms  p99 {stats['p99']:8.2f} ms")
+    if result.get('stages'):
+        lines.append("  por etapa de la simulación:")
+        for name, stats in sorted(result['stages'].items()):
+            lines.append(f"    {name:<32} n={stats['count']:<5} p50 {stats['p50']:8.3f} ms  p99 {stats['p99']:8.3f} ms")
+    return '\n'.join(lines)
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Pruebas de carga de la API de PharmaKin")
+    p.add_argument("--workload", choices=WORKLOADS, default="mixed", help="carga de trabajo")
+    p.add_argument("--target", type=str, default="client",
+                   help="'client', 'server' o URL base de un servidor en marcha")
+    p.add_argument("--concurrency", type=int, default=4, help="usuarios simultáneos")
+    p.add_argument("--requests", type=int, default=200, help="número mínimo de peticiones")
+    p.add_argument("--seed", type=int, default=0, help="semilla de las sesiones")
+    p.add_argument("--save", type=str, help="guardar el resultado como línea base JSON")
+    p.add_argument("--compare", type=str, help="línea base JSON con la cual comparar")
+    p.add_argument("--tolerance", type=float, default=0.25,
+                   help="regresión permitida (fracción) antes de fallar")
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    result = run_load(args.workload, args.target, args.concurrency, args.requests, args.seed)
+    print(format_report(result))
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+        print(f"Línea base guardada en {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('environment') != result['environment']:
+            print("Aviso: la línea base se midió en otro entorno; la comparación es orientativa")
+        problems = compare_to_baseline(result, baseline, args.tolerance)
+        if problems:
+            print("Regresiones respecto a la línea base:")
+            for problem in problems:
+                print(f"  - {problem}")
+            sys.exit(1)
+        print("Sin regresiones respecto a la línea base")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+"""
+Micro-benchmarks de los integradores de PharmaKin (numerical_methods.py)
+
+Mide `exact_solution`, `euler_method`, `runge_kutta_4`, `calculate_error`
+y `simulate_pharmacokinetics` para mallas de n = 1e2 a 1e6 puntos, cada vía
+de administración y una o varias dosis. Por caso se reporta:
+
+- tiempo: el mejor de `repeat` ejecuciones (perf_counter)
+- asignaciones: pico de memoria reservada durante una ejecución (tracemalloc)
+- RSS: pico de memoria residente del proceso tras el caso (los casos se
+  ejecutan en orden creciente de n, así que el crecimiento es atribuible
+  al caso que lo produce; no disponible en Windows)
+
+y se compara el tiempo con una línea base JSON guardada (código de salida 1
+si algún caso es más lento que la línea base más la tolerancia).
+
+No es un archivo de pruebas (pytest no lo recolecta). Uso:
+    python tests/bench_numerical_methods.py
+    python tests/bench_numerical_methods.py --max-n 1000000 --functions runge_kutta_4
+    python tests/bench_numerical_methods.py --save PIA/pharmakin/benchmarks/baselines/numerical_methods.json
+
+Las líneas base se guardan junto a las del banco de carga (load_test.py),
+en PIA/pharmakin/benchmarks/baselines.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Añadir la carpeta del backend de PharmaKin al path para poder importar sus módulos
+tests_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.abspath(os.path.join(tests_dir, '..', 'PIA', 'pharmakin', 'backend'))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+import numerical_methods as nm  # type: ignore  # noqa: E402
+
+BASELINE_PATH = os.path.abspath(os.path.join(tests_dir, '..', 'PIA', 'pharmakin', 'benchmarks',
+                                             'baselines', 'numerical_methods.json'))
+
+FUNCTIONS = ('exact_solution', 'euler_method', 'runge_kutta_4', 'calculate_error', 'simulate_pharmacokinetics')
+N_VALUES = (100, 1000, 10000, 100000, 1000000)
+ROUTES = ('iv', 'oral', 'topical')
+NUM_DOSES = (1, 4)
+
+# Pauta común: 48 h con dosis cada 8 h (paracetamol oral)
+T_MAX, INTERVAL = 48.0, 8.0
+V, Q, KA, DOSE = 50.0, 20.0, 1.2, 500.0
+
+SOLVERS = {
+    'exact_solution': nm.exact_solution,
+    'euler_method': nm.euler_method,
+    'runge_kutta_4': nm.runge_kutta_4,
+}
+
+
+def case_name(function: str, n: int, route: Optional[str], num_doses: Optional[int]) -> str:
+    """Identificador estable del caso (clave de la línea base)."""
+    if route is None:
+        return f'{function}[n={n}]'
+    return f'{function}[n={n},route={route},doses={num_doses}]'
+
+
+def prepare(function: str, n: int, route: str, num_doses: int) -> Callable[[], object]:
+    """Prepara las entradas fuera de la medición y devuelve la llamada a medir."""
+    dt = T_MAX / n
+    if function == 'simulate_pharmacokinetics':
+        return lambda: nm.simulate_pharmacokinetics(
+            T_MAX, dt, V, Q, DOSE, route, ka=KA, num_doses=num_doses,
+            interval=INTERVAL, incremental=False)
+    if function == 'calculate_error':
+        rng = np.random.default_rng(0)
+        exact = rng.uniform(0.0, 10.0, n)
+        approximate = exact + rng.normal(0.0, 1e-3, n)
+        return lambda: nm.calculate_error(exact, approximate)
+
+    t = np.arange(n) * dt
+    u = nm.administration_rate(route, DOSE, KA, num_doses, INTERVAL, dt)
+    solver = SOLVERS[function]
+    return lambda: solver(t, V, Q, u, dt=dt)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Pico de memoria residente del proceso (MB), None si no se puede medir."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KB; macOS, bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def measure(call: Callable[[], object], repeat: int) -> dict:
+    """Tiempo (ms, mejor de `repeat`), pico de asignaciones y RSS (MB)."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        best = min(best, time.perf_counter() - start)
+
+    # Ejecución aparte: tracemalloc hace más lenta cada asignación
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {'time_ms': best * 1000.0, 'alloc_peak_mb': peak / (1024 * 1024), 'rss_peak_mb': peak_rss_mb()}
+
+
+def run_benchmarks(
+    functions=FUNCTIONS,
+    n_values=N_VALUES,
+    routes=ROUTES,
+    num_doses=NUM_DOSES,
+    repeat: int = 3,
+    progress: Callable[[str], None] = None
+) -> Dict[str, dict]:
+    """
+    Ejecuta todos los casos en orden creciente de n.
+
+    Con n > 1e4 se hace una sola repetición: a ese tamaño el tiempo de
+    los bucles de Python domina y el ruido relativo es pequeño.
+
+    Retorna:
+    --------
+    dict
+        {nombre del caso: {'time_ms', 'alloc_peak_mb', 'rss_peak_mb'}}
+    """
+    results = {}
+    for n in sorted(n_values):
+        for function in functions:
+            if function == 'calculate_error':
+                combos = [(None, None)]
+            else:
+                combos = [(route, d) for route in routes for d in num_doses]
+            for route, d in combos:
+                name = case_name(function, n, route, d)
+                if progress is not None:
+                    progress(name)
+                call = prepare(function, n, route, d)
+                results[name] = measure(call, repeat if n <= 10000 else 1)
+    return results
+
+
+def environment() -> dict:
+    """Datos de la máquina para saber si dos líneas base son comparables."""
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def comparison_table(results: Dict[str, dict], baseline: Optional[Dict[str, dict]] = None,
+                     tolerance: float = 0.25) -> Tuple[str, List[str]]:
+    """
+    Tabla de resultados frente a la línea base.
+
+    Retorna:
+    --------
+    tuple
+        (texto de la tabla, casos más lentos que la línea base más la tolerancia)
+    """
+    baseline = baseline or {}
+    width = max([len(name) for name in results] + [4])
+    header = (f"{'caso':<{width}}  {'tiempo ms':>11}  {'base ms':>11}  {'ratio':>6}  "
+              f"{'asign. MB':>9}  {'RSS MB':>8}")
+    lines = [header, '-' * len(header)]
+    regressions = []
+    for name, stats in results.items():
+        reference = baseline.get(name)
+        base, ratio, mark = '', '', ''
+        if reference is not None:
+            r = stats['time_ms'] / reference['time_ms'] if reference['time_ms'] > 0 else 1.0
+            base, ratio = f"{reference['time_ms']:11.3f}", f'{r:6.2f}'
+            if r > 1 + tolerance:
+                mark = '  << regresión'
+                regressions.append(name)
+        rss = f"{stats['rss_peak_mb']:8.1f}" if stats['rss_peak_mb'] is not None else f"{'-':>8}"
+        lines.append(f"{name:<{width}}  {stats['time_ms']:11.3f}  {base:>11}  {ratio:>6}  "
+                     f"{stats['alloc_peak_mb']:9.2f}  {rss}{mark}")
+    return '\n'.join(lines), regressions
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Micro-benchmarks de numerical_methods.py")
+    p.add_argument("--functions", nargs='+', choices=FUNCTIONS, default=list(FUNCTIONS),
+                   help="funciones a medir")
+    p.add_argument("--max-n", type=float, default=1e4,
+                   help="tamaño máximo de malla (hasta 1e6; desde 1e5 cada caso tarda segundos)")
+    p.add_argument("--routes", nargs='+', choices=ROUTES, default=list(ROUTES), help="vías de administración")
+    p.add_argument("--doses", nargs='+', type=int, default=list(NUM_DOSES), help="números de dosis")
+    p.add_argument("--repeat", type=int, default=3, help="repeticiones por caso (n <= 1e4)")
+    p.add_argument("--save", type=str, help="guardar los resultados como línea base JSON")
+    p.add_argument("--compare", type=str, default=BASELINE_PATH, help="línea base JSON con la cual comparar")
+    p.add_argument("--tolerance", type=float, default=0.25, help="regresión permitida (fracción)")
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    n_values = [n for n in N_VALUES if n <= args.max_n]
+    results = run_benchmarks(args.functions, n_values, args.routes, args.doses, args.repeat,
+                             progress=lambda name: print(f'  midiendo {name}', file=sys.stderr))
+
+    baseline = None
+    if args.compare and os.path.exists(args.compare):
+        with open(args.compare, encoding='utf-8') as f:
+            stored = json.load(f)
+        if stored.get('environment') != environment():
+            print("Aviso: la línea base se midió en otro entorno; la comparación es orientativa")
+        baseline = stored['cases']
+
+    table, regressions = comparison_table(results, baseline, args.tolerance)
+    print(table)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({'environment': environment(), 'cases': results}, f, indent=2)
+        print(f"Línea base guardada en {args.save}")
+
+    if regressions:
+        print(f"{len(regressions)} caso(s) más lentos que la línea base (tolerancia {args.tolerance:.0%})")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,11 @@
+import csv
 import math
 import os
 import sys
 
+import numpy as np
+import pytest
+
 # Añadir la carpeta 'Metodos de aproximacion' al path para poder importar el módulo
 tests_dir = os.path.dirname(__file__)
 module_dir = os.path.abspath(os.path.join(tests_dir, '..', 'Metodos de aproximacion'))
@@ -9,6 +13,8 @@ if module_dir not in sys.path:
     sys.path.insert(0, module_dir)
 
 import numerical_tools as nt  # type: ignore
+import run_convergence as rc  # type: ignore
+import vectorized_tools as vt  # type: ignore
 
 
 def test_exact_derivative_x_ln_x():
@@ -38,3 +44,326 @@ def test_exact_integral_1_plus_ln_x():
     I = nt.exact_integral_of_1_plus_ln_x(a, b)
     # valor conocido b ln b - a ln a
     assert math.isclose(I, b * math.log(b) - a * math.log(a), rel_tol=1e-12)
+
+
+def test_vectorized_rules_match_pure_math_references():
+    a, b = 1.0, 2.0
+    for n in (1, 5, 64):
+        # Con la función escalar de numerical_tools (respaldo punto a punto) y con la vectorizada
+        for f in (nt.f_1_plus_ln_x, vt.f_1_plus_ln_x):
+            assert math.isclose(vt.composite_midpoint(f, a, b, n),
+                                nt.composite_midpoint(nt.f_1_plus_ln_x, a, b, n), rel_tol=1e-12)
+            assert math.isclose(vt.composite_simpson(f, a, b, n),
+                                nt.composite_simpson(nt.f_1_plus_ln_x, a, b, n), rel_tol=1e-12)
+
+    exact = nt.exact_integral_of_1_plus_ln_x(a, b)
+    assert abs(vt.composite_simpson(vt.f_1_plus_ln_x, a, b, 500_000) - exact) < 1e-13
+
+    # Las constantes escalares se expanden a toda la malla
+    assert math.isclose(vt.composite_simpson(lambda x: 3.0, a, b, 4), 3.0, rel_tol=1e-12)
+    assert np.allclose(vt.evaluate(lambda x: 3.0, np.arange(3.0)), 3.0)
+
+
+def test_vectorized_bound_matches_sampling_reference():
+    def f4(x):
+        return 6.0 / (x ** 4)
+
+    assert math.isclose(vt.max_abs_on_interval(f4, 2.0, 1.0, 101),
+                        nt.max_abs_on_interval(f4, 2.0, 1.0, 101), rel_tol=1e-12)
+    # Los puntos fuera del dominio cuentan como infinito en ambas versiones
+    assert vt.max_abs_on_interval(nt.f_1_plus_ln_x, 0.0, 1.0) == nt.max_abs_on_interval(nt.f_1_plus_ln_x, 0.0, 1.0)
+    assert vt.max_abs_on_interval(lambda x: np.sin(x), 0.0, math.pi, 3) == 1.0
+
+
+def test_adaptive_quadrature_reaches_tolerance_with_few_evaluations():
+    # Cerca de a = 0 la derivada de 1 + ln x crece sin límite: las reglas de malla fija necesitan muchos nodos
+    a, b = 1e-6, 2.0
+    exact = nt.exact_integral_of_1_plus_ln_x(a, b)
+
+    for rule in (nt.adaptive_simpson, nt.adaptive_gauss_kronrod):
+        result = rule(nt.f_1_plus_ln_x, a, b, tol=1e-10)
+        assert abs(result.value - exact) < 1e-9
+        assert abs(result.value - exact) <= 10 * result.error + 1e-14
+        # Simpson compuesta con las mismas evaluaciones (2m + 1) queda lejos de esa precisión
+        m = result.evaluations // 2
+        assert abs(nt.composite_simpson(nt.f_1_plus_ln_x, a, b, m) - exact) > 1e-6
+
+    # Un polinomio de grado 3 es exacto para Simpson: no se subdivide más allá
+    # de min_depth (2^3 paneles, 3 + 2 * 15 evaluaciones)
+    cubic = nt.adaptive_simpson(lambda x: x ** 3 - x, 0.0, 2.0)
+    assert math.isclose(cubic.value, 2.0, rel_tol=1e-12) and cubic.evaluations == 33
+
+    # f se anula en los 5 puntos iniciales: sin profundidad mínima se aceptaría 0
+    aliased = nt.adaptive_simpson(lambda x: math.sin(4 * x) ** 2, 0.0, math.pi)
+    assert math.isclose(aliased.value, math.pi / 2, rel_tol=1e-9)
+
+
+def test_romberg_reuses_trapezoid_evaluations():
+    calls = []
+
+    def f(x):
+        calls.append(x)
+        return nt.f_1_plus_ln_x(x)
+
+    a, b = 1.0, 2.0
+    result = nt.romberg(f, a, b, tol=1e-10)
+    assert math.isclose(result.value, nt.exact_integral_of_1_plus_ln_x(a, b), rel_tol=1e-14)
+
+    # Cada punto de la malla final 2^k + 1 se evalúa una sola vez
+    k = len(result.tableau) - 1
+    assert result.evaluations == len(calls) == len(set(calls)) == 2 ** k + 1
+    assert result.tableau[0] == [nt.trapezoid_rule(nt.f_1_plus_ln_x, a, b)]
+    assert math.isclose(result.tableau[2][1], nt.composite_simpson(nt.f_1_plus_ln_x, a, b, 2), rel_tol=1e-13)
+    assert [len(row) for row in result.tableau] == list(range(1, k + 2))
+
+
+def test_gauss_legendre_nodes_are_cached_and_exact_for_polynomials(tmp_path):
+    nodes, weights = nt.gauss_legendre_nodes(12)
+    assert nt.gauss_legendre_nodes(12) is nt.gauss_legendre_nodes(12)
+    ref_nodes, ref_weights = np.polynomial.legendre.leggauss(12)
+    assert np.allclose(nodes, ref_nodes, atol=1e-15) and np.allclose(weights, ref_weights, atol=1e-14)
+
+    # Exacta hasta grado 2n - 1 = 23
+    assert math.isclose(nt.gauss_legendre(lambda x: x ** 23 + x ** 22, -1.0, 1.0, 12), 2.0 / 23, rel_tol=1e-13)
+
+    # Integrando suave: 10 nodos igualan a Simpson compuesta con 2001
+    exact = nt.exact_integral_of_1_plus_ln_x(1.0, 2.0)
+    assert abs(nt.gauss_legendre(nt.f_1_plus_ln_x, 1.0, 2.0, 10) - exact) < 1e-14
+    assert abs(nt.gauss_legendre(nt.f_1_plus_ln_x, 1e-6, 2.0, 20, panels=50)
+               - nt.exact_integral_of_1_plus_ln_x(1e-6, 2.0)) < 1e-4
+
+    batch = nt.gauss_legendre_batch([math.sin, math.exp], 0.0, 1.0, order=8, panels=2)
+    assert np.allclose(batch, [1 - math.cos(1.0), math.e - 1], rtol=1e-14)
+    assert np.allclose(vt.gauss_legendre(lambda x: np.vstack([np.sin(x), np.exp(x)]), 0.0, 1.0, 8, 2), batch,
+                       rtol=1e-14)
+    # Función solo escalar: la llamada con el arreglo falla una sola vez
+    array_calls = []
+
+    def scalar_only(x):
+        if not isinstance(x, float):
+            array_calls.append(x)
+        return nt.f_1_plus_ln_x(x)
+
+    assert math.isclose(vt.gauss_legendre(scalar_only, 1.0, 2.0, 10), exact, rel_tol=1e-14)
+    assert len(array_calls) == 1
+
+    # Persistencia de la tabla
+    path = tmp_path / "gauss_legendre.json"
+    nt.save_gauss_legendre_cache(str(path))
+    nt._GAUSS_LEGENDRE_CACHE.clear()
+    assert nt.load_gauss_legendre_cache(str(path)) >= 1
+    assert nt.gauss_legendre_nodes(12) == (nodes, weights)
+
+
+def test_memoized_function_evaluates_each_point_once():
+    calls = []
+
+    def f(x):
+        calls.append(x)
+        return nt.f_x_ln_x(x)
+
+    g = nt.memoize(f, maxsize=3)
+    x0, h = 2.0, 0.1
+    for formula in (nt.forward_difference, nt.backward_difference, nt.central_difference,
+                    nt.three_point_forward, nt.three_point_backward):
+        assert formula(g, x0, h) == formula(nt.f_x_ln_x, x0, h)
+
+    # 12 llamadas sobre 5 puntos distintos; con maxsize=3 algunos se descartan (LRU)
+    info = g.cache_info()
+    assert info["hits"] + info["misses"] == 12 and info["evaluations"] == len(calls)
+    assert info["size"] == 3 and info["misses"] > 5
+
+    g = nt.memoize(f)
+    calls.clear()
+    nt.max_abs_on_interval(g, 1.0, 2.0, 50)
+    nt.max_abs_on_interval(g, 1.0, 2.0, 50)
+    assert len(calls) == 50 and g.hits == 50
+
+    g.clear()
+    assert g.cache_info()["evaluations"] == 0 and g(2.0) == nt.f_x_ln_x(2.0)
+
+    # Con arreglos se cuenta cada elemento: el intento vectorizado fallido
+    # de math.exp (21 nodos) más la evaluación punto a punto (21)
+    g = nt.memoize(math.exp)
+    vt.composite_simpson(g, 0.0, 1.0, 10)
+    assert g.evaluations == 42 and g.misses == 21
+    g = nt.memoize(np.exp)
+    vt.composite_simpson(g, 0.0, 1.0, 10)
+    assert g.evaluations == 21 and g.misses == 0
+
+
+def test_ridders_derivative_picks_step_automatically():
+    x0 = 2.0
+    exact = nt.exact_derivative_x_ln_x(x0)
+    result = nt.ridders_derivative(nt.f_x_ln_x, x0, h=0.5)
+    assert abs(result.value - exact) < 1e-13
+    assert abs(result.value - exact) <= 10 * result.error
+    assert result.evaluations <= 20 and 0 < result.step < 0.5
+
+    # Mejor que el mejor h de un barrido manual de la diferencia central (22 evaluaciones)
+    sweep = min(abs(nt.central_difference(nt.f_x_ln_x, x0, 10.0 ** -k) - exact) for k in range(1, 12))
+    assert abs(result.value - exact) < sweep
+
+    # Lote de puntos: mismo resultado que punto a punto
+    x = np.linspace(0.5, 5.0, 7)
+    batch = vt.ridders_derivative(vt.f_x_ln_x, x, h=0.1)
+    scalar = [nt.ridders_derivative(nt.f_x_ln_x, xi, h=0.1) for xi in x]
+    assert np.allclose(batch.value, 1.0 + np.log(x), rtol=0, atol=1e-12)
+    assert np.allclose(batch.value, [r.value for r in scalar], rtol=1e-14)
+    assert np.all((batch.step > 0) & (batch.step <= 0.1))
+    assert batch.error.shape == batch.evaluations.shape == x.shape
+    assert np.all(batch.evaluations >= max(r.evaluations for r in scalar))
+
+    # El paso por defecto no crece con |x|: funciones oscilantes lejos del origen
+    assert abs(nt.ridders_derivative(math.sin, 100.0).value - math.cos(100.0)) < 1e-10
+    far = vt.ridders_derivative(np.sin, np.array([100.0, 1000.0]))
+    assert np.allclose(far.value, np.cos([100.0, 1000.0]), rtol=0, atol=1e-10)
+
+
+def test_grid_derivative_shares_stencil_evaluations():
+    evaluated = []
+
+    def f(x):
+        evaluated.extend(np.atleast_1d(x))
+        return vt.f_x_ln_x(x)
+
+    n = 21
+    x, five = vt.derivative_on_grid(f, 1.0, 3.0, n, "five_point")
+    assert len(evaluated) == n + 4
+    h = x[1] - x[0]
+
+    formulas = {
+        "forward": nt.forward_difference,
+        "backward": nt.backward_difference,
+        "central": nt.central_difference,
+        "three_point_forward": nt.three_point_forward,
+        "three_point_backward": nt.three_point_backward,
+    }
+    for method, formula in formulas.items():
+        _, values = vt.derivative_on_grid(nt.f_x_ln_x, 1.0, 3.0, n, method)
+        assert np.allclose(values, [formula(nt.f_x_ln_x, xi, h) for xi in x], rtol=1e-9)
+    assert np.max(np.abs(five - (1.0 + np.log(x)))) < 1e-4
+
+    # Tabla sin puntos extra: bordes con fórmulas descentradas del mismo orden
+    y = x * np.log(x)
+    central = vt.grid_derivative(y, h, "central")
+    assert math.isclose(central[0], nt.three_point_forward(nt.f_x_ln_x, x[0], h), rel_tol=1e-9)
+    assert math.isclose(central[-1], nt.three_point_backward(nt.f_x_ln_x, x[-1], h), rel_tol=1e-9)
+    assert np.allclose(central[1:-1], [nt.central_difference(nt.f_x_ln_x, xi, h) for xi in x[1:-1]], rtol=1e-9)
+    assert np.max(np.abs(vt.grid_derivative(y, h, "five_point") - (1.0 + np.log(x)))) < 1e-3
+    # Exacta para polinomios de grado 4 en todos los puntos, bordes incluidos
+    assert np.allclose(vt.grid_derivative(x ** 4, h, "five_point"), 4 * x ** 3, rtol=1e-10)
+
+    # Solo dentro de [a,b]: n evaluaciones y los mismos bordes que grid_derivative
+    evaluated.clear()
+    _, inner = vt.derivative_on_grid(f, 1.0, 3.0, n, "five_point", inside=True)
+    assert len(evaluated) == n and np.allclose(inner, vt.grid_derivative(y, h, "five_point"), rtol=1e-12)
+    # x*ln(x) no se puede evaluar a la izquierda de a = h: se pasa solo a la malla interior
+    small, near_zero = vt.derivative_on_grid(nt.f_x_ln_x, 0.01, 1.0, 100, "five_point")
+    assert small[0] == 0.01 and np.all(np.isfinite(near_zero))
+    assert np.allclose(near_zero, vt.grid_derivative(small * np.log(small), small[1] - small[0], "five_point"))
+    with pytest.raises(ValueError):
+        vt.derivative_on_grid(nt.f_x_ln_x, 0.01, 1.0, 100, "five_point", inside=False)
+
+
+def test_bound_on_interval_refines_caches_and_encloses():
+    vt.clear_bound_cache()
+    evaluated = []
+
+    def f(x):
+        evaluated.append(np.size(x))
+        return np.sin(5 * x) * np.exp(-x)
+
+    # Máximo interior: el refinamiento llega más cerca que 1000 muestras fijas
+    true_max = np.max(np.abs(f(np.linspace(0.0, 3.0, 2_000_001))))
+    evaluated.clear()
+    M = vt.bound_on_interval(f, 0.0, 3.0)
+    sampled = nt.max_abs_on_interval(lambda x: math.sin(5 * x) * math.exp(-x), 0.0, 3.0)
+    assert abs(M - true_max) < 1e-9 < abs(sampled - true_max)
+    assert sum(evaluated) < 1000
+
+    # Misma función e intervalo: se responde desde la caché sin evaluar
+    evaluated.clear()
+    assert vt.bound_on_interval(f, 3.0, 0.0) == M and evaluated == []
+
+    # Con extensión por intervalos la cota es garantizada (>= máximo real)
+    def g(x):
+        return x * (1.0 - x)
+
+    def g_enclosure(lo, hi):
+        # [lo, hi] * [1 - hi, 1 - lo] con ambos factores positivos en [0, 1]
+        return lo * (1.0 - hi), hi * (1.0 - lo)
+
+    upper = vt.bound_on_interval(g, 0.0, 1.0, samples=10, enclosure=g_enclosure)
+    assert 0.25 <= upper < 0.2501
+    d4 = lambda x: -6.0 / x ** 4
+    assert vt.bound_on_interval(d4, 1.0, 2.0, enclosure=vt.monotone_enclosure(d4)) == 6.0
+
+    # Muchas oscilaciones: se refinan todos los máximos locales de la malla
+    wave = lambda x: np.sin(50 * x) * x
+    true_wave = np.max(np.abs(wave(np.linspace(0.0, 3.0, 3_000_001))))
+    assert abs(vt.bound_on_interval(wave, 0.0, 3.0) - true_wave) < 1e-9
+
+    # La caché es LRU acotada
+    for k in range(vt.BOUND_CACHE_SIZE + 10):
+        vt.bound_on_interval(g, 0.0, 1.0 + k)
+    assert len(vt._BOUND_CACHE) == vt.BOUND_CACHE_SIZE
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_convergence_study_streams_rows_and_fits_orders(tmp_path, workers):
+    tasks = [("integration", "composite_midpoint", "1+ln x", n, 1.0, 2.0, None, False) for n in (4, 8, 16, 32)]
+    tasks += [("integration", "composite_simpson", "1+ln x", n, 1.0, 2.0, None, True) for n in (3, 8, 16)]
+    tasks += [("differentiation", "central_difference", "x ln x", h, None, None, 2.0, False)
+              for h in (0.2, 0.1, 0.05, 0.025)]
+    path = tmp_path / "study.csv"
+    orders = rc.run_study(iter(tasks), str(path), workers=workers, window=2)
+
+    with open(path, newline='', encoding='utf-8') as fh:
+        rows = list(csv.DictReader(fh))
+    assert len(rows) == len(tasks)
+    # Con varios procesos las filas llegan en orden de finalización
+    rows.sort(key=lambda r: (r["method"], float(r["h"] or 0.0)), reverse=True)
+    midpoint = [r for r in rows if r["method"] == "composite_midpoint"]
+    assert [int(r["evaluations"]) for r in midpoint] == [4, 8, 16, 32]
+    # Simpson redondea n a par: n = 3 -> 2 subintervalos, 3 evaluaciones
+    simpson = [r for r in rows if r["method"] == "composite_simpson"]
+    assert simpson[0]["n"] == "2" and int(simpson[0]["evaluations"]) == 3
+
+    assert abs(orders[("integration", "composite_midpoint", "1+ln x")][0] - 2.0) < 0.05
+    assert abs(orders[("integration", "composite_simpson", "1+ln x")][0] - 4.0) < 0.2
+    assert abs(orders[("differentiation", "central_difference", "x ln x")][0] - 2.0) < 0.05
+
+
+def test_compensated_summation_keeps_large_n_accuracy():
+    values = [1.0] + [1e-16] * 10_000
+    assert sum(values) == 1.0
+    for name in ("kahan", "neumaier", "fsum"):
+        assert math.isclose(nt.SUMMATION_METHODS[name](values), 1.0 + 1e-12, rel_tol=1e-15)
+    # Por parejas el error es O(log n) ulp: solo se pierden los términos del primer bloque
+    assert abs(nt.pairwise_sum(values) - (1.0 + 1e-12)) < 2e-14
+    # Neumaier sigue siendo exacta cuando un término supera a la suma acumulada
+    assert nt.neumaier_sum([1.0, 1e100, 1.0, -1e100]) == 2.0
+    assert nt.pairwise_sum(float(i) for i in range(1000)) == 499500.0
+
+    # Con n grande la acumulación directa se aleja del error de truncamiento
+    exact = math.sin(1.0)
+    m = 200_000
+    truncation = (1.0 / (2 * m)) ** 2 / 24 * exact
+    naive = abs(nt.composite_midpoint(math.cos, 0.0, 1.0, 2 * m) - exact)
+    compensated = abs(nt.composite_midpoint(math.cos, 0.0, 1.0, 2 * m, summation="neumaier") - exact)
+    assert naive > 2 * truncation and abs(compensated - truncation) < 0.05 * truncation
+
+    assert abs(nt.composite_simpson(math.cos, 0.0, 1.0, m, summation="kahan") - exact) < 1e-15
+    assert (abs(nt.composite_simpson(math.cos, 0.0, 1.0, m) - exact)
+            > 10 * abs(nt.composite_simpson(math.cos, 0.0, 1.0, m, summation="pairwise") - exact))
+
+    # Ambos módulos aceptan los mismos nombres (incluidos los sinónimos)
+    names = [*nt.SUMMATION_METHODS, *nt.SUMMATION_ALIASES]
+    for summation in names:
+        assert abs(vt.composite_simpson(np.cos, 0.0, 1.0, m, summation) - exact) < 1e-14
+        assert abs(nt.composite_midpoint(math.cos, 0.0, 1.0, 8, summation)
+                   - nt.composite_midpoint(math.cos, 0.0, 1.0, 8)) < 1e-15
+    for module in (nt, vt):
+        with pytest.raises(ValueError, match=", ".join(names)):
+            module.composite_midpoint(math.cos, 0.0, 1.0, 10, summation="desconocida")
@@ -0,0 +1,519 @@
+import asyncio
+import json
+import math
+import os
+import queue
+import struct
+import sys
+
+import numpy as np
+import pytest
+from flask import Flask, request
+
+# Añadir la carpeta del backend de PharmaKin al path para poder importar sus módulos
+tests_dir = os.path.dirname(__file__)
+backend_dir = os.path.abspath(os.path.join(tests_dir, '..', 'PIA', 'pharmakin', 'backend'))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+benchmarks_dir = os.path.abspath(os.path.join(tests_dir, '..', 'PIA', 'pharmakin', 'benchmarks'))
+if benchmarks_dir not in sys.path:
+    sys.path.insert(0, benchmarks_dir)
+
+import app as pharmakin_app  # type: ignore
+import asgi as pharmakin_asgi  # type: ignore
+import bench_numerical_methods as bench  # type: ignore
+import catalog as pk_catalog  # type: ignore
+import instrumentation  # type: ignore
+import live_channel  # type: ignore
+import load_test  # type: ignore
+import numerical_methods as nm  # type: ignore
+import pk_metrics  # type: ignore
+import preview  # type: ignore
+import simulation_cache  # type: ignore
+import static_assets  # type: ignore
+
+
+def test_auc_of_exponential_decay():
+    # C(t) = 10 e^{-0.5 t}: la AUC exacta en [0, 20] es 20 (1 - e^{-10})
+    t = np.linspace(0.0, 20.0, 2001)
+    C = 10.0 * np.exp(-0.5 * t)
+    exact = 20.0 * (1.0 - math.exp(-10.0))
+
+    assert abs(pk_metrics.auc_trapezoid(t, C) - exact) < 1e-3
+    # En una caída exponencial pura el log-trapecio es exacto
+    assert abs(pk_metrics.auc_log_trapezoid(t, C) - exact) < 1e-9
+
+
+def test_per_dose_cmax_tmax_trough_and_time_above():
+    # Rampa lineal C = t en [0, 10] con una segunda dosis en t = 5
+    t = np.arange(0.0, 10.5, 0.5)
+    C = t.copy()
+
+    m = pk_metrics.compute_metrics(t, C, dose_times=np.array([0.0, 5.0]), cme=4.0, cmt=20.0)
+
+    assert m['cmax_per_dose'] == [4.5, 10.0]
+    assert m['tmax_per_dose'] == [4.5, 10.0]
+    assert m['trough_per_dose'] == [0.0, 5.0]
+    assert math.isclose(m['time_above_cme'], 6.0, rel_tol=1e-12)
+    assert m['time_above_cmt'] == 0.0
+
+
+def test_implicit_solvers_converge_and_stay_bounded_when_stiff():
+    # V dC/dt = 1 - 2C con V = 1: C(t) = (1 - e^{-2t}) / 2
+    def u(s):
+        return 1.0
+
+    t = np.linspace(0.0, 5.0, 201)
+    exact = (1.0 - np.exp(-2.0 * t)) / 2.0
+    for solver in (nm.backward_euler, nm.crank_nicolson, nm.bdf2):
+        assert np.max(np.abs(solver(t, 1.0, 2.0, u) - exact)) < 1e-2
+
+    # Q*dt/V = 4: Euler y RK4 explícitos divergen, la selección automática no
+    res = nm.simulate_pharmacokinetics(48.0, 1.0, 5.0, 20.0, 650.0, 'oral', ka=1.2, num_doses=4, interval=6.0)
+    assert res['solvers'] == {'euler': 'backward_euler', 'runge_kutta': 'bdf2'}
+    assert max(res['euler']) < 2 * max(res['exact'])
+    assert max(res['runge_kutta']) < 2 * max(res['exact'])
+
+
+def test_stage_spans_are_exported_as_prometheus_summaries():
+    instrumentation.reset()
+    nm.simulate_pharmacokinetics(12.0, 0.1, 50.0, 20.0, 650.0, 'oral', ka=1.2)
+
+    stages = instrumentation.snapshot()['stage']
+    assert {'exact_solution', 'euler', 'runge_kutta_4', 'calculate_error', 'tolist'} <= set(stages)
+    assert stages['euler']['count'] == 1
+
+    text = instrumentation.prometheus_text()
+    assert 'pharmakin_stage_duration_seconds{stage="exact_solution",quantile="0.99"}' in text
+    assert 'pharmakin_stage_duration_seconds_count{stage="euler"} 1' in text
+
+
+def test_quantiles_use_nearest_rank():
+    samples = [float(i) for i in range(1, 151)]
+    # Rango más cercano: ceil(q*n); con 150 muestras p99 es la 149.ª, no la 148.ª
+    assert instrumentation._quantile(samples, 0.99) == 149.0
+    assert instrumentation._quantile(samples, 0.5) == 75.0
+    assert instrumentation._quantile(samples[:3], 0.5) == 2.0
+    assert instrumentation._quantile([], 0.99) == 0.0
+
+
+def test_reduced_precision_modes_round_series():
+    full = nm.simulate_pharmacokinetics(24.0, 0.1, 50.0, 20.0, 650.0, 'oral', ka=1.2)
+    single = nm.simulate_pharmacokinetics(24.0, 0.1, 50.0, 20.0, 650.0, 'oral', ka=1.2, precision='float32')
+    fixed = nm.simulate_pharmacokinetics(24.0, 0.1, 50.0, 20.0, 650.0, 'oral', ka=1.2, precision='fixed', decimals=3)
+
+    assert np.allclose(single['exact'], full['exact'], rtol=1e-5)
+    assert all(len(repr(v).split('.')[-1]) <= 3 for v in fixed['exact'])
+    assert np.max(np.abs(np.array(fixed['exact']) - full['exact'])) <= 5e-4
+
+
+def test_adding_a_dose_resumes_from_cached_prefix():
+    nm.checkpoint_cache.clear()
+    nm.simulate_pharmacokinetics(24.0, 0.1, 50.0, 20.0, 650.0, 'oral', ka=1.2, num_doses=4, interval=6.0,
+                                 incremental=True)
+    extended = nm.simulate_pharmacokinetics(30.0, 0.1, 50.0, 20.0, 650.0, 'oral', ka=1.2, num_doses=5, interval=6.0,
+                                            incremental=True)
+    fresh = nm.simulate_pharmacokinetics(30.0, 0.1, 50.0, 20.0, 650.0, 'oral', ka=1.2, num_doses=5, interval=6.0,
+                                         incremental=False)
+
+    assert nm.checkpoint_cache.hits == 1
+    assert extended['euler'] == fresh['euler']
+    assert extended['runge_kutta'] == fresh['runge_kutta']
+    assert np.allclose(extended['exact'], fresh['exact'], rtol=1e-12, atol=1e-12)
+
+
+def test_checkpoint_cache_is_bounded_by_bytes():
+    cache = simulation_cache.CheckpointCache(maxsize=32, max_bytes=3 * 8000, max_entry_bytes=8000)
+    t = np.zeros(250)
+    series = {'exact': np.zeros(250), 'euler': np.zeros(250), 'runge_kutta': np.zeros(250)}
+    for key in range(5):
+        cache.store(key, t, 1, series)
+    assert cache.nbytes <= cache.max_bytes and len(cache._entries) == 3
+
+    cache.store('huge', np.zeros(10 ** 4), 1, series)
+    assert 'huge' not in cache._entries
+
+
+def test_live_session_coalesces_bursts_and_sends_deltas():
+    computed = []
+    sent = queue.Queue()
+
+    def compute(params, cancel):
+        computed.append(params['dose'])
+        return {'time': [0.0, 1.0, 2.0], 'exact': [0.0, params['dose'], params['dose'] / 2]}
+
+    session = live_channel.LiveSession(compute, sent.put, debounce=0.05)
+    session.start()
+    for i, dose in enumerate([1.0, 2.0, 3.0]):
+        session.submit({'type': 'params', 'id': i, 'params': {'dose': dose}})
+    first = sent.get(timeout=5)
+    session.submit({'type': 'params', 'id': 3, 'params': {'dose': 4.0}})
+    second = sent.get(timeout=5)
+    session.close()
+
+    assert computed == [3.0, 4.0]
+    assert first['type'] == 'result' and first['id'] == 2
+    assert second == {'type': 'delta', 'id': 3, 'changes': [{'path': ['exact'], 'from': 1, 'values': [4.0, 2.0]}]}
+
+
+def test_live_session_reports_preview_failures():
+    sent = queue.Queue()
+
+    def failing_preview(params):
+        raise ValueError('sin tabla')
+
+    session = live_channel.LiveSession(lambda params, cancel: {'exact': [1.0]}, sent.put,
+                                       debounce=0.0, preview=failing_preview)
+    session.start()
+    session.submit({'type': 'params', 'id': 1, 'params': {}})
+    error, result = sent.get(timeout=5), sent.get(timeout=5)
+    session.close()
+
+    assert error == {'type': 'error', 'id': 1, 'error': 'sin tabla', 'preview': True}
+    assert result['type'] == 'result' and result['id'] == 1
+
+def test_live_channel_rejects_malformed_messages():
+    sent = queue.Queue()
+    session = live_channel.LiveSession(lambda params, cancel: {'exact': [1.0]}, sent.put, debounce=0.0)
+    session.start()
+    for raw in ('{"type": "params", "id": 1', '[1, 2]'):
+        with pytest.raises(ValueError):
+            live_channel.decode_message(raw)
+    session.reject('Mensaje no válido')
+    session.submit(live_channel.decode_message('{"type": "params", "id": 2, "params": {}}'))
+    error, result = sent.get(timeout=5), sent.get(timeout=5)
+    session.close()
+
+    assert error == {'type': 'error', 'id': None, 'error': 'Mensaje no válido'}
+    assert result['type'] == 'result' and result['id'] == 2
+
+def test_static_index_serves_precompressed_and_cacheable_assets(tmp_path):
+    (tmp_path / 'assets').mkdir()
+    (tmp_path / 'index.html').write_text('<html></html>')
+    (tmp_path / 'assets' / 'index-Dntbf4lO.js').write_text('console.log(1)')
+    (tmp_path / 'assets' / 'index-Dntbf4lO.js.gz').write_bytes(b'gz-bytes')
+    index = static_assets.StaticIndex(str(tmp_path))
+    app = Flask(__name__)
+
+    with app.test_request_context('/assets/index-Dntbf4lO.js', headers={'Accept-Encoding': 'gzip, br'}):
+        asset = index.response('assets/index-Dntbf4lO.js', request)
+    assert asset.headers['Content-Encoding'] == 'gzip'
+    assert asset.get_data() == b'gz-bytes'
+    assert 'immutable' in asset.headers['Cache-Control']
+
+    with app.test_request_context('/assets/index-Dntbf4lO.js'):
+        plain = index.response('assets/index-Dntbf4lO.js', request)
+    assert plain.headers['ETag'] != asset.headers['ETag']
+    with app.test_request_context('/assets/index-Dntbf4lO.js',
+                                  headers={'If-None-Match': asset.headers['ETag']}):
+        assert index.response('assets/index-Dntbf4lO.js', request).status_code == 200
+
+    assert static_assets.HASHED_NAME.search('vendor.3f9a1c2b7e.css')
+    assert not static_assets.HASHED_NAME.search('logo-original.png')
+
+    with app.test_request_context('/panel'):
+        page = index.response('panel', request)
+    etag = page.headers['ETag']
+    assert page.get_data() == b'<html></html>'
+
+    with app.test_request_context('/', headers={'If-None-Match': etag}):
+        assert index.response('', request).status_code == 304
+
+
+def test_metrics_only_accepts_only_boolean_values():
+    client = pharmakin_app.app.test_client()
+    body = {'t_max': 12.0, 'dt': 0.1, 'V': 50.0, 'Q': 20.0, 'dose': 650.0, 'route': 'oral'}
+
+    assert 'exact' in client.post('/api/simulate', json=dict(body, metrics_only='false')).json
+    assert 'metrics' in client.post('/api/simulate', json=dict(body, metrics_only='True')).json
+    assert 'metrics' in client.post('/api/simulate', json=dict(body, metrics_only=True)).json
+    assert client.post('/api/simulate', json=dict(body, metrics_only='yes')).status_code == 400
+
+
+def test_simulate_rejects_unknown_implicit_mode():
+    client = pharmakin_app.app.test_client()
+    body = {'t_max': 12.0, 'dt': 0.1, 'V': 50.0, 'Q': 20.0, 'dose': 650.0, 'route': 'oral'}
+
+    response = client.post('/api/simulate', json=dict(body, implicit='sometimes'))
+    assert response.status_code == 400 and 'implicit' in response.json['error']
+
+
+def test_simulate_and_compare_reject_unknown_precision_and_decimals():
+    client = pharmakin_app.app.test_client()
+    body = {'t_max': 12.0, 'dt': 0.1, 'V': 50.0, 'Q': 20.0, 'dose': 650.0, 'route': 'oral'}
+
+    response = client.post('/api/simulate', json=dict(body, precision='float16'))
+    assert response.status_code == 400 and 'precision' in response.json['error']
+    for decimals in (-1, 16, 10**6):
+        response = client.post('/api/simulate', json=dict(body, precision='fixed', decimals=decimals))
+        assert response.status_code == 400 and 'decimals' in response.json['error']
+    assert client.post('/api/simulate', json=dict(body, precision='fixed', decimals=15)).status_code == 200
+
+    compare = {'ids': [1], 't_max': 12.0, 'dt': 0.1, 'dose': 650.0, 'route': 'oral'}
+    assert client.post('/api/compare', json=dict(compare, precision='half')).status_code == 400
+    assert client.post('/api/compare', json=dict(compare, decimals=-3)).status_code == 400
+
+
+def test_conditional_get_short_circuits_catalog_and_simulation():
+    client = pharmakin_app.app.test_client()
+
+    catalog = client.get('/api/active-principles')
+    etag = catalog.headers['ETag']
+    assert client.get('/api/active-principles', headers={'If-None-Match': etag}).status_code == 304
+
+    body = {'t_max': 12.0, 'dt': 0.1, 'V': 50.0, 'Q': 20.0, 'dose': 650.0, 'route': 'oral'}
+    first = client.post('/api/simulate', json=body)
+    etag = first.headers['ETag']
+    # Los valores por defecto explícitos dan los mismos parámetros canónicos
+    same = client.post('/api/simulate', json=dict(body, ka=1.0, num_doses=1), headers={'If-None-Match': etag})
+    other = client.post('/api/simulate', json=dict(body, dose=700.0), headers={'If-None-Match': etag})
+
+    assert same.status_code == 304 and same.data == b''
+    assert other.status_code == 200 and other.headers['ETag'] != etag
+
+
+def test_catalog_listing_supports_compact_view_fields_and_cursor_pages():
+    client = pharmakin_app.app.test_client()
+
+    first = client.get('/api/active-principles?view=compact&limit=2', headers={'Origin': 'http://localhost:5173'})
+    cursor = first.headers['X-Next-Cursor']
+    assert 'X-Next-Cursor' in first.headers['Access-Control-Expose-Headers']
+    second = client.get(f'/api/active-principles?view=compact&limit=2&cursor={cursor}')
+    projected = client.get('/api/active-principles?fields=id,commercial_name')
+
+    assert [p['id'] for p in first.json] == [1, 2]
+    assert set(first.json[0]) == {'id', 'commercial_name', 'pharmacokinetic_params'}
+    assert [p['id'] for p in second.json] == [3, 4]
+    assert all(set(p) == {'id', 'commercial_name'} for p in projected.json)
+    assert client.get('/api/active-principles?limit=0').status_code == 400
+
+
+def test_compiled_catalog_matches_json_catalog(tmp_path):
+    source = os.path.join(backend_dir, 'data', 'active_principles.json')
+    target = str(tmp_path / 'active_principles.bin')
+    pk_catalog.compile_catalog(source, target)
+
+    json_catalog = pk_catalog.ActivePrincipleCatalog(source).refresh()
+    compiled = pk_catalog.CompiledCatalog(target).refresh()
+
+    assert compiled.records == json_catalog.records
+    assert compiled.etag == json_catalog.etag
+    assert compiled.get(3) == json_catalog.get(3) and compiled.get(10 ** 9) is None
+    assert compiled.page(1, 2, compact=True) == json_catalog.page(1, 2, compact=True)
+    assert compiled.pharmacokinetic_params(2) == json_catalog.pharmacokinetic_params(2)
+    ids = [3, 10 ** 9, 1]
+    found, table = compiled.pk_table(ids)
+    json_found, json_table = json_catalog.pk_table(ids)
+    assert found.tolist() == json_found.tolist() == [True, False, True]
+    assert np.array_equal(table, json_table, equal_nan=True)
+    volume = pk_catalog.PK_FIELDS.index('volume')
+    assert table[2, volume] == json_catalog.pharmacokinetic_params(1)['volume']
+    for query in ('', 'a', 'ol', 'zzz-no-existe'):
+        assert compiled.search(query) == json_catalog.search(query)
+
+
+def test_compiled_catalog_keeps_json_types_and_keys(tmp_path):
+    source = str(tmp_path / 'active_principles.json')
+    records = [{'id': 1, 'commercial_name': 'A', 'description': 'x',
+                'pharmacokinetic_params': {'volume': 50, 'half_life': 2.5, 'route': 'oral'}}]
+    with open(source, 'w', encoding='utf-8') as f:
+        json.dump(records, f)
+    target = str(tmp_path / 'active_principles.bin')
+    pk_catalog.compile_catalog(source, target)
+
+    page, _ = pk_catalog.CompiledCatalog(target).refresh().page(compact=True)
+    assert page == pk_catalog.ActivePrincipleCatalog(source).refresh().page(compact=True)[0]
+    assert isinstance(page[0]['pharmacokinetic_params']['volume'], int)
+    assert page[0]['pharmacokinetic_params']['route'] == 'oral'
+
+
+def test_invalid_compiled_catalog_is_rebuilt_or_skipped(tmp_path, monkeypatch):
+    source = str(tmp_path / 'active_principles.json')
+    with open(source, 'w', encoding='utf-8') as f:
+        json.dump([{'id': 1, 'commercial_name': 'A'}], f)
+    target = str(tmp_path / 'active_principles.bin')
+    # Cabecera de la versión 1 del formato, más nueva que el JSON
+    with open(target, 'wb') as f:
+        f.write(struct.pack('<8sII20s4x', pk_catalog.CATALOG_MAGIC, 1, 0, b'\0' * 20))
+
+    catalog = pk_catalog.open_catalog(source)
+    assert catalog.get(1)['commercial_name'] == 'A'
+    assert isinstance(catalog._active, pk_catalog.CompiledCatalog)
+
+    # Archivo truncado que no se puede recompilar (volumen de solo lectura): se sirve el JSON
+    with open(target, 'wb') as f:
+        f.write(b'PKCATLG')
+
+    def read_only(source, target):
+        raise PermissionError(target)
+
+    monkeypatch.setattr(pk_catalog, 'compile_catalog', read_only)
+    catalog = pk_catalog.open_catalog(source)
+    assert catalog.get(1)['commercial_name'] == 'A'
+    assert isinstance(catalog._active, pk_catalog.ActivePrincipleCatalog)
+
+def test_compiled_catalog_reloads_when_json_changes(tmp_path):
+    source = str(tmp_path / 'active_principles.json')
+    with open(source, 'w', encoding='utf-8') as f:
+        json.dump([{'id': 1, 'commercial_name': 'Antes'}], f)
+    pk_catalog.compile_catalog(source, str(tmp_path / 'active_principles.bin'))
+    catalog = pk_catalog.open_catalog(source)
+    assert catalog.get(1)['commercial_name'] == 'Antes'
+    first_etag = catalog.etag
+
+    with open(source, 'w', encoding='utf-8') as f:
+        json.dump([{'id': 1, 'commercial_name': 'Después'}], f)
+    future = os.path.getmtime(source) + 10
+    os.utime(source, (future, future))
+
+    catalog.refresh()
+    assert catalog.get(1)['commercial_name'] == 'Después'
+    assert catalog.etag != first_etag
+    assert catalog.search('despu')[0]['id'] == 1
+
+
+def test_compare_batch_matches_individual_simulations():
+    client = pharmakin_app.app.test_client()
+    regimen = {'t_max': 24.0, 'dt': 0.1, 'dose': 500.0, 'route': 'oral', 'num_doses': 2, 'interval': 8.0}
+
+    response = client.post('/api/compare', json=dict(regimen, ids=[2, 1]))
+    drugs = response.json['drugs']
+
+    assert response.status_code == 200 and [d['id'] for d in drugs] == [2, 1]
+    for drug in drugs:
+        pk = pharmakin_app.catalog.pharmacokinetic_params(drug['id'])
+        single = nm.simulate_pharmacokinetics(V=pk['volume'], Q=pk['clearance'], ka=pk['ka'],
+                                              incremental=False, **regimen)
+        assert drug['concentration'] == single['exact']
+        assert len(drug['concentration']) == len(response.json['time'])
+        assert math.isclose(drug['metrics']['auc'], pk_metrics.auc_trapezoid(
+            np.array(single['time']), np.array(single['exact'])))
+
+    assert client.post('/api/compare', json=dict(regimen, ids=[1, 10 ** 6])).status_code == 404
+
+
+def test_preview_interpolates_closed_form_on_simulation_grid():
+    body = {'t_max': 30.0, 'dt': 0.1, 'V': 30.0, 'Q': 6.0, 'dose': 400.0, 'route': 'oral',
+            'ka': 0.9, 'num_doses': 3, 'interval': 8.0}
+    data = pharmakin_app.app.test_client().post('/api/preview', json=body).json
+
+    t = np.array(data['time'])
+    k, ka = body['Q'] / body['V'], body['ka']
+    expected = np.zeros_like(t)
+    for i in range(body['num_doses']):
+        s = np.maximum(t - i * body['interval'], 0.0)
+        expected += body['dose'] * ka / (body['V'] * (ka - k)) * (np.exp(-k * s) - np.exp(-ka * s))
+
+    assert data['preview'] is True
+    assert data['time'] == nm.simulate_pharmacokinetics(**body, incremental=False)['time']
+    assert np.max(np.abs(np.array(data['concentration']) - expected)) < 1e-2 * expected.max()
+    # r = ka/k = 1 es un nodo de la tabla (límite de la forma cerrada)
+    assert np.all(np.isfinite(preview.preview_table().values))
+
+
+
+def test_iv_preview_matches_refined_exact_series():
+    body = {'t_max': 24.0, 'dt': 0.25, 'V': 30.0, 'Q': 5.0, 'dose': 100.0, 'route': 'iv',
+            'num_doses': 4, 'interval': 5.1}
+    t = np.array(preview.preview_simulation(**body)['time'])
+    approx = np.array(preview.preview_simulation(**body)['concentration'])
+    exact = np.array(nm.simulate_pharmacokinetics(**body)['exact'])
+
+    for time in (0.0, 0.25, 5.0, 5.25, 12.0, 24.0):
+        i = int(np.argmin(np.abs(t - time)))
+        assert math.isclose(approx[i], exact[i], rel_tol=1e-9, abs_tol=1e-12)
+
+
+def test_preview_handles_invalid_and_out_of_table_parameters():
+    client = pharmakin_app.app.test_client()
+    body = {'t_max': 24.0, 'dt': 0.1, 'V': 50.0, 'Q': 0.5, 'dose': 500.0, 'route': 'oral', 'ka': 20.0}
+
+    for bad in (dict(body, V='abc'), dict(body, metrics_only='yes'), dict(body, V=0.0)):
+        response = client.post('/api/preview', json=bad)
+        assert response.status_code == 400 and 'error' in response.json
+    assert client.post('/api/preview', json=[1, 2]).status_code == 400
+    with pytest.raises(ValueError):
+        pharmakin_app.compute_live_preview(dict(body, V='abc'))
+
+    # r = ka/k = 2000 está fuera de la tabla: se usa la forma cerrada
+    data = client.post('/api/preview', json=body).json
+    t = np.array(data['time'])
+    k, ka = body['Q'] / body['V'], body['ka']
+    expected = body['dose'] * ka / (body['V'] * (ka - k)) * (np.exp(-k * t) - np.exp(-ka * t))
+    assert np.allclose(data['concentration'], expected, rtol=1e-9, atol=1e-12)
+
+    # Sin eliminación (Q = 0): límite k -> 0, la dosis absorbida se acumula
+    data = client.post('/api/preview', json=dict(body, Q=0.0)).json
+    assert np.allclose(data['concentration'], body['dose'] / body['V'] * -np.expm1(-ka * t))
+
+def test_asgi_app_offloads_simulations_with_backpressure():
+    async def call(application, method, path, body=None):
+        messages = [{'type': 'http.request', 'body': json.dumps(body).encode() if body else b''}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {'type': 'http', 'method': method, 'path': path, 'query_string': b'',
+                 'headers': [(b'content-type', b'application/json')]}
+        await application(scope, receive, send)
+        return sent[0]['status'], json.loads(sent[1]['body'])
+
+    body = {'t_max': 24.0, 'dt': 0.1, 'V': 50.0, 'Q': 20.0, 'dose': 650.0, 'route': 'oral'}
+
+    async def scenario():
+        application = pharmakin_asgi.PharmaKinASGI(workers=1, max_pending=1, timeout=60)
+        try:
+            busy = asyncio.ensure_future(call(application, 'POST', '/api/simulate', body))
+            await asyncio.sleep(0)
+            # La plaza del pool está ocupada: otra simulación se rechaza,
+            # pero health y el catálogo siguen respondiendo
+            rejected = await call(application, 'POST', '/api/simulate', dict(body, dose=1.0))
+            health = await call(application, 'GET', '/api/health')
+            principle = await call(application, 'GET', '/api/active-principles/1')
+            return await busy, rejected, health, principle
+        finally:
+            application.shutdown()
+
+    simulated, rejected, health, principle = asyncio.run(scenario())
+
+    assert simulated[0] == 200
+    expected = pharmakin_app.app.test_client().post('/api/simulate', json=body).json['exact']
+    assert np.allclose(simulated[1]['exact'], expected, rtol=1e-12, atol=0)
+    assert rejected[0] == 503
+    assert health == (200, {'status': 'ok'})
+    assert principle[0] == 200 and principle[1]['id'] == 1
+
+
+def test_load_harness_reports_latencies_and_flags_regressions():
+    result = load_test.run_load('mixed', 'client', concurrency=2, requests=40, seed=1)
+
+    assert result['requests'] >= 40 and result['errors'] == 0
+    assert result['throughput_rps'] > 0
+    assert set(result['endpoints']) <= {'/api/simulate', '/api/active-principles',
+                                        '/api/active-principles/<id>', '/api/active-principles/search'}
+    assert 'exact_solution' in result['stages']
+    assert load_test.compare_to_baseline(result, result) == []
+
+    faster = json.loads(json.dumps(result))
+    faster['throughput_rps'] *= 2
+    faster['latency_ms']['p50'] /= 2
+    problems = load_test.compare_to_baseline(result, faster)
+    assert any(p.startswith('throughput') for p in problems)
+    assert any(p.startswith('latencia p50') for p in problems)
+
+
+def test_solver_benchmarks_measure_and_compare_against_baseline():
+    results = bench.run_benchmarks(['euler_method', 'calculate_error'], [100], ['oral'], [1, 4], repeat=1)
+
+    assert set(results) == {'euler_method[n=100,route=oral,doses=1]',
+                            'euler_method[n=100,route=oral,doses=4]', 'calculate_error[n=100]'}
+    assert all(r['time_ms'] > 0 and r['alloc_peak_mb'] >= 0 for r in results.values())
+
+    faster = {name: dict(stats, time_ms=stats['time_ms'] / 10) for name, stats in results.items()}
+    _, regressions = bench.comparison_table(results, faster)
+    assert sorted(regressions) == sorted(results)
+    assert bench.comparison_table(results, results)[1] == []